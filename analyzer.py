@@ -0,0 +1,324 @@
+import copy
+import os
+import string
+
+from stemming.porter2 import stem
+
+# table for str.translate that deletes every character of string.punctuation
+PUNCTUATION_TABLE = str.maketrans("", "", string.punctuation)
+# default largest number of words of a stem cache
+STEM_CACHE_SIZE = 200000
+
+
+def stemmerName(stemmer):
+    """
+    Return a name that identifies a stemmer, a stem cache file is only used with the stemmer that wrote it
+    :param stemmer: function that returns the stem of a word
+    :type stemmer: function
+    :return: the module and name of the function
+    :rtype: str
+    """
+    return "%s.%s" % (getattr(stemmer, "__module__", ""), getattr(stemmer, "__qualname__", type(stemmer).__name__))
+
+
+class StemCache:
+    """
+    Class that caches the stems of words, so only words that weren't seen before reach the stemmer. The cache holds at
+    most maxSize words in two generations: new words go into the recent generation, words of the old generation move
+    into the recent generation when they are used again. When the recent generation is full, it becomes the old
+    generation and the previous old generation is dropped, so a word that is used once, like most junk tokens, is
+    dropped after two generations, while the frequent words stay.
+    The cache is stored with the index in a .stems file, see write, it is only read when the first word is stemmed.
+    """
+    def __init__(self, maxSize=STEM_CACHE_SIZE, path=None):
+        """
+        Initialize the cache
+        :param maxSize: largest number of words of the cache
+        :type maxSize: int
+        :param path: path to a .stems file that is read when the first word is stemmed, the file may not exist
+        :type path: str or None
+        :return: None
+        :rtype: None
+        """
+        self.generationSize = max(maxSize // 2, 1)
+        self.path = path
+        # the name of the stemmer the stems belong to, see stemmerName
+        self.stemmer = None
+        self.old = dict()
+        self.recent = dict()
+        # dict that collects the words that were stemmed since it was set, see indexBuilder.tokenizeBatch, None if the
+        # words are not collected
+        self.added = None
+        # number of words that were passed to the stemmer
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.old) + len(self.recent)
+
+    def stem(self, word, stemmer):
+        """
+        Return the stem of a word from the cache, the stemmer is only called if the word isn't cached
+        :param word: the normalized word
+        :type word: str
+        :param stemmer: function that returns the stem of a word
+        :type stemmer: function
+        :return: the stem
+        :rtype: str
+        """
+        result = self.recent.get(word)
+        if result is not None:
+            return result
+        if self.path is not None:
+            self.load(stemmer)
+            result = self.recent.get(word)
+            if result is not None:
+                return result
+        result = self.old.get(word)
+        if result is None:
+            result = stemmer(word)
+            # a word that is its own stem shares the string with the key
+            if result == word:
+                result = word
+            self.misses += 1
+            if self.stemmer is None:
+                self.stemmer = stemmerName(stemmer)
+            if self.added is not None:
+                self.added[word] = result
+        self.put(word, result)
+        return result
+
+    def stemAll(self, words, stemmer):
+        """
+        Return the stems of several words, see stem, the recent generation is looked up directly, which is faster than
+        calling stem for every word
+        :param words: the distinct normalized words
+        :type words: iterable[str]
+        :param stemmer: function that returns the stem of a word
+        :type stemmer: function
+        :return: dict with the words as keys and their stem as value
+        :rtype: dict[str, str]
+        """
+        stems = dict()
+        recent = self.recent
+        for word in words:
+            result = recent.get(word)
+            if result is None:
+                result = self.stem(word, stemmer)
+                # the recent generation may have become the old one
+                recent = self.recent
+            stems[word] = result
+        return stems
+
+    def put(self, word, result):
+        """
+        Add a word and its stem to the recent generation
+        :param word: the word
+        :type word: str
+        :param result: the stem
+        :type result: str
+        :return: None
+        :rtype: None
+        """
+        self.recent[word] = result
+        if len(self.recent) >= self.generationSize:
+            self.old = self.recent
+            self.recent = dict()
+
+    def update(self, stems):
+        """
+        Add the words that the worker processes of a parallel build stemmed, they are counted as misses
+        :param stems: dict with the words as keys and their stem as value
+        :type stems: dict[str, str]
+        :return: None
+        :rtype: None
+        """
+        self.misses += len(stems)
+        for word, result in stems.items():
+            self.put(word, result)
+
+    def load(self, stemmer):
+        """
+        Read the .stems file of the cache if it exists, hasn't been read yet and was written with the same stemmer, the
+        words of the file are added before the words that were stemmed since the cache was created
+        :param stemmer: function that returns the stem of a word
+        :type stemmer: function
+        :return: None
+        :rtype: None
+        """
+        self.stemmer = stemmerName(stemmer)
+        path = self.path
+        self.path = None
+        if path is None or not os.path.exists(path):
+            return
+        stems = dict()
+        with open(path, "r") as f:
+            # the first line holds the name of the stemmer
+            if f.readline() != "\t" + self.stemmer + "\n":
+                return
+            for line in f:
+                word, result = line[:-1].split("\t")
+                # an empty stem means that the word is its own stem
+                stems[word] = result or word
+        stems.update(self.old)
+        stems.update(self.recent)
+        self.old = dict()
+        self.recent = dict()
+        for word, result in stems.items():
+            self.put(word, result)
+
+    def write(self, path):
+        """
+        Write the words of the cache to a .stems file, a line holds a word and its stem separated by a tab, the stem is
+        left out if it is the word itself. The old generation is written first, so the words that were used last are
+        the last ones that are dropped after the file is read.
+        :param path: path to the file
+        :type path: str
+        :return: None
+        :rtype: None
+        """
+        with open(path + ".tmp", "w") as f:
+            f.write("\t" + (self.stemmer or "") + "\n")
+            for stems in (self.old, self.recent):
+                f.writelines(word + "\t" + ("" if result == word else result) + "\n" for word, result in stems.items()
+                             if stems is self.recent or word not in self.recent)
+        os.replace(path + ".tmp", path)
+
+
+class Analyzer:
+    """
+    Class that turns text into the words of the index with the pipeline tokenize -> normalize -> stopwords -> stem.
+    The same analyzer must be used when the index is built and when it is queried, see Index. The stages can be changed
+    with the parameters or by overriding the methods of a subclass, a subclass must be picklable because the worker
+    processes of a parallel build get a copy of it.
+    The default analyzer splits on whitespace, lowercases, removes the characters of string.punctuation, keeps all
+    words and stems them with the Porter2 stemmer. The text is normalized as a whole with str.translate before it is
+    split, which gives the same words as normalizing every token and dropping the empty ones, because normalizing
+    neither adds nor removes whitespace.
+    """
+    def __init__(self, stopwords=(), stemmer=stem, lowercase=True, stemCache=None):
+        """
+        Initialize the analyzer
+        :param stopwords: the normalized words that are left out
+        :type stopwords: iterable[str]
+        :param stemmer: function that returns the stem of a normalized word
+        :type stemmer: function
+        :param lowercase: boolean that indicates if the text is lowercased
+        :type lowercase: bool
+        :param stemCache: the cache of the stems, None to call the stemmer for every word
+        :type stemCache: StemCache or None
+        :return: None
+        :rtype: None
+        """
+        self.stopwords = frozenset(stopwords)
+        self.stemmer = stemmer
+        self.lowercase = lowercase
+        self.stemCache = stemCache
+
+    def withStemCache(self, stemCache):
+        """
+        Return a copy of the analyzer that uses another stem cache
+        :param stemCache: the cache of the stems
+        :type stemCache: StemCache
+        :return: the copy
+        :rtype: Analyzer
+        """
+        analyzer = copy.copy(self)
+        analyzer.stemCache = stemCache
+        return analyzer
+
+    def tokenize(self, text):
+        """
+        Split a text into tokens
+        :param text: the text
+        :type text: str
+        :return: list of the tokens
+        :rtype: list[str]
+        """
+        return text.split()
+
+    def normalize(self, text):
+        """
+        Normalize a text or a single token, i.e. lowercase it and remove the punctuation
+        :param text: the text
+        :type text: str
+        :return: the normalized text
+        :rtype: str
+        """
+        if self.lowercase:
+            text = text.lower()
+        return text.translate(PUNCTUATION_TABLE)
+
+    def isStopword(self, word):
+        """
+        Check if a normalized word is left out
+        :param word: the normalized word
+        :type word: str
+        :return: True if the word is a stopword
+        :rtype: bool
+        """
+        return word in self.stopwords
+
+    def stem(self, word):
+        """
+        Return the stem of a normalized word, from the stem cache if the analyzer has one
+        :param word: the normalized word
+        :type word: str
+        :return: the stem
+        :rtype: str
+        """
+        if self.stemCache is None:
+            return self.stemmer(word)
+        return self.stemCache.stem(word, self.stemmer)
+
+    def stemWords(self, words):
+        """
+        Return the stems of several normalized words
+        :param words: the distinct normalized words
+        :type words: iterable[str]
+        :return: dict with the words as keys and their stem as value
+        :rtype: dict[str, str]
+        """
+        if self.stemCache is None:
+            return {word: self.stemmer(word) for word in words}
+        return self.stemCache.stemAll(words, self.stemmer)
+
+    def words(self, text):
+        """
+        Return the normalized words of a text without the stopwords, the words are not stemmed yet, so that a caller
+        can cache the stems of the distinct words
+        :param text: the text
+        :type text: str
+        :return: list of the words in the order of the text
+        :rtype: list[str]
+        """
+        words = self.tokenize(self.normalize(text))
+        if self.stopwords:
+            return [word for word in words if not self.isStopword(word)]
+        return words
+
+    def analyze(self, text):
+        """
+        Return the stemmed words of a text
+        :param text: the text
+        :type text: str
+        :return: list of the stems in the order of the text
+        :rtype: list[str]
+        """
+        return [self.stem(word) for word in self.words(text)]
+
+    def analyzeToken(self, token):
+        """
+        Return the stem of a single token of a text, e.g. to highlight the tokens of a document
+        :param token: the token, it must not contain whitespace
+        :type token: str
+        :return: the stem, None if nothing is left of the token after normalizing or it is a stopword
+        :rtype: str or None
+        """
+        word = self.normalize(token)
+        if word == "" or self.isStopword(word):
+            return None
+        return self.stem(word)
+
+
+# the analyzer that is used if none is given, its stem cache is shared by everything in the process that uses it
+DEFAULT_ANALYZER = Analyzer(stemCache=StemCache())
@@ -0,0 +1,89 @@
+import argparse
+import string
+import time
+from collections import defaultdict
+
+from analyzer import Analyzer
+from searchEngineUtil import preprocessDocument
+from stemming.porter2 import stem
+from xmlParser import iterate_xml
+
+
+def binaryJoining(l):
+    """
+    Join a list of strings by splitting the list in half and joining the two halves recursively, the way the documents
+    were joined before the analyzer
+    :rtype: str
+    """
+    if len(l) == 1:
+        return l[0]
+    elif len(l) == 2:
+        return l[0] + " " + l[1]
+    else:
+        return binaryJoining(l[:len(l) // 2]) + " " + binaryJoining(l[len(l) // 2:])
+
+
+def legacyWords(sentences):
+    """
+    Return the words of a document the way they were found before the analyzer: the punctuation is removed character
+    by character from every token
+    :rtype: list[str]
+    """
+    words = binaryJoining(sentences).split() if sentences else []
+    words = [''.join(char for char in word if char not in string.punctuation) for word in words]
+    return [word for word in words if word != ""]
+
+
+def legacyPreprocessDocument(sentences, word2stem_dict):
+    """
+    Count the stemmed words and record their positions the way preprocessDocument did before the analyzer
+    :rtype: (defaultdict, dict[str, list[int]])
+    """
+    words = legacyWords(sentences)
+    word_count = defaultdict(int)
+    for word in words:
+        word_count[word] += 1
+    stemmed_word_count_dict = defaultdict(int)
+    for key, value in word_count.items():
+        if key not in word2stem_dict:
+            word2stem_dict[key] = stem(key)
+        stemmed_word_count_dict[word2stem_dict[key]] += value
+    position_dict = defaultdict(list)
+    for position, word in enumerate(words):
+        position_dict[word2stem_dict[word]].append(position)
+    return stemmed_word_count_dict, dict(sorted(position_dict.items(), key=lambda x: x[0]))
+
+
+def timeDocuments(function, documents, repeats):
+    """
+    Run the function on every document repeats times and return the number of documents per second
+    :rtype: float
+    """
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for sentences in documents:
+            function(sentences)
+    return repeats * len(documents) / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare the analyzer with the character by character punctuation "
+                                                 "filter it replaced, run from the folder of the collection: "
+                                                 "python -m benchmarks.analyzerBenchmark")
+    parser.add_argument("--collection", default="nytsmall")
+    parser.add_argument("--repeats", type=int, default=5)
+    arguments = parser.parse_args()
+    documents = [sentences for _, sentences, _ in iterate_xml(arguments.collection + ".xml")]
+    analyzer = Analyzer()
+    stems = dict()
+    identical = sum(1 for sentences in documents
+                    if legacyWords(sentences) == analyzer.words(" ".join(sentences))
+                    and legacyPreprocessDocument(sentences, stems) == preprocessDocument(sentences, stems, True))
+    print("%d documents, identical words, counts and positions: %d" % (len(documents), identical))
+    legacy = timeDocuments(legacyWords, documents, arguments.repeats)
+    fast = timeDocuments(lambda sentences: analyzer.words(" ".join(sentences)), documents, arguments.repeats)
+    print("words:      legacy %8.0f docs/s, analyzer %8.0f docs/s (%.1fx)" % (legacy, fast, fast / legacy))
+    # the stems are cached in both cases, like in a build, so the stemmer itself isn't measured
+    legacy = timeDocuments(lambda sentences: legacyPreprocessDocument(sentences, stems), documents, arguments.repeats)
+    fast = timeDocuments(lambda sentences: preprocessDocument(sentences, stems, True), documents, arguments.repeats)
+    print("preprocess: legacy %8.0f docs/s, analyzer %8.0f docs/s (%.1fx)" % (legacy, fast, fast / legacy))
@@ -0,0 +1,63 @@
+import argparse
+import contextlib
+import io
+import random
+import time
+
+from softwareAssignment import SearchEngine
+from searchEngineUtil import stemQueryTerms
+
+
+def fullScanAnd(searchEngine, words, k):
+    """
+    Answer a conjunctive query the way it had to be done before boolean queries: score every document vector and keep
+    the documents that contain all words
+    :return: list of (document index, score) tuples
+    :rtype: list[tuple[str, float]]
+    """
+    stemmed = stemQueryTerms(words)
+    result = searchEngine.executeQuery(words, k=len(searchEngine.VectorList))
+    return [x for x in result if all(word in searchEngine.index.tf[x[0]] for word in stemmed)][:k]
+
+
+def timeQueries(function, queries):
+    """
+    Run every query once and return the average time per query in milliseconds
+    :rtype: float
+    """
+    start = time.perf_counter()
+    for query in queries:
+        function(query)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare boolean AND queries with a full scan, run from the folder "
+                                                 "of the collection: python -m benchmarks.booleanBenchmark")
+    parser.add_argument("--collection", default="nytsmall")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--terms", type=int, default=2, help="number of terms per AND query")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+    random.seed(arguments.seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = SearchEngine(arguments.collection, False, backend="dict", cacheEntries=0)
+    # draw terms from the documents so that the AND queries have a chance to match
+    documents = list(engine.index.tf.values())
+    queries = []
+    for _ in range(arguments.queries):
+        words = list(random.choice(documents).keys())
+        queries.append(random.sample(words, min(arguments.terms, len(words))))
+    with contextlib.redirect_stdout(io.StringIO()):
+        # the stemmed words are used as query terms, stemming a stem again may change it, so only keep stable ones
+        queries = [query for query in queries if stemQueryTerms(query) == query]
+        matches = sum(1 for query in queries
+                      if [d for d, _ in engine.executeBooleanQuery(" AND ".join(query), arguments.k)]
+                      == [d for d, _ in fullScanAnd(engine, query, arguments.k)])
+        scan = timeQueries(lambda query: fullScanAnd(engine, query, arguments.k), queries)
+        boolean = timeQueries(lambda query: engine.executeBooleanQuery(" AND ".join(query), arguments.k), queries)
+    print("%d %d-term AND queries on %d documents, identical results: %d"
+          % (len(queries), arguments.terms, len(documents), matches))
+    print("full scan:     %.3f ms/query" % scan)
+    print("boolean AND:   %.3f ms/query (%.1fx faster)" % (boolean, scan / boolean))
@@ -0,0 +1,91 @@
+import argparse
+import os
+import re
+import resource
+import subprocess
+import sys
+import time
+
+from indexBuilder import buildIndex
+from searchEngineUtil import preprocess, writeToFileTabSeparated, calculateTF, calculateIDF, calculateNorms, \
+    calculateLengths
+from spelling import createDeletes
+from xmlParser import parse_xml
+
+
+def scaleCollection(collectionName, copies):
+    """
+    Write a collection that holds every document of the collection copies times, the copies get distinct ids
+    :return: name of the scaled collection
+    :rtype: str
+    """
+    scaledName = "%s_x%d" % (collectionName, copies)
+    with open(collectionName + ".xml", "r") as f:
+        documents = re.findall(r"<DOC .*?</DOC>", f.read(), re.DOTALL)
+    with open(scaledName + ".xml", "w") as f:
+        f.write("<DOCS>\n")
+        for copy in range(copies):
+            for document in documents:
+                f.write(re.sub(r'id="([^"]*)"', r'id="\1.%04d"' % copy, document, count=1) + "\n")
+        f.write("</DOCS>\n")
+    return scaledName
+
+
+def buildInMemory(path_to_files):
+    """
+    Create the index files the way the index was created before the streaming build: the whole collection is parsed,
+    preprocessed and held in memory before anything is written, only the document store is left out
+    """
+    index, data = parse_xml(path_to_files + ".xml")
+    data, vocab, positions = preprocess(data, positions=True)
+    tf = calculateTF(index, data)
+    lengths = calculateLengths(index, data)
+    idf = calculateIDF(vocab, len(tf))
+    writeToFileTabSeparated(path_to_files + ".idf", idf)
+    writeToFileTabSeparated(path_to_files + ".tf", tf)
+    writeToFileTabSeparated(path_to_files + ".norm", calculateNorms(tf, idf))
+    writeToFileTabSeparated(path_to_files + ".pos", dict(zip(index, positions)))
+    writeToFileTabSeparated(path_to_files + ".len", lengths)
+    writeToFileTabSeparated(path_to_files + ".spell", createDeletes(idf))
+
+
+def measure(mode, collectionName, budget):
+    """
+    Build the index of the collection in a new process and return its peak RSS in MB and the time in seconds
+    :rtype: (float, float)
+    """
+    output = subprocess.run([sys.executable, "-m", "benchmarks.buildBenchmark", "--child", mode, collectionName,
+                             "--budget", str(budget)], capture_output=True, text=True, check=True).stdout
+    peak, seconds = output.split()
+    return float(peak), float(seconds)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare the peak memory of the in-memory, the streaming and the "
+                                                 "SPIMI index build on a scaled collection, run from the folder of the "
+                                                 "collection: python -m benchmarks.buildBenchmark")
+    parser.add_argument("--collection", default="nytsmall")
+    parser.add_argument("--copies", type=int, default=20, help="number of copies of every document")
+    parser.add_argument("--budget", type=float, default=16, help="MB of postings in memory of the SPIMI build")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "COLLECTION"), help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+    if arguments.child:
+        mode, name = arguments.child
+        start = time.perf_counter()
+        if mode == "memory":
+            buildInMemory(os.path.join(os.getcwd(), name))
+        elif mode == "spimi":
+            buildIndex(os.path.join(os.getcwd(), name), memoryBudget=int(arguments.budget * 1024 * 1024))
+        else:
+            buildIndex(os.path.join(os.getcwd(), name))
+        # ru_maxrss is in kilobytes on Linux
+        print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, time.perf_counter() - start)
+        sys.exit()
+    for copies in sorted({1, arguments.copies}):
+        name = scaleCollection(arguments.collection, copies)
+        size = os.path.getsize(name + ".xml") / 1024 / 1024
+        # the SPIMI build writes the binary file, the other builds only the text files
+        for mode in ("memory", "streaming", "spimi"):
+            peak, seconds = measure(mode, name, arguments.budget)
+            print("%4d copies (%6.1f MB xml) %-9s build: peak RSS %7.1f MB, %6.1f s" % (copies, size, mode, peak,
+                                                                                        seconds))
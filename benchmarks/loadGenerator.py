@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import quote_plus
+
+# words used to generate queries if no vocabulary file is given
+DEFAULT_WORDS = ["hurricane", "philadelphia", "orange", "bowl", "miami", "costa", "nebraska", "quarterback", "season",
+                 "game", "team", "coach", "president", "clinton", "congress", "budget", "police", "city", "school",
+                 "market", "stock", "price", "company", "year", "new", "york", "police", "court", "war", "peace"]
+
+
+def percentile(values, fraction):
+    """
+    Return the value at the given fraction of the sorted values (nearest rank)
+    :param values: sorted list of values
+    :type values: list[float]
+    :param fraction: fraction between 0 and 1
+    :type fraction: float
+    :return: the percentile
+    :rtype: float
+    """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, int(round(fraction * len(values) + 0.5)) - 1))]
+
+
+async def readResponse(reader):
+    """
+    Read one HTTP response and return its status and body
+    :param reader: stream of the connection
+    :type reader: asyncio.StreamReader
+    :return: (status, body)
+    :rtype: (int, bytes)
+    """
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    length = 0
+    for line in lines[1:]:
+        if line.lower().startswith("content-length:"):
+            length = int(line.split(":", 1)[1])
+    return status, await reader.readexactly(length)
+
+
+async def client(host, port, queries, requests, pipeline, k, latencies, errors):
+    """
+    Send requests on one keep-alive connection, up to pipeline requests are sent before their responses are read
+    :return: None
+    :rtype: None
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    sent = 0
+    while sent < requests:
+        depth = min(pipeline, requests - sent)
+        start = time.perf_counter()
+        for _ in range(depth):
+            query = random.choice(queries)
+            writer.write(("GET /search?q=%s&k=%d HTTP/1.1\r\nHost: %s\r\n\r\n"
+                          % (quote_plus(" ".join(query)), k, host)).encode())
+        await writer.drain()
+        for _ in range(depth):
+            status, body = await readResponse(reader)
+            # pipelined responses arrive in order, every request is measured from the time its group was sent
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(json.loads(body).get("error", status))
+        sent += depth
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run(host, port, queries, clients, requests, pipeline, k):
+    """
+    Run the load test and print throughput and latency percentiles
+    :return: None
+    :rtype: None
+    """
+    latencies = []
+    errors = []
+    start = time.perf_counter()
+    await asyncio.gather(*[client(host, port, queries, requests, pipeline, k, latencies, errors)
+                           for _ in range(clients)])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print("requests: %d, errors: %d, time: %.2fs" % (len(latencies), len(errors), elapsed))
+    print("throughput: %.1f requests/s" % (len(latencies) / elapsed))
+    print("latency p50: %.2fms, p99: %.2fms, max: %.2fms"
+          % (percentile(latencies, 0.5) * 1000, percentile(latencies, 0.99) * 1000, latencies[-1] * 1000))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load generator for searchServer.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--clients", type=int, default=16, help="number of concurrent connections")
+    parser.add_argument("--requests", type=int, default=200, help="number of requests per connection")
+    parser.add_argument("--pipeline", type=int, default=1, help="number of pipelined requests per connection")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--vocabulary", help="file with one word per line, e.g. an .idf file")
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+    random.seed(arguments.seed)
+    words = DEFAULT_WORDS
+    if arguments.vocabulary:
+        with open(arguments.vocabulary) as f:
+            words = [line.split("\t")[0] for line in f if line.strip()]
+    generated = [random.sample(words, random.randint(1, 3)) for _ in range(1000)]
+    asyncio.run(run(arguments.host, arguments.port, generated, arguments.clients, arguments.requests,
+                    arguments.pipeline, arguments.k))
@@ -0,0 +1,124 @@
+import argparse
+import contextlib
+import io
+import os
+import random
+import time
+
+from benchmarks.buildBenchmark import scaleCollection
+from binaryIndex import BinarySegment
+from index import Index
+from searchEngineUtil import readFromFileTabSeparated
+from softwareAssignment import SearchEngine
+
+
+def fileSizes(path_to_files, extensions):
+    """
+    Return the total size of the files of the index in MB
+    :rtype: float
+    """
+    return sum(os.path.getsize(path_to_files + extension) for extension in extensions
+               if os.path.exists(path_to_files + extension)) / 1024 / 1024
+
+
+def evict(path):
+    """
+    Drop the pages of a file from the page cache, so the next reads of the file come from the disk
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def decodeAll(path):
+    """
+    Decode the postings and positions of every term of a binary segment file
+    :return: number of postings, seconds for the postings and seconds for the positions
+    :rtype: (int, float, float)
+    """
+    segment = BinarySegment(path)
+    start = time.perf_counter()
+    for term_id in range(segment.numTerms):
+        segment.decodeTerm(term_id)
+    postings = time.perf_counter() - start
+    start = time.perf_counter()
+    for term_id in range(segment.numTerms):
+        segment.decodeTermPositions(term_id)
+    positions = time.perf_counter() - start
+    num_postings = segment.numPostings
+    segment.close()
+    return num_postings, postings, positions
+
+
+def postingBytes(path, queries):
+    """
+    Return how many bytes of postings the query words occupy in a binary segment file, a query on a cold page cache
+    reads at least these bytes from the disk
+    :rtype: int
+    """
+    segment = BinarySegment(path)
+    total = 0
+    for word in {word for query in queries for word in query}:
+        term_id = segment.findTerm(word)
+        if term_id is not None:
+            start, end = segment.arrays["postingOffsets"][term_id:term_id + 2].tolist()
+            # a posting of an uncompressed file takes a uint32 document id and a float64 TF
+            total += end - start if segment.compressed else 12 * (end - start)
+    segment.close()
+    return total
+
+
+def timeQueries(collectionName, queries, cold):
+    """
+    Open the index lazily and run every query once, the postings of the query words are decoded when a query needs
+    them. If cold is True, the binary file is dropped from the page cache first.
+    :return: seconds for opening the index and running the queries
+    :rtype: float
+    """
+    if cold:
+        evict(collectionName + ".bin")
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = SearchEngine(collectionName, False, cacheEntries=0, lazy=True)
+        for query in queries:
+            engine.executeQuery(query)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare the size, the decode throughput and the query time of "
+                                                 "binary and compressed postings on a scaled collection, run from the "
+                                                 "folder of the collection: python -m benchmarks.postingsBenchmark")
+    parser.add_argument("--collection", default="nytsmall")
+    parser.add_argument("--copies", type=int, default=20, help="number of copies of every document")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--terms", type=int, default=3, help="number of terms per query")
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+    random.seed(arguments.seed)
+    name = scaleCollection(arguments.collection, arguments.copies)
+    path_to_files = os.path.join(os.getcwd(), name)
+    with contextlib.redirect_stdout(io.StringIO()):
+        index = Index(name, True, indexFormat="text")
+    print("%d copies, %d documents, %d terms" % (arguments.copies, len(index.documents), len(index.idf)))
+    print("text:       %7.1f MB (.tf, .pos, .len)" % fileSizes(path_to_files, (".tf", ".pos", ".len")))
+    # the query words are drawn by their document frequency, like the words of real queries frequent words have
+    # long postings lists
+    df = readFromFileTabSeparated(path_to_files + ".df")
+    words = list(df)
+    queries = [random.choices(words, [df[word] for word in words], k=arguments.terms)
+               for _ in range(arguments.queries)]
+    results = dict()
+    for indexFormat in ("binary", "compressed"):
+        index.convertFormat(indexFormat)
+        num_postings, postings, positions = decodeAll(path_to_files + ".bin")
+        print("%-10s: %7.1f MB, decodes %5.2f M postings/s, positions of all postings in %5.2f s"
+              % (indexFormat, fileSizes(path_to_files, (".bin",)), num_postings / postings / 1e6, positions))
+        results[indexFormat] = (postingBytes(path_to_files + ".bin", queries) / 1024 / 1024,
+                                timeQueries(name, queries, True), timeQueries(name, queries, False))
+    for indexFormat, (read, cold, warm) in results.items():
+        print("%-10s: %d queries read %6.1f MB of postings, with lazy open %6.3f s with the file dropped from the "
+              "page cache, %6.3f s cached" % (indexFormat, len(queries), read, cold, warm))
@@ -0,0 +1,82 @@
+import argparse
+import contextlib
+import io
+import os
+import random
+import string
+import time
+
+from analyzer import StemCache
+from benchmarks.buildBenchmark import scaleCollection
+from index import Index
+from searchEngineUtil import readFromFileTabSeparated
+from stemming.porter2 import stem
+
+
+def build(name, workers):
+    """
+    Create the index of a collection and return the seconds and the number of words that reached the stemmer
+    :rtype: (float, int)
+    """
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        index = Index(name, True, workers, indexFormat="binary")
+    return time.perf_counter() - start, index.analyzer.stemCache.misses
+
+
+def junkTokens(maxSize, tokens):
+    """
+    Stem a stream of frequent words mixed with random tokens that are seen once and return the largest size of the
+    cache and the number of frequent words that reached the stemmer after they were first seen
+    :rtype: (int, int)
+    """
+    cache = StemCache(maxSize)
+    frequent = ["word%d" % number for number in range(100)]
+    largest = 0
+    misses = 0
+    for number in range(tokens):
+        if number % 2:
+            cache.stem("".join(random.choices(string.ascii_lowercase, k=10)), stem)
+        else:
+            before = cache.misses
+            cache.stem(frequent[number // 2 % len(frequent)], stem)
+            if number // 2 >= len(frequent):
+                misses += cache.misses - before
+        largest = max(largest, len(cache))
+    return largest, misses
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure the stemmer calls of builds and queries with the stem cache "
+                                                 "that is stored with the index, run from the folder of the "
+                                                 "collection: python -m benchmarks.stemCacheBenchmark")
+    parser.add_argument("--collection", default="nytsmall")
+    parser.add_argument("--copies", type=int, default=5, help="number of copies of every document")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+    random.seed(arguments.seed)
+    name = scaleCollection(arguments.collection, arguments.copies)
+    if os.path.exists(name + ".stems"):
+        os.remove(name + ".stems")
+    cold, cold_misses = build(name, arguments.workers)
+    warm, warm_misses = build(name, arguments.workers)
+    print("build without .stems: %6.2f s, %7d words stemmed" % (cold, cold_misses))
+    print("build with .stems:    %6.2f s, %7d words stemmed, %d words in the file"
+          % (warm, warm_misses, sum(1 for _ in open(name + ".stems")) - 1))
+    # the queries are drawn from the vocabulary of the index, a word of the .df file is a stem, which the stemmer
+    # usually leaves alone, so the surface forms are taken from the .stems file
+    words = [line.split("\t")[0] for line in open(name + ".stems")][1:]
+    queries = [" ".join(random.choices(words, k=3)) for _ in range(arguments.queries)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        index = Index(name, False, lazy=True)
+    start = time.perf_counter()
+    for query in queries:
+        index.analyzer.analyze(query)
+    print("%d queries:         %6.3f s, %7d words stemmed, vocabulary %d"
+          % (len(queries), time.perf_counter() - start, index.analyzer.stemCache.misses,
+             len(readFromFileTabSeparated(name + ".df"))))
+    largest, misses = junkTokens(10000, 200000)
+    print("200000 tokens, half of them junk, cache of 10000 words: at most %d words cached, %d frequent words stemmed "
+          "again" % (largest, misses))
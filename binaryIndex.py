@@ -0,0 +1,680 @@
+import itertools
+import mmap
+import os
+import shutil
+import struct
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Mapping
+
+from postingCodec import encodePostings, decodePostings, encodePositions, decodePositions
+from searchEngineUtil import readFromFileTabSeparated, writeToFileTabSeparated
+
+# the header at the start of a binary segment file: magic, version, flags, number of documents, number of terms, number
+# of postings, number of positions and the position of every section, see SECTIONS
+HEADER = struct.Struct("<4sIIIIQQ9Q")
+MAGIC = b"BIDX"
+VERSION = 2
+# flags of the header
+HAS_LENGTHS = 1
+HAS_POSITIONS = 2
+COMPRESSED = 4
+# the sections of the file in their order, every section starts at a multiple of 8 bytes, the arrays are stored in the
+# byte order of the machine (little endian on x86 and ARM) so that they can be used without copying:
+# - documents: the document indices in the order of the segment, separated by newlines
+# - terms: the sorted terms, separated by newlines, the position of a term is its integer term id
+# - postingOffsets: uint64 array, the postings of term t are the entries postingOffsets[t] to postingOffsets[t + 1] - 1
+#   of the posting arrays
+# - postingDocs: uint32 array with the document id (position in the segment) of every posting, sorted per term
+# - postingTF: float64 array with the TF of every posting
+# - lengths, maxCounts: uint32 arrays with the number of words and the largest word count of every document
+# - positionOffsets: uint64 array, the positions of posting p are the entries positionOffsets[p] to
+#   positionOffsets[p + 1] - 1 of the positions array
+# - positions: uint32 array with the sorted positions of the term in the document of every posting
+# a compressed file, see compressSegment, has the same documents, terms, lengths and maxCounts sections, the postings
+# are coded with postingCodec:
+# - postingOffsets: uint64 array, the postings of term t are the bytes postingOffsets[t] to postingOffsets[t + 1] - 1
+#   of the postingDocs section
+# - postingDocs: the variable-byte coded pairs of document id gap and word count of every term, see encodePostings
+# - postingTF: empty, the TF of a posting is its word count divided by the largest word count of its document
+# - positionOffsets: uint64 array, the positions of term t are the bytes positionOffsets[t] to
+#   positionOffsets[t + 1] - 1 of the positions section
+# - positions: the variable-byte coded position gaps of every term, see encodePositions
+SECTIONS = ("documents", "terms", "postingOffsets", "postingDocs", "postingTF", "lengths", "maxCounts",
+            "positionOffsets", "positions")
+
+
+def align(offset):
+    """
+    Round a file position up to the next multiple of 8
+    :param offset: the position
+    :type offset: int
+    :return: the aligned position
+    :rtype: int
+    """
+    return (offset + 7) & ~7
+
+
+def compileSegment(segment):
+    """
+    Write the binary file of a segment from its .tf, .pos and .len text files. The text files are read twice, the
+    first pass counts the postings and positions of every term, the second pass writes every posting to its place in
+    the memory mapped file, so only the vocabulary and the document indices are kept in memory.
+    :param segment: path of the segment without file ending, the binary file is segment.bin
+    :type segment: str
+    :return: None
+    :rtype: None
+    """
+    has_lengths = os.path.exists(segment + ".len")
+    has_positions = os.path.exists(segment + ".pos")
+    # the position of every document in the segment
+    documents = dict()
+    df = defaultdict(int)
+    with open(segment + ".tf", "r") as f:
+        for line in f:
+            ind, key, _ = line.split("\t")
+            if ind not in documents:
+                documents[ind] = len(documents)
+            df[key] += 1
+    # number of positions of every term
+    cf = defaultdict(int)
+    if has_positions:
+        with open(segment + ".pos", "r") as f:
+            for line in f:
+                _, key, value = line.split("\t")
+                cf[key] += value.count(",") + 1
+    terms = sorted(df)
+    num_postings = sum(df.values())
+    num_positions = sum(cf.values())
+    document_blob = "\n".join(documents).encode("utf-8")
+    term_blob = "\n".join(terms).encode("utf-8")
+    sizes = (len(document_blob), len(term_blob), 8 * (len(terms) + 1), 4 * num_postings, 8 * num_postings,
+             4 * len(documents) if has_lengths else 0, 4 * len(documents) if has_lengths else 0,
+             8 * (num_postings + 1) if has_positions else 0, 4 * num_positions)
+    offsets = []
+    offset = HEADER.size
+    for size in sizes:
+        offset = align(offset)
+        offsets.append(offset)
+        offset += size
+    flags = (HAS_LENGTHS if has_lengths else 0) | (HAS_POSITIONS if has_positions else 0)
+    with open(segment + ".bin", "w+b") as f:
+        f.truncate(offset)
+        with mmap.mmap(f.fileno(), 0) as data:
+            HEADER.pack_into(data, 0, MAGIC, VERSION, flags, len(documents), len(terms), num_postings,
+                             num_positions, *offsets)
+            data[offsets[0]:offsets[0] + len(document_blob)] = document_blob
+            data[offsets[1]:offsets[1] + len(term_blob)] = term_blob
+            # the arrays are written through typed views of the memory map, they must be released before the memory
+            # map is closed
+            view = memoryview(data)
+            arrays = [view[start:start + size].cast(item_format)
+                      for start, size, item_format in zip(offsets[2:], sizes[2:], "QIdIIQI")]
+            try:
+                writeArrays(segment, documents, terms, df, cf, *arrays)
+            finally:
+                for array in arrays:
+                    array.release()
+                view.release()
+
+
+def writeArrays(segment, documents, terms, df, cf, posting_offsets, posting_docs, posting_tf, lengths, max_counts,
+                position_offsets, positions):
+    """
+    Fill the arrays of a binary segment file from the text files of the segment, see compileSegment
+    :param segment: path of the segment without file ending
+    :type segment: str
+    :param documents: dict with the document indices as keys and their position in the segment as value
+    :type documents: dict[str, int]
+    :param terms: the sorted terms
+    :type terms: list[str]
+    :param df: dict with the terms as keys and their number of postings as value
+    :type df: dict[str, int]
+    :param cf: dict with the terms as keys and their number of positions as value
+    :type cf: dict[str, int]
+    :return: None
+    :rtype: None
+    """
+    term_ids = {key: term_id for term_id, key in enumerate(terms)}
+    # the next free posting of every term
+    cursors = []
+    position = 0
+    for term_id, key in enumerate(terms):
+        posting_offsets[term_id] = position
+        cursors.append(position)
+        position += df[key]
+    posting_offsets[len(terms)] = position
+    starts = list(cursors)
+    with open(segment + ".tf", "r") as f:
+        for line in f:
+            ind, key, value = line.split("\t")
+            term_id = term_ids[key]
+            posting_docs[cursors[term_id]] = documents[ind]
+            posting_tf[cursors[term_id]] = float(value)
+            cursors[term_id] += 1
+    if len(lengths):
+        with open(segment + ".len", "r") as f:
+            for line in f:
+                ind, length, max_count = line.split("\t")
+                lengths[documents[ind]] = int(length)
+                max_counts[documents[ind]] = int(max_count)
+    if len(position_offsets):
+        # the .pos lines of a term are in the order of the documents like its postings, so the n-th line of a term
+        # belongs to its n-th posting and its positions follow the positions of the posting before
+        cursors = starts
+        position_cursors = []
+        position = 0
+        for key in terms:
+            position_cursors.append(position)
+            position += cf[key]
+        position_offsets[len(posting_docs)] = position
+        with open(segment + ".pos", "r") as f:
+            for line in f:
+                _, key, value = line.split("\t")
+                term_id = term_ids[key]
+                values = array("I", [int(value) for value in value.split(",")])
+                start = position_cursors[term_id]
+                position_offsets[cursors[term_id]] = start
+                positions[start:start + len(values)] = values
+                position_cursors[term_id] += len(values)
+                cursors[term_id] += 1
+
+
+def writeSegmentFile(segment, documents, numTerms, termBytes, numPostings, numPositions, lengths, maxCounts, postings):
+    """
+    Write a binary segment file from postings that arrive in the order of the terms, see indexBuilder.SpimiWriter.
+    Unlike compileSegment every section is written front to back through its own buffered file object and the terms
+    are written as their postings arrive, so the memory needed depends neither on the size of the file nor on the
+    number of terms.
+    :param segment: path of the segment without file ending, the binary file is segment.bin
+    :type segment: str
+    :param documents: path to a file with the document indices in the order of the segment, separated by newlines
+    :type documents: str
+    :param numTerms: the number of terms
+    :type numTerms: int
+    :param termBytes: the number of bytes of the terms encoded with UTF-8 and separated by newlines
+    :type termBytes: int
+    :param numPostings: the number of postings of all terms
+    :type numPostings: int
+    :param numPositions: the number of positions of all postings
+    :type numPositions: int
+    :param lengths: the number of words of every document
+    :type lengths: array[int]
+    :param maxCounts: the largest word count of every document
+    :type maxCounts: array[int]
+    :param postings: iterator over (term, document ids, TF values, number of positions of every posting, positions)
+     tuples in the order of the terms, the postings of a term may be split into several consecutive chunks
+    :type postings: iterator[tuple[str, array[int], array[float], array[int], array[int]]]
+    :return: None
+    :rtype: None
+    """
+    num_docs = len(lengths)
+    sizes = (os.path.getsize(documents), termBytes, 8 * (numTerms + 1), 4 * numPostings, 8 * numPostings,
+             4 * num_docs, 4 * num_docs, 8 * (numPostings + 1), 4 * numPositions)
+    offsets = []
+    offset = HEADER.size
+    for size in sizes:
+        offset = align(offset)
+        offsets.append(offset)
+        offset += size
+    with open(segment + ".bin", "wb") as f:
+        f.truncate(offset)
+    files = [open(segment + ".bin", "r+b") for _ in range(6)]
+    try:
+        header, docs_file, tf_file, position_offsets_file, terms_file, term_offsets_file = files
+        header.write(HEADER.pack(MAGIC, VERSION, HAS_LENGTHS | HAS_POSITIONS, num_docs, numTerms, numPostings,
+                                 numPositions, *offsets))
+        header.seek(offsets[0])
+        with open(documents, "rb") as source:
+            shutil.copyfileobj(source, header)
+        header.seek(offsets[5])
+        header.write(lengths)
+        header.seek(offsets[6])
+        header.write(maxCounts)
+        # the positions are written through the first file object after the other sections
+        positions_file = header
+        for section_file, offset in zip(files, (offsets[8], offsets[3], offsets[4], offsets[7], offsets[1],
+                                                offsets[2])):
+            section_file.seek(offset)
+        current = None
+        posting = 0
+        position = 0
+        for key, docs, tfs, counts, positions in postings:
+            if key != current:
+                # the terms are separated by newlines, the offset of a term is the number of postings before it
+                terms_file.write((key if current is None else "\n" + key).encode("utf-8"))
+                term_offsets_file.write(array("Q", [posting]))
+                current = key
+            docs_file.write(docs)
+            tf_file.write(tfs)
+            position_offsets_file.write(array("Q", itertools.accumulate(counts, initial=position))[:-1])
+            positions_file.write(positions)
+            posting += len(docs)
+            position += len(positions)
+        term_offsets_file.write(array("Q", [posting]))
+        position_offsets_file.write(array("Q", [position]))
+    finally:
+        for f in files:
+            f.close()
+
+
+def compressSegment(segment):
+    """
+    Replace the binary file of a segment by a compressed binary file, see SECTIONS. The document ids of the postings are
+    coded as gaps and the TF values as integer word counts, both with the variable-byte code, so a posting mostly takes
+    two bytes instead of twelve. The TF is the word count divided by the largest word count of the document, see
+    searchEngineUtil.calculateDocumentTF, so the word counts give back the same TF values. The terms are written one
+    after the other, so only the offsets of the terms are kept in memory.
+    :param segment: path of the segment without file ending, the binary file is segment.bin
+    :type segment: str
+    :return: True if the file is compressed, False if the segment has no lengths or TF values that aren't word counts
+     divided by the largest word count, the file is not changed then
+    :rtype: bool
+    """
+    source = BinarySegment(segment + ".bin")
+    try:
+        if source.compressed:
+            return True
+        if not source.hasLengths:
+            return False
+        with open(segment + ".bin.tmp", "wb") as f:
+            compressed = writeCompressed(source, f)
+    finally:
+        source.close()
+    if compressed:
+        os.replace(segment + ".bin.tmp", segment + ".bin")
+    else:
+        os.remove(segment + ".bin.tmp")
+    return compressed
+
+
+def writeCompressed(source, f):
+    """
+    Write the compressed binary file of a segment, see compressSegment
+    :param source: the binary file of the segment
+    :type source: BinarySegment
+    :param f: the new file, opened for writing
+    :type f: file
+    :return: False if a TF value is not a word count divided by the largest word count or the positions don't match
+     the word counts
+    :rtype: bool
+    """
+    max_counts = source.arrays["maxCounts"].tolist()
+    f.write(bytes(HEADER.size))
+    offsets = dict()
+
+    def startSection(name, size=0):
+        offsets[name] = align(f.tell())
+        f.write(bytes(offsets[name] - f.tell() + size))
+
+    startSection("documents")
+    f.write("\n".join(source.documents).encode("utf-8"))
+    startSection("terms")
+    f.write("\n".join(source.terms).encode("utf-8"))
+    # the offsets are written when the postings are written
+    startSection("postingOffsets", 8 * (source.numTerms + 1))
+    # the word counts of every term are needed again for its positions
+    counts = []
+    posting_offsets = array("Q", [0])
+    startSection("postingDocs")
+    for term_id in range(source.numTerms):
+        docs, values = source.decodeTerm(term_id)
+        term_counts = [round(value * max_counts[doc]) for doc, value in zip(docs, values)]
+        if any(count / max_counts[doc] != value for doc, count, value in zip(docs, term_counts, values)):
+            return False
+        counts.append(term_counts)
+        posting_offsets.append(posting_offsets[-1] + f.write(encodePostings(docs, term_counts)))
+    startSection("postingTF")
+    startSection("lengths")
+    f.write(source.arrays["lengths"])
+    startSection("maxCounts")
+    f.write(source.arrays["maxCounts"])
+    startSection("positionOffsets", 8 * (source.numTerms + 1) if source.hasPositions else 0)
+    position_offsets = array("Q", [0])
+    startSection("positions")
+    if source.hasPositions:
+        for term_id in range(source.numTerms):
+            position_lists = source.decodeTermPositions(term_id)[1]
+            if [len(positions) for positions in position_lists] != counts[term_id]:
+                return False
+            position_offsets.append(position_offsets[-1] + f.write(encodePositions(position_lists)))
+        f.seek(offsets["positionOffsets"])
+        f.write(position_offsets)
+    f.seek(offsets["postingOffsets"])
+    f.write(posting_offsets)
+    flags = HAS_LENGTHS | (HAS_POSITIONS if source.hasPositions else 0) | COMPRESSED
+    f.seek(0)
+    f.write(HEADER.pack(MAGIC, VERSION, flags, source.numDocs, source.numTerms, source.numPostings,
+                        source.numPositions, *[offsets[name] for name in SECTIONS]))
+    return True
+
+
+class BinarySegment:
+    """
+    Class that reads a binary segment file, see compileSegment and compressSegment. The file is memory mapped and the
+    arrays of the postings are read without copying them, only the document indices and the terms are decoded when the
+    file is opened.
+    """
+    def __init__(self, path):
+        """
+        Open the binary segment file
+        :param path: path to the file
+        :type path: str
+        :raises ValueError: if the file is not a binary segment file
+        :return: None
+        :rtype: None
+        """
+        with open(path, "rb") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, flags, self.numDocs, self.numTerms, self.numPostings, self.numPositions, *offsets = \
+            HEADER.unpack_from(self.mmap, 0)
+        # files of version 1 are never compressed and otherwise the same
+        if magic != MAGIC or version not in (1, VERSION):
+            raise ValueError("Not a binary segment file: " + path)
+        self.hasLengths = bool(flags & HAS_LENGTHS)
+        self.hasPositions = bool(flags & HAS_POSITIONS)
+        self.compressed = bool(flags & COMPRESSED)
+        if self.compressed:
+            # the postingDocs and positions sections hold bytes, they are sliced from the memory map, see decodeTerm
+            sizes = (None, None, 8 * (self.numTerms + 1), 0, 0, 4 * self.numDocs, 4 * self.numDocs,
+                     8 * (self.numTerms + 1) if self.hasPositions else 0, 0)
+        else:
+            sizes = (None, None, 8 * (self.numTerms + 1), 4 * self.numPostings, 8 * self.numPostings,
+                     4 * self.numDocs, 4 * self.numDocs, 8 * (self.numPostings + 1), 4 * self.numPositions)
+        self.offsets = dict(zip(SECTIONS, offsets))
+        view = memoryview(self.mmap)
+        self.arrays = dict()
+        for name, offset, size, item_format in zip(SECTIONS[2:], offsets[2:], sizes[2:], "QIdIIQI"):
+            self.arrays[name] = view[offset:offset + size].cast(item_format)
+        self.documents = self.decodeStrings(offsets[0], offsets[1], self.numDocs)
+        self.terms = self.decodeStrings(offsets[1], offsets[2], self.numTerms)
+        # the largest word count of every document, the TF values of a compressed file are calculated with them
+        self.maxCounts = self.arrays["maxCounts"].tolist() if self.compressed else None
+
+    def decodeStrings(self, start, end, count):
+        """
+        Decode a section of strings separated by newlines
+        :param start: position of the section
+        :type start: int
+        :param end: position of the next section, the section may be followed by padding
+        :type end: int
+        :param count: number of strings
+        :type count: int
+        :return: list of the strings
+        :rtype: list[str]
+        """
+        if count == 0:
+            return []
+        return self.mmap[start:end].rstrip(b"\0").decode("utf-8").split("\n")
+
+    def close(self):
+        """
+        Close the memory map
+        :return: None
+        :rtype: None
+        """
+        for array in self.arrays.values():
+            array.release()
+        self.mmap.close()
+
+    def findTerm(self, key):
+        """
+        Find the integer term id of a term with a binary search in the sorted terms
+        :param key: the term
+        :type key: str
+        :return: the term id, None if the term is not part of the segment
+        :rtype: int or None
+        """
+        term_id = bisect_left(self.terms, key)
+        if term_id < self.numTerms and self.terms[term_id] == key:
+            return term_id
+        return None
+
+    def decodeTerm(self, term_id):
+        """
+        Decode the postings of a term by its term id
+        :param term_id: the term id
+        :type term_id: int
+        :return: list of the document ids (positions in the segment) and list of the TF values of the postings
+        :rtype: (list[int], list[float])
+        """
+        start, end = self.arrays["postingOffsets"][term_id:term_id + 2].tolist()
+        if not self.compressed:
+            return self.arrays["postingDocs"][start:end].tolist(), self.arrays["postingTF"][start:end].tolist()
+        base = self.offsets["postingDocs"]
+        docs, counts = decodePostings(self.mmap[base + start:base + end])
+        max_counts = self.maxCounts
+        return docs, [count / max_counts[doc] for doc, count in zip(docs, counts)]
+
+    def decodeTermPositions(self, term_id):
+        """
+        Decode the positions of a term by its term id
+        :param term_id: the term id
+        :type term_id: int
+        :return: list of the document ids (positions in the segment) and list of the sorted positions of the term in
+         every document
+        :rtype: (list[int], list[list[int]])
+        """
+        start, end = self.arrays["postingOffsets"][term_id:term_id + 2].tolist()
+        if self.compressed:
+            base = self.offsets["postingDocs"]
+            docs, counts = decodePostings(self.mmap[base + start:base + end])
+            start, end = self.arrays["positionOffsets"][term_id:term_id + 2].tolist()
+            base = self.offsets["positions"]
+            return docs, decodePositions(self.mmap[base + start:base + end], counts)
+        position_offsets = self.arrays["positionOffsets"][start:end + 1].tolist()
+        values = self.arrays["positions"][position_offsets[0]:position_offsets[-1]].tolist()
+        first = position_offsets[0]
+        return self.arrays["postingDocs"][start:end].tolist(), \
+            [values[position_offsets[i] - first:position_offsets[i + 1] - first] for i in range(end - start)]
+
+    def termPostings(self, key):
+        """
+        Decode the postings of a term
+        :param key: the term
+        :type key: str
+        :return: list of the document ids (positions in the segment) and list of the TF values of the postings, empty
+         lists if the term is not part of the segment
+        :rtype: (list[int], list[float])
+        """
+        term_id = self.findTerm(key)
+        if term_id is None:
+            return [], []
+        return self.decodeTerm(term_id)
+
+    def termPositions(self, key):
+        """
+        Decode the positions of a term
+        :param key: the term
+        :type key: str
+        :return: list of the document ids (positions in the segment) and list of the sorted positions of the term in
+         every document, empty lists if the term is not part of the segment
+        :rtype: (list[int], list[list[int]])
+        """
+        term_id = self.findTerm(key)
+        if term_id is None:
+            return [], []
+        return self.decodeTermPositions(term_id)
+
+    def readTF(self):
+        """
+        Read the TF values of all documents
+        :return: dict with document index as key and as value a dict with the words as keys and the TF as value, the
+         words of a document are sorted
+        :rtype: dict[str, dict[str, float]]
+        """
+        tf = {ind: dict() for ind in self.documents}
+        tf_dicts = list(tf.values())
+        if self.compressed:
+            for term_id, key in enumerate(self.terms):
+                for doc, value in zip(*self.decodeTerm(term_id)):
+                    tf_dicts[doc][key] = value
+            return tf
+        posting_offsets = self.arrays["postingOffsets"].tolist()
+        posting_docs = self.arrays["postingDocs"].tolist()
+        posting_tf = self.arrays["postingTF"].tolist()
+        for term_id, key in enumerate(self.terms):
+            for posting in range(posting_offsets[term_id], posting_offsets[term_id + 1]):
+                tf_dicts[posting_docs[posting]][key] = posting_tf[posting]
+        return tf
+
+    def readLengths(self):
+        """
+        Read the document lengths and largest word counts
+        :return: dict with document index as key and a tuple of the number of words and the largest word count as
+         value, None if the segment has no lengths
+        :rtype: dict[str, tuple[int, int]] or None
+        """
+        if not self.hasLengths:
+            return None
+        return dict(zip(self.documents, zip(self.arrays["lengths"].tolist(), self.arrays["maxCounts"].tolist())))
+
+    def readPositions(self):
+        """
+        Read the positions of the words of all documents
+        :return: dict with the document index as key and as value a dict with the words as keys and the list of their
+         positions in the document as value, None if the segment has no positions
+        :rtype: dict[str, dict[str, list[int]]] or None
+        """
+        if not self.hasPositions:
+            return None
+        positions = {ind: dict() for ind in self.documents}
+        position_dicts = list(positions.values())
+        if self.compressed:
+            for term_id, key in enumerate(self.terms):
+                for doc, values in zip(*self.decodeTermPositions(term_id)):
+                    position_dicts[doc][key] = values
+            return positions
+        posting_offsets = self.arrays["postingOffsets"].tolist()
+        posting_docs = self.arrays["postingDocs"].tolist()
+        position_offsets = self.arrays["positionOffsets"].tolist()
+        values = self.arrays["positions"].tolist()
+        for term_id, key in enumerate(self.terms):
+            for posting in range(posting_offsets[term_id], posting_offsets[term_id + 1]):
+                position_dicts[posting_docs[posting]][key] = \
+                    values[position_offsets[posting]:position_offsets[posting + 1]]
+        return positions
+
+    def read(self, extension):
+        """
+        Read the data of a text file of the segment, see searchEngineUtil.readFromFileTabSeparated
+        :param extension: file ending, .tf, .len or .pos
+        :type extension: str
+        :raises NotImplementedError: if the file ending is not .tf, .len or .pos
+        :return: the data, None if the segment has no such data
+        :rtype: dict or None
+        """
+        if extension == ".tf":
+            return self.readTF()
+        elif extension == ".len":
+            return self.readLengths()
+        elif extension == ".pos":
+            return self.readPositions()
+        else:
+            raise NotImplementedError
+
+
+class LazyDict(Mapping):
+    """
+    Read-only dict whose values are created the first time they are accessed, the keys are known in advance. It is used
+    for the postings and positions of a lazily opened index, see Index.openLazy, so only the postings of the words
+    that queries need are decoded. Checking if a key is part of the dict doesn't create its value.
+    """
+    def __init__(self, keys, load):
+        """
+        Initialize the dict
+        :param keys: the keys, e.g. the vocabulary
+        :type keys: dict or set
+        :param load: function that creates the value of a key
+        :type load: function
+        :return: None
+        :rtype: None
+        """
+        self.vocabulary = keys
+        self.load = load
+        # the values that were already created
+        self.cache = dict()
+
+    def __getitem__(self, key):
+        if key not in self.cache:
+            if key not in self.vocabulary:
+                raise KeyError(key)
+            self.cache[key] = self.load(key)
+        return self.cache[key]
+
+    def __contains__(self, key):
+        return key in self.vocabulary
+
+    def __iter__(self):
+        return iter(self.vocabulary)
+
+    def __len__(self):
+        return len(self.vocabulary)
+
+
+def hasSegmentFile(segment, extension):
+    """
+    Check if a segment has the data of a text file, either as text file or in its binary file
+    :param segment: path of the segment without file ending
+    :type segment: str
+    :param extension: file ending, .tf, .len or .pos
+    :type extension: str
+    :return: True if the segment has the data
+    :rtype: bool
+    """
+    if os.path.exists(segment + extension):
+        return True
+    if not os.path.exists(segment + ".bin"):
+        return False
+    with open(segment + ".bin", "rb") as f:
+        flags = HEADER.unpack(f.read(HEADER.size))[2]
+    return extension == ".tf" or bool(flags & (HAS_LENGTHS if extension == ".len" else HAS_POSITIONS))
+
+
+def segmentFormat(segment):
+    """
+    Return the format of a segment
+    :param segment: path of the segment without file ending
+    :type segment: str
+    :return: "compressed" or "binary" if the segment has a binary file, see compressSegment, otherwise "text"
+    :rtype: str
+    """
+    if not os.path.exists(segment + ".bin"):
+        return "text"
+    with open(segment + ".bin", "rb") as f:
+        flags = HEADER.unpack(f.read(HEADER.size))[2]
+    return "compressed" if flags & COMPRESSED else "binary"
+
+
+def readSegmentFile(segment, extension):
+    """
+    Read the data of a text file of a segment, from the binary file if the segment has one, see BinarySegment.read
+    :param segment: path of the segment without file ending
+    :type segment: str
+    :param extension: file ending, .tf, .len or .pos
+    :type extension: str
+    :return: the data, None if the segment has no such data
+    :rtype: dict or None
+    """
+    if not os.path.exists(segment + ".bin"):
+        return readFromFileTabSeparated(segment + extension) if os.path.exists(segment + extension) else None
+    binary_segment = BinarySegment(segment + ".bin")
+    try:
+        return binary_segment.read(extension)
+    finally:
+        binary_segment.close()
+
+
+def exportSegment(segment):
+    """
+    Write the .tf, .len and .pos text files of a segment from its binary file, the words of a document are sorted
+    :param segment: path of the segment without file ending
+    :type segment: str
+    :return: None
+    :rtype: None
+    """
+    for extension in (".tf", ".len", ".pos"):
+        data = readSegmentFile(segment, extension)
+        if data is not None:
+            writeToFileTabSeparated(segment + extension, data)
@@ -0,0 +1,273 @@
+import math
+
+from searchEngineUtil import stemQueryTerms
+
+# operators of the query language, they have to be written in upper case, lower case "and" is a query term
+OPERATORS = ("AND", "OR", "NOT")
+
+
+def tokenizeBooleanQuery(query):
+    """
+    Split a boolean query into parentheses, operators and terms
+    :param query: query string, e.g. "hurricane AND (miami OR philadelphia) AND NOT nebraska"
+    :type query: str
+    :return: list of tokens
+    :rtype: list[str]
+    """
+    return query.replace("(", " ( ").replace(")", " ) ").split()
+
+
+def parseBooleanQuery(query, analyzer=None):
+    """
+    Parse a boolean query into a tree. The tree consists of tuples:
+    ("term", word), ("and", [children]), ("or", [children]) and ("not", child).
+    NOT binds stronger than AND, AND binds stronger than OR, terms without an operator between them are combined
+    with AND. The terms are stemmed like the words of the documents.
+    :param query: query string, e.g. "hurricane AND (miami OR philadelphia) AND NOT nebraska"
+    :type query: str
+    :param analyzer: the analyzer of the index, None for the default analyzer
+    :type analyzer: Analyzer or None
+    :raises ValueError: if the query is malformed
+    :return: the root of the query tree
+    :rtype: tuple
+    """
+    tokens = tokenizeBooleanQuery(query)
+    node, position = parseOr(tokens, 0, analyzer)
+    if position != len(tokens):
+        raise ValueError("Unexpected token in boolean query: " + tokens[position])
+    return node
+
+
+def parseOr(tokens, position, analyzer=None):
+    """
+    Parse an OR expression: and_expression (OR and_expression)*
+    :return: (node, position of the next token)
+    :rtype: (tuple, int)
+    """
+    children = []
+    node, position = parseAnd(tokens, position, analyzer)
+    children.append(node)
+    while position < len(tokens) and tokens[position] == "OR":
+        node, position = parseAnd(tokens, position + 1, analyzer)
+        children.append(node)
+    return (children[0] if len(children) == 1 else ("or", children)), position
+
+
+def parseAnd(tokens, position, analyzer=None):
+    """
+    Parse an AND expression: not_expression ([AND] not_expression)*
+    :return: (node, position of the next token)
+    :rtype: (tuple, int)
+    """
+    children = []
+    node, position = parseNot(tokens, position, analyzer)
+    children.append(node)
+    while position < len(tokens) and tokens[position] not in ("OR", ")"):
+        if tokens[position] == "AND":
+            position += 1
+        node, position = parseNot(tokens, position, analyzer)
+        children.append(node)
+    return (children[0] if len(children) == 1 else ("and", children)), position
+
+
+def parseNot(tokens, position, analyzer=None):
+    """
+    Parse a NOT expression: NOT not_expression | ( or_expression ) | term
+    :raises ValueError: if the query ends unexpectedly or parentheses don't match
+    :return: (node, position of the next token)
+    :rtype: (tuple, int)
+    """
+    if position >= len(tokens):
+        raise ValueError("Boolean query ends unexpectedly")
+    token = tokens[position]
+    if token == "NOT":
+        node, position = parseNot(tokens, position + 1, analyzer)
+        return ("not", node), position
+    if token == "(":
+        node, position = parseOr(tokens, position + 1, analyzer)
+        if position >= len(tokens) or tokens[position] != ")":
+            raise ValueError("Missing closing parenthesis in boolean query")
+        return node, position + 1
+    if token in OPERATORS or token == ")":
+        raise ValueError("Unexpected token in boolean query: " + token)
+    words = stemQueryTerms([token], analyzer)
+    if len(words) == 1:
+        return ("term", words[0]), position + 1
+    # a term that consists only of punctuation matches nothing
+    return ("and", [("term", word) for word in words]) if words else ("or", []), position + 1
+
+
+def queryWords(node):
+    """
+    Collect the words of the query tree that are not negated, these words are used to rank the matching documents
+    :param node: root of the query tree
+    :type node: tuple
+    :return: list of words
+    :rtype: list[str]
+    """
+    if node[0] == "term":
+        return [node[1]]
+    if node[0] == "not":
+        return []
+    return [word for child in node[1] for word in queryWords(child)]
+
+
+class SkipList:
+    """
+    Class that represents a sorted list of document ids with skip pointers every sqrt(n) entries. A negated list stands
+    for all documents of the collection except its document ids, so NOT never has to list every document.
+    """
+    def __init__(self, docIds, negated=False):
+        """
+        Initialize the list
+        :param docIds: sorted list of document ids
+        :type docIds: list[int]
+        :param negated: True if the list stands for the documents that are not in docIds
+        :type negated: bool
+        :return: None
+        :rtype: None
+        """
+        self.docIds = docIds
+        self.negated = negated
+        self.skip = max(1, int(math.sqrt(len(docIds))))
+
+    def __len__(self):
+        return len(self.docIds)
+
+    def iterate(self, numDocs):
+        """
+        Iterate over the matching document ids in increasing order, the complement of a negated list is merged on the
+        fly
+        :param numDocs: number of documents, the document ids are 0..numDocs - 1
+        :type numDocs: int
+        :return: generator of document ids
+        :rtype: generator[int]
+        """
+        if not self.negated:
+            yield from self.docIds
+            return
+        start = 0
+        for doc_id in self.docIds:
+            yield from range(start, doc_id)
+            start = doc_id + 1
+        yield from range(start, numDocs)
+
+
+def intersectSkipLists(list1, list2):
+    """
+    Intersect two skip lists, if the current entry of one list is smaller than the current entry of the other list,
+    its skip pointer is followed as long as it doesn't jump over the other entry
+    :param list1: first list
+    :type list1: SkipList
+    :param list2: second list
+    :type list2: SkipList
+    :return: intersection
+    :rtype: SkipList
+    """
+    a, b = list1.docIds, list2.docIds
+    i = j = 0
+    result = []
+    while i < len(a) and j < len(b):
+        if a[i] == b[j]:
+            result.append(a[i])
+            i += 1
+            j += 1
+        elif a[i] < b[j]:
+            while i + list1.skip < len(a) and a[i + list1.skip] <= b[j]:
+                i += list1.skip
+            if a[i] < b[j]:
+                i += 1
+        else:
+            while j + list2.skip < len(b) and b[j + list2.skip] <= a[i]:
+                j += list2.skip
+            if b[j] < a[i]:
+                j += 1
+    return SkipList(result)
+
+
+def subtractSkipLists(list1, list2):
+    """
+    Remove the entries of list2 from list1, list2 is searched with its skip pointers
+    :param list1: list to remove entries from
+    :type list1: SkipList
+    :param list2: entries to remove
+    :type list2: SkipList
+    :return: difference
+    :rtype: SkipList
+    """
+    b = list2.docIds
+    j = 0
+    result = []
+    for doc_id in list1.docIds:
+        while j + list2.skip < len(b) and b[j + list2.skip] <= doc_id:
+            j += list2.skip
+        while j < len(b) and b[j] < doc_id:
+            j += 1
+        if j == len(b) or b[j] != doc_id:
+            result.append(doc_id)
+    return SkipList(result)
+
+
+def unionSkipLists(lists):
+    """
+    Merge skip lists
+    :param lists: lists to merge
+    :type lists: list[SkipList]
+    :return: union
+    :rtype: SkipList
+    """
+    return SkipList(sorted(set(doc_id for skip_list in lists for doc_id in skip_list.docIds)))
+
+
+def combineSkipLists(included, excluded):
+    """
+    Intersect the included lists, starting with the shortest one, and subtract the excluded lists from the result
+    :param included: lists that are intersected, at least one
+    :type included: list[SkipList]
+    :param excluded: lists whose entries are removed
+    :type excluded: list[SkipList]
+    :return: the documents of all included lists and none of the excluded lists
+    :rtype: SkipList
+    """
+    included = sorted(included, key=len)
+    result = included[0]
+    for skip_list in included[1:]:
+        if not result.docIds:
+            break
+        result = intersectSkipLists(result, skip_list)
+    for skip_list in excluded:
+        if not result.docIds:
+            break
+        result = subtractSkipLists(result, skip_list)
+    return result
+
+
+def evaluateBooleanQuery(node, postings):
+    """
+    Evaluate a query tree over the postings. NOT only flips the negated flag of a list, the negated lists are resolved
+    while the lists are merged: the operands of an AND are intersected starting with the shortest list and the negated
+    operands are subtracted afterwards, so the candidate set only shrinks, an AND of negated operands is the negated
+    union of their lists and an OR with negated operands is the negated intersection of their lists minus the other
+    operands (De Morgan). Only a query that is negated as a whole returns a negated list.
+    :param node: root of the query tree
+    :type node: tuple
+    :param postings: dict with the words as keys and the postings list of (document id, weight) as value
+    :type postings: dict[str, list[tuple[int, float]]]
+    :return: the matching document ids
+    :rtype: SkipList
+    """
+    if node[0] == "term":
+        return SkipList([doc_id for doc_id, _ in postings.get(node[1], ())])
+    if node[0] == "not":
+        child = evaluateBooleanQuery(node[1], postings)
+        return SkipList(child.docIds, not child.negated)
+    children = [evaluateBooleanQuery(child, postings) for child in node[1]]
+    positive = [child for child in children if not child.negated]
+    negative = [child for child in children if child.negated]
+    if node[0] == "or":
+        if not negative:
+            return unionSkipLists(positive)
+        return SkipList(combineSkipLists(negative, positive).docIds, True)
+    if not positive:
+        return SkipList(unionSkipLists(negative).docIds, True)
+    return combineSkipLists(positive, negative)
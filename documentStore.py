@@ -0,0 +1,264 @@
+import mmap
+from bisect import bisect_right
+import struct
+import zlib
+
+from analyzer import DEFAULT_ANALYZER
+
+# the footer at the end of a document store file: magic, version, number of documents, documents per block and the
+# position of the offset table
+FOOTER = struct.Struct("<4sIIIQ")
+MAGIC = b"DSTR"
+VERSION = 1
+# the offset table holds the position of every block and the end of the last block
+OFFSET = struct.Struct("<Q")
+
+
+def writeDocumentStore(path, documents, blockSize=4):
+    """
+    Write the documents to a document store file, see DocumentStoreWriter
+    :param path: path to the file
+    :type path: str
+    :param documents: list of (document index, headline, text) tuples in the order of the integer document ids, the
+     strings must not contain tabs or newlines
+    :type documents: list[tuple[str, str, str]]
+    :param blockSize: number of documents per block
+    :type blockSize: int
+    :return: None
+    :rtype: None
+    """
+    with DocumentStoreWriter(path, blockSize) as writer:
+        for document in documents:
+            writer.add(*document)
+
+
+class DocumentStoreWriter:
+    """
+    Class that writes a document store file. The documents are split into blocks of blockSize documents, every block is
+    compressed with zlib as soon as it is full, the offset table after the blocks holds the position of every block.
+    """
+    def __init__(self, path, blockSize=4):
+        """
+        Create the file
+        :param path: path to the file
+        :type path: str
+        :param blockSize: number of documents per block
+        :type blockSize: int
+        :return: None
+        :rtype: None
+        """
+        self.file = open(path, "wb")
+        self.blockSize = blockSize
+        self.numDocs = 0
+        # the documents of the current block
+        self.block = []
+        self.offsets = [0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add(self, ind, headline, text):
+        """
+        Append a document, the documents get the integer document ids in the order they are added
+        :param ind: document index
+        :type ind: str
+        :param headline: headline, it must not contain tabs or newlines
+        :type headline: str
+        :param text: text, it must not contain tabs or newlines
+        :type text: str
+        :return: None
+        :rtype: None
+        """
+        self.block.append(ind + "\t" + headline + "\t" + text)
+        self.numDocs += 1
+        if len(self.block) == self.blockSize:
+            self.writeBlock()
+
+    def writeBlock(self):
+        """
+        Compress and write the current block
+        :return: None
+        :rtype: None
+        """
+        self.offsets.append(self.offsets[-1] + self.file.write(zlib.compress("\n".join(self.block).encode("utf-8"))))
+        self.block = []
+
+    def close(self):
+        """
+        Write the last block, the offset table and the footer and close the file
+        :return: None
+        :rtype: None
+        """
+        if self.file.closed:
+            return
+        if self.block:
+            self.writeBlock()
+        table_offset = self.offsets[-1]
+        for offset in self.offsets:
+            self.file.write(OFFSET.pack(offset))
+        self.file.write(FOOTER.pack(MAGIC, VERSION, self.numDocs, self.blockSize, table_offset))
+        self.file.close()
+
+
+class DocumentStore:
+    """
+    Class that reads documents from a document store file, see writeDocumentStore. The file is memory mapped, a document
+    is read by looking up the position of its block in the offset table and decompressing that block, the last
+    decompressed block is kept because consecutive ids are often read together.
+    """
+    def __init__(self, path):
+        """
+        Open the document store
+        :param path: path to the file
+        :type path: str
+        :raises ValueError: if the file is not a document store
+        :return: None
+        :rtype: None
+        """
+        self.file = open(path, "rb")
+        self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.numDocs, self.blockSize, self.tableOffset = FOOTER.unpack_from(
+            self.mmap, len(self.mmap) - FOOTER.size)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a document store: " + path)
+        # tuple of the number and the documents of the last decompressed block, it is replaced as a whole so that
+        # threads can share the store
+        self.lastBlock = (None, None)
+
+    def __len__(self):
+        return self.numDocs
+
+    def get(self, doc_id):
+        """
+        Return a document
+        :param doc_id: integer document id
+        :type doc_id: int
+        :raises IndexError: if there is no document with this id
+        :return: (document index, headline, text)
+        :rtype: (str, str, str)
+        """
+        if not 0 <= doc_id < self.numDocs:
+            raise IndexError("Document id out of range: " + str(doc_id))
+        block_number, position = divmod(doc_id, self.blockSize)
+        last_number, block = self.lastBlock
+        if block_number != last_number:
+            start, = OFFSET.unpack_from(self.mmap, self.tableOffset + block_number * OFFSET.size)
+            end, = OFFSET.unpack_from(self.mmap, self.tableOffset + (block_number + 1) * OFFSET.size)
+            block = zlib.decompress(self.mmap[start:end]).decode("utf-8").split("\n")
+            self.lastBlock = (block_number, block)
+        ind, headline, text = block[position].split("\t")
+        return ind, headline, text
+
+    def close(self):
+        """
+        Close the memory map and the file
+        :return: None
+        :rtype: None
+        """
+        self.mmap.close()
+        self.file.close()
+
+
+class DocumentStoreList:
+    """
+    Class that reads documents from the document stores of several segments, the integer document ids continue from
+    one segment to the next
+    """
+    def __init__(self, stores):
+        """
+        Initialize the list
+        :param stores: the document stores in the order of the segments
+        :type stores: list[DocumentStore]
+        :return: None
+        :rtype: None
+        """
+        self.stores = stores
+        # the first document id of every store
+        self.starts = []
+        start = 0
+        for store in stores:
+            self.starts.append(start)
+            start += len(store)
+        self.numDocs = start
+
+    def __len__(self):
+        return self.numDocs
+
+    def get(self, doc_id):
+        """
+        Return a document, see DocumentStore.get
+        :param doc_id: integer document id
+        :type doc_id: int
+        :raises IndexError: if there is no document with this id
+        :return: (document index, headline, text)
+        :rtype: (str, str, str)
+        """
+        if not 0 <= doc_id < self.numDocs:
+            raise IndexError("Document id out of range: " + str(doc_id))
+        number = bisect_right(self.starts, doc_id) - 1
+        return self.stores[number].get(doc_id - self.starts[number])
+
+    def close(self):
+        """
+        Close all document stores
+        :return: None
+        :rtype: None
+        """
+        for store in self.stores:
+            store.close()
+
+
+def createSnippet(text, words, length=30, highlight=("<b>", "</b>"), analyzer=None):
+    """
+    Create a snippet of a document text, the snippet is the window of length words that contains the most different
+    query words, the earliest such window is used. Every word of the text whose stem is a query word is highlighted.
+    :param text: the original text of the document
+    :type text: str
+    :param words: the stemmed query words
+    :type words: set[str]
+    :param length: number of words of the snippet
+    :type length: int
+    :param highlight: strings that are put before and after a highlighted word
+    :type highlight: (str, str)
+    :param analyzer: the analyzer of the index, None for the default analyzer
+    :type analyzer: Analyzer or None
+    :return: the snippet, "..." marks text that was left out
+    :rtype: str
+    """
+    analyzer = analyzer or DEFAULT_ANALYZER
+    tokens = analyzer.tokenize(text)
+    # the stem of every token, None if it isn't a query word, every distinct token is only stemmed once
+    stems = dict()
+    matches = []
+    for token in tokens:
+        if token not in stems:
+            stems[token] = analyzer.analyzeToken(token)
+        matches.append(stems[token] if stems[token] in words else None)
+    # slide the window over the text and count the query words in it
+    counts = dict()
+    best_start = 0
+    best_count = 0
+    for end in range(len(tokens)):
+        if matches[end] is not None:
+            counts[matches[end]] = counts.get(matches[end], 0) + 1
+        start = end - length + 1
+        if start > 0 and matches[start - 1] is not None:
+            counts[matches[start - 1]] -= 1
+            if counts[matches[start - 1]] == 0:
+                del counts[matches[start - 1]]
+        if len(counts) > best_count:
+            best_count = len(counts)
+            best_start = max(start, 0)
+    # center the query words of the best window in the snippet
+    positions = [i for i in range(best_start, min(best_start + length, len(tokens))) if matches[i] is not None]
+    if positions:
+        slack = length - (positions[-1] - positions[0] + 1)
+        best_start = max(0, min(positions[0] - slack // 2, len(tokens) - length))
+    snippet = [highlight[0] + token + highlight[1] if match is not None else token
+               for token, match in zip(tokens[best_start:best_start + length],
+                                       matches[best_start:best_start + length])]
+    return ("... " if best_start > 0 else "") + " ".join(snippet) + \
+        (" ..." if best_start + length < len(tokens) else "")
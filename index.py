@@ -1,14 +1,34 @@
+import itertools
 import os
+import threading
 
-from searchEngineUtil import preprocess, readFromFileTabSeparated, writeToFileTabSeparated, calculateTF, calculateIDF
-from xmlParser import parse_xml
+from analyzer import DEFAULT_ANALYZER, STEM_CACHE_SIZE, StemCache
+from binaryIndex import BinarySegment, LazyDict, compileSegment, compressSegment, exportSegment, hasSegmentFile, \
+    readSegmentFile, segmentFormat
+from documentStore import DocumentStore, DocumentStoreList
+from indexBuilder import buildIndex, buildSegment
+from searchEngineUtil import readFromFileTabSeparated, writeToFileTabSeparated, calculatePostings, calculateNorms, \
+    calculateIDF
+from segments import SEGMENT_EXTENSIONS, TEXT_EXTENSIONS, DeletionBitmap, removeSegmentFiles, findMerge, \
+    writeMergedSegment
+from spelling import SpellingCorrector, createDeletes, addDeletes, removeDeletes
+from termDictionary import TermDictionary
+from topK import calculateMaxWeights
+from xmlParser import iterate_xml
+
+# counter that hands out a new generation number every time an index is created or read, caches that hold results of
+# an index compare this number to notice that the index has changed
+generationCounter = itertools.count(1)
+# the formats in which segments are written, see Index.writeFormat
+INDEX_FORMATS = ("binary", "compressed", "text")
 
 
 class Index:
     """
     Class that represents the index object of a collection of documents
     """
-    def __init__(self, collectionName, create):
+    def __init__(self, collectionName, create, workers=1, indexFormat=None, lazy=None, memoryBudget=None,
+                 analyzer=None, stemCacheSize=STEM_CACHE_SIZE):
         """
         Initialize the index object, if create is True, the index is created and written to files, if create is False,
         the index is read from files
@@ -16,42 +36,855 @@ class Index:
         :type collectionName: str
         :param create: boolean that indicates if the index should be created or read from files
         :type create: bool
+        :param workers: number of worker processes that preprocess the documents when the index is created
+        :type workers: int
+        :param indexFormat: format of the segments that are written, "text" for the tab separated .tf, .len and .pos
+         files, "binary" for a memory mapped .bin file per segment, see binaryIndex, or "compressed" for a .bin file
+         with variable-byte coded postings, see binaryIndex.compressSegment, segments of all formats are read. The
+         binary formats replace the .tf file of the collection, an index that is opened lazily needs them. None for
+         "binary" if memoryBudget is given, otherwise "text".
+        :type indexFormat: str or None
+        :param lazy: boolean that indicates if the index is opened lazily, see openLazy, None to open it lazily if
+         memoryBudget is given and all segments are binary, so an index that is built with a memory budget isn't read
+         into memory afterwards
+        :type lazy: bool or None
+        :param memoryBudget: number of bytes of postings and words that are held in memory while the index or a segment
+         is built, the postings are inverted in sorted runs that are merged afterwards, see
+         indexBuilder.SpimiWriter, None to invert them while the binary file is compiled from the text files
+        :type memoryBudget: int or None
+        :param analyzer: the analyzer that turns the documents and queries into words, the index has to be read with
+         the analyzer it was created with, None for the default analyzer, see analyzer.Analyzer
+        :type analyzer: Analyzer or None
+        :param stemCacheSize: largest number of words whose stem is cached, the stems are stored in a .stems file when
+         documents are indexed and read when the first word is stemmed, see analyzer.StemCache
+        :type stemCacheSize: int
+        :raises ValueError: if the format is unknown
         :return: None
         :rtype: None
         """
+        if indexFormat is None:
+            indexFormat = "text" if memoryBudget is None else "binary"
+        if indexFormat not in INDEX_FORMATS:
+            raise ValueError("Unknown index format: " + str(indexFormat))
+        # the format of the segments that are written
+        self.indexFormat = indexFormat
+        # boolean that indicates if the postings and positions are decoded when they are used, see openLazy, None until
+        # the index is read if it depends on the memory budget
+        self.lazy = lazy
+        # the number of bytes of postings that are held in memory while the index or a segment is built
+        self.memoryBudget = memoryBudget
+        # the analyzer that turns the documents and queries into words, with the stem cache of the collection
+        self.analyzer = (analyzer or DEFAULT_ANALYZER).withStemCache(
+            StemCache(stemCacheSize, os.path.join(os.getcwd(), collectionName) + ".stems"))
+        # a list with the opened binary file of every segment if the index is opened lazily
+        self.binarySegments = None
+        # a list with the document ids of the documents of every segment if the index is opened lazily, the first
+        # document id of the segment if none of its documents is deleted, otherwise a list with the document id of
+        # every position of the segment, None for deleted documents
+        self.globalIds = None
+        # a list with the norm of every document by document id if the index is opened lazily
+        self.documentNorms = None
+        # path of the collection without file ending, the files of the index start with it
+        self.path = None
+        # a list with the paths of the segments without file ending in the order of the documents, at first the
+        # collection itself is the only segment, addDocuments appends segments and merge replaces adjacent segments by
+        # one segment
+        self.segments = None
+        # a list with the deletion bitmap of every segment
+        self.deletions = None
+        # a list with the document indices of every segment in the order of the segment, including the deleted ones
+        self.segmentDocuments = None
+        # a dict that holds the number of the segment and the position in the segment of every live document
+        self.locations = None
+        # the number of the next segment, it is part of the file names of the segment
+        self.nextSegment = None
+        # lock that serializes the changes of the index and the background merge
+        self.lock = threading.RLock()
+        # the thread of the background merge, see startMerge
+        self.mergeThread = None
+        # a dict that holds the number of documents every word of the vocabulary appears in
+        self.df = None
         # a dict that holds the idf values for every word in the vocabulary
         self.idf = None
+        # a dict that holds the stem and the number of documents of every word of the documents before stemming, None
+        # if the index was created without a .words file
+        self.words = None
+        # the sorted words of the documents, it expands prefix and wildcard patterns to stemmed words
+        self.terms = None
+        # the spelling correction that suggests words of the vocabulary for misspelled query words
+        self.spelling = None
+        # the store with the original headline and text of every document, None if the index was created without it
+        self.documentStore = None
         # a nested dict that holds the tf values for every document
         self.tf = None
+        # a list that holds the document indices, the position of a document index is its integer document id
+        self.documents = None
+        # a dict that holds the integer document id of every document index
+        self.documentIds = None
+        # a dict that holds for every word the postings list of (document id, tf.idf weight / document norm) tuples
+        self.postings = None
+        # a dict that holds the norm of the tf.idf vector of every document
+        self.norms = None
+        # a dict that holds for every word the upper bound of its contribution to a cosine similarity
+        self.maxWeights = None
+        # a dict that holds for every word a dict with the document ids as keys and the sorted positions of the word in
+        # the document as value, None if the index was created without positions
+        self.positions = None
+        # a dict that holds the number of words of every document, None if the index was created without lengths
+        self.lengths = None
+        # a dict that holds the largest word count of every document, the raw word counts are the TF values multiplied
+        # by it
+        self.maxCounts = None
+        # the average number of words of a document
+        self.averageLength = None
+        # a dict that caches the postings and upper bounds of every ranking function, see impacts
+        self.scorerPostings = dict()
+        # the generation number of the currently loaded index
+        self.generation = None
         if create:
-            self.createIndex(collectionName)
+            self.createIndex(collectionName, workers)
         else:
             self.readIndex(collectionName)
 
-    def createIndex(self, collectionName):
+    def createIndex(self, collectionName, workers=1):
         """
-        Create the index for the collection and write it to files
+        Create the index for the collection and write it to files, the files are written while the collection is
+        streamed, see indexBuilder.buildIndex, and read afterwards
         :param collectionName: string that holds the name of the collection file
         :type collectionName: str
+        :param workers: number of worker processes that preprocess the documents
+        :type workers: int
         :return: None
         :rtype: None
         """
-        path_to_files = os.path.join(os.getcwd(), collectionName)
-        self.index, data = parse_xml(path_to_files + ".xml")
-        data, vocab = preprocess(data)
-        self.tf = calculateTF(self.index, data)
-        self.idf = calculateIDF(vocab, len(self.tf))
-        writeToFileTabSeparated(path_to_files + ".idf", self.idf)
-        writeToFileTabSeparated(path_to_files + ".tf", self.tf)
+        self.path = os.path.join(os.getcwd(), collectionName)
+        # segments of the previous index of the collection and its deleted documents don't belong to the new one
+        for segment in [self.path] + self.readSegments():
+            removeSegmentFiles(segment)
+        if os.path.exists(self.path + ".segments"):
+            os.remove(self.path + ".segments")
+        buildIndex(self.path, workers, memoryBudget=self.memoryBudget, analyzer=self.analyzer)
+        self.analyzer.stemCache.write(self.path + ".stems")
+        self.writeFormat(self.path)
+        self.readIndex(collectionName)
 
     def readIndex(self, collectionName):
         """
-        Read the index from files
+        Read the index from files, the document norms and the deletes of the spelling correction are only calculated if
+        the index was created without a .norm or .spell file. The .tf, .len, .pos and .docs files of all segments are
+        read in the order of the segments, the documents that are marked in the .del file of a segment are skipped. The
+        other files belong to the whole index and only hold the live documents.
         :param collectionName: string that holds the name of the collection file
         :type collectionName: str
         :return: None
         :rtype: None
         """
         path_to_files = os.path.join(os.getcwd(), collectionName)
+        self.path = path_to_files
+        if self.lazy is None:
+            self.lazy = self.memoryBudget is not None and \
+                all(os.path.exists(segment + ".bin") for segment in self.readSegments() or [path_to_files])
+        if self.lazy:
+            self.openLazy(collectionName)
+            return
+        self.segments = self.readSegments() or [path_to_files]
+        self.nextSegment = 1 + max(self.segmentNumber(segment) for segment in self.segments)
         self.idf = readFromFileTabSeparated(path_to_files + ".idf")
-        self.tf = readFromFileTabSeparated(path_to_files + ".tf")
+        self.readWords()
+        self.tf = dict()
+        self.deletions = []
+        self.segmentDocuments = []
+        for segment in self.segments:
+            tf = readSegmentFile(segment, ".tf")
+            bitmap = DeletionBitmap.read(segment + ".del")
+            for position, ind in enumerate(tf):
+                if not bitmap.isDeleted(position):
+                    self.tf[ind] = tf[ind]
+            self.deletions.append(bitmap)
+            self.segmentDocuments.append(list(tf))
+        self.createLocations()
+        if os.path.exists(path_to_files + ".norm"):
+            self.norms = readFromFileTabSeparated(path_to_files + ".norm")
+        else:
+            self.norms = calculateNorms(self.tf, self.idf)
+        self.createLengths(self.readSegmentFiles(".len"))
+        self.createPostings()
+        if os.path.exists(path_to_files + ".df"):
+            self.df = readFromFileTabSeparated(path_to_files + ".df")
+        else:
+            # the length of a postings list is the document frequency of its word
+            self.df = {key: len(value) for key, value in self.postings.items()}
+        self.positions = None
+        positions = self.readSegmentFiles(".pos")
+        if positions is not None:
+            self.createPositions(positions)
+        if os.path.exists(path_to_files + ".spell"):
+            self.createSpelling(readFromFileTabSeparated(path_to_files + ".spell"))
+        else:
+            self.createSpelling(createDeletes(self.idf))
+        self.openDocumentStore()
+
+    def openLazy(self, collectionName):
+        """
+        Open the index without reading the postings: the binary files of the segments are memory mapped and only their
+        document indices and terms are decoded, the idf and the document norms are read. The postings, upper bounds
+        and positions are LazyDicts that decode the postings of a word across all segments the first time a query
+        needs them, see decodePostings, the spelling correction is read on first use, see spellingCorrector.
+        The tf values are not read, so a lazily opened index can't be changed and doesn't support the dict backend.
+        :param collectionName: string that holds the name of the collection file
+        :type collectionName: str
+        :raises ValueError: if a segment is not a binary segment or the index has no .norm file
+        :return: None
+        :rtype: None
+        """
+        path_to_files = os.path.join(os.getcwd(), collectionName)
+        self.path = path_to_files
+        self.segments = self.readSegments() or [path_to_files]
+        self.nextSegment = 1 + max(self.segmentNumber(segment) for segment in self.segments)
+        if not all(os.path.exists(segment + ".bin") for segment in self.segments):
+            raise ValueError("Only an index with binary segments can be opened lazily, see convertFormat")
+        if not os.path.exists(path_to_files + ".norm"):
+            raise ValueError("The index has no .norm file, create it again to open it lazily")
+        self.idf = readFromFileTabSeparated(path_to_files + ".idf")
+        self.norms = readFromFileTabSeparated(path_to_files + ".norm")
+        self.readWords()
+        self.tf = None
+        self.binarySegments = []
+        self.deletions = []
+        self.segmentDocuments = []
+        self.globalIds = []
+        self.documents = []
+        for segment in self.segments:
+            binary_segment = BinarySegment(segment + ".bin")
+            bitmap = DeletionBitmap.read(segment + ".del")
+            self.binarySegments.append(binary_segment)
+            self.deletions.append(bitmap)
+            self.segmentDocuments.append(binary_segment.documents)
+            if len(bitmap) == 0:
+                self.globalIds.append(len(self.documents))
+                self.documents.extend(binary_segment.documents)
+                continue
+            ids = []
+            for position, ind in enumerate(binary_segment.documents):
+                if bitmap.isDeleted(position):
+                    ids.append(None)
+                else:
+                    ids.append(len(self.documents))
+                    self.documents.append(ind)
+            self.globalIds.append(ids)
+        self.createLocations()
+        self.documentIds = {ind: doc_id for doc_id, ind in enumerate(self.documents)}
+        self.documentNorms = [self.norms[ind] for ind in self.documents]
+        if all(binary_segment.hasLengths for binary_segment in self.binarySegments):
+            lengths = dict()
+            for binary_segment in self.binarySegments:
+                lengths.update(binary_segment.readLengths())
+            self.createLengths({ind: lengths[ind] for ind in self.documents})
+        else:
+            self.createLengths(None)
+        self.postings = LazyDict(self.idf, self.decodePostings)
+        self.maxWeights = LazyDict(self.idf, lambda key: max([weight for _, weight in self.postings[key]]))
+        self.positions = None
+        if all(binary_segment.hasPositions for binary_segment in self.binarySegments):
+            self.positions = LazyDict(self.idf, self.decodePositions)
+        self.terms = TermDictionary(self.words if self.words is not None else self.idf, self.idf)
+        self.df = None
+        self.spelling = None
+        self.scorerPostings = dict()
+        self.generation = next(generationCounter)
+        self.openDocumentStore()
+
+    def decodeTF(self, key):
+        """
+        Decode the TF values of a word from the binary files of all segments, the deleted documents are skipped
+        :param key: stemmed word
+        :type key: str
+        :return: list of (document id, TF) tuples sorted by document id
+        :rtype: list[tuple[int, float]]
+        """
+        result = []
+        for binary_segment, ids in zip(self.binarySegments, self.globalIds):
+            docs, values = binary_segment.termPostings(key)
+            if isinstance(ids, int):
+                result.extend(zip([ids + doc for doc in docs], values))
+            else:
+                result.extend((ids[doc], value) for doc, value in zip(docs, values) if ids[doc] is not None)
+        return result
+
+    def decodePostings(self, key):
+        """
+        Decode the postings list of a word, the weights are calculated like in searchEngineUtil.calculatePostings
+        :param key: stemmed word
+        :type key: str
+        :return: postings list of (document id, tf.idf weight / document norm) tuples
+        :rtype: list[tuple[int, float]]
+        """
+        idf = self.idf.get(key, 0.0)
+        postings_list = []
+        for doc_id, value in self.decodeTF(key):
+            norm = self.documentNorms[doc_id]
+            postings_list.append((doc_id, value * idf / norm if norm != 0 else 0.0))
+        return postings_list
+
+    def decodePositions(self, key):
+        """
+        Decode the positions of a word in the documents from the binary files of all segments
+        :param key: stemmed word
+        :type key: str
+        :return: dict with the document ids as keys and the sorted positions of the word in the document as value
+        :rtype: dict[int, list[int]]
+        """
+        positions = dict()
+        for binary_segment, ids in zip(self.binarySegments, self.globalIds):
+            docs, values = binary_segment.termPositions(key)
+            for doc, value in zip(docs, values):
+                doc_id = ids + doc if isinstance(ids, int) else ids[doc]
+                if doc_id is not None:
+                    positions[doc_id] = value
+        return positions
+
+    def postingCounts(self, key):
+        """
+        Return how often a word occurs in every document that contains it
+        :param key: stemmed word
+        :type key: str
+        :return: list of (document id, number of occurrences) tuples sorted by document id
+        :rtype: list[tuple[int, int]]
+        """
+        if self.lazy:
+            return [(doc_id, round(value * self.maxCounts[self.documents[doc_id]]))
+                    for doc_id, value in self.decodeTF(key)]
+        return [(doc_id, self.rawTF(self.documents[doc_id], key)) for doc_id, _ in self.postings[key]]
+
+    def checkWritable(self):
+        """
+        Check that the index can be changed
+        :raises ValueError: if the index was opened lazily
+        :return: None
+        :rtype: None
+        """
+        if self.lazy:
+            raise ValueError("A lazily opened index can't be changed, open it without lazy=True")
+
+    def readSegments(self):
+        """
+        Read the list of the segments of the collection from the .segments file
+        :return: list with the paths of the segments without file ending, an empty list if the index has no .segments
+         file, then the collection itself is the only segment
+        :rtype: list[str]
+        """
+        if not os.path.exists(self.path + ".segments"):
+            return []
+        with open(self.path + ".segments", "r") as f:
+            return [os.path.join(os.path.dirname(self.path), line.rstrip("\n")) for line in f if line.strip()]
+
+    def writeSegments(self):
+        """
+        Write the list of the segments to the .segments file, this makes a new or merged segment part of the index. The
+        file is replaced at once, so the index is never read with a partial list.
+        :return: None
+        :rtype: None
+        """
+        with open(self.path + ".segments.tmp", "w") as f:
+            for segment in self.segments:
+                f.write(os.path.basename(segment) + "\n")
+        os.replace(self.path + ".segments.tmp", self.path + ".segments")
+
+    def segmentNumber(self, segment):
+        """
+        Return the number of a segment, the collection itself has the number 0
+        :param segment: path of the segment without file ending
+        :type segment: str
+        :return: the number
+        :rtype: int
+        """
+        return 0 if segment == self.path else int(segment[len(self.path) + 1:])
+
+    def removeSegment(self, segment):
+        """
+        Remove the files of a segment that is no longer part of the index, the .df and .words files of the collection
+        itself hold the document frequencies and words of the whole index, so they are kept
+        :param segment: path of the segment without file ending
+        :type segment: str
+        :return: None
+        :rtype: None
+        """
+        removeSegmentFiles(segment, tuple(extension for extension in SEGMENT_EXTENSIONS
+                                          if segment != self.path or extension not in (".df", ".words")))
+
+    def readWords(self):
+        """
+        Read the .words file of the index, words is None if the index was created without it
+        :return: None
+        :rtype: None
+        """
+        if os.path.exists(self.path + ".words"):
+            self.words = readFromFileTabSeparated(self.path + ".words")
+        else:
+            self.words = None
+
+    def addWords(self, segment):
+        """
+        Add the words of a new segment to the words of the index and write the .words file of the index, the .words
+        file of the segment is removed. The words of deleted documents are kept, the term dictionary only expands to
+        words of the vocabulary.
+        :param segment: path of the segment without file ending
+        :type segment: str
+        :return: None
+        :rtype: None
+        """
+        if not os.path.exists(segment + ".words"):
+            return
+        if self.words is not None:
+            for key, (stem, count) in readFromFileTabSeparated(segment + ".words").items():
+                self.words[key] = (stem, self.words.get(key, (stem, 0))[1] + count)
+            writeToFileTabSeparated(self.path + ".words", dict(sorted(self.words.items())))
+        os.remove(segment + ".words")
+
+    def writeFormat(self, segment):
+        """
+        Write a newly written segment in the format of the index, the segment has either the text files or, if it was
+        built with a memory budget, a binary file
+        :param segment: path of the segment without file ending
+        :type segment: str
+        :return: None
+        :rtype: None
+        """
+        if self.indexFormat == "text":
+            if os.path.exists(segment + ".bin"):
+                exportSegment(segment)
+                os.remove(segment + ".bin")
+            return
+        if not os.path.exists(segment + ".bin"):
+            compileSegment(segment)
+            removeSegmentFiles(segment, TEXT_EXTENSIONS)
+        if self.indexFormat == "compressed":
+            compressSegment(segment)
+
+    def convertFormat(self, indexFormat):
+        """
+        Convert all segments to another format, e.g. export a binary index to the tab separated text files or import
+        the text files of an index that was created before the binary format
+        :param indexFormat: "binary", "compressed" or "text"
+        :type indexFormat: str
+        :raises ValueError: if the format is unknown
+        :return: None
+        :rtype: None
+        """
+        if indexFormat not in INDEX_FORMATS:
+            raise ValueError("Unknown index format: " + str(indexFormat))
+        self.checkWritable()
+        with self.lock:
+            self.indexFormat = indexFormat
+            for segment in self.segments:
+                current = segmentFormat(segment)
+                if current == indexFormat:
+                    continue
+                if current != "text":
+                    exportSegment(segment)
+                    os.remove(segment + ".bin")
+                self.writeFormat(segment)
+
+    def createLocations(self):
+        """
+        Create the dict with the segment number and the position in the segment of every live document
+        :return: None
+        :rtype: None
+        """
+        locations = dict()
+        for number, (inds, bitmap) in enumerate(zip(self.segmentDocuments, self.deletions)):
+            for position, ind in enumerate(inds):
+                if not bitmap.isDeleted(position):
+                    locations[ind] = (number, position)
+        self.locations = locations
+
+    def readSegmentFiles(self, extension):
+        """
+        Read the files with the given ending of all segments into one dict, the deleted documents are skipped, the data
+        of a binary segment is read from its binary file
+        :param extension: file ending, .len or .pos
+        :type extension: str
+        :return: dict with the document indices as keys, None if a segment has no such file
+        :rtype: dict or None
+        """
+        data = dict()
+        for number, segment in enumerate(self.segments):
+            if not hasSegmentFile(segment, extension):
+                return None
+            for ind, value in readSegmentFile(segment, extension).items():
+                if self.locations.get(ind, (None, None))[0] == number:
+                    data[ind] = value
+        return data
+
+    def addDocuments(self, xmlPath, workers=1, replace=False):
+        """
+        Add the documents of an XML file to the index without creating it again. The documents are written to a new
+        segment, only the new documents are parsed and stemmed, see updateIndex. If replace is True, a document whose
+        index is already part of the index replaces the old document, which is deleted, otherwise it is skipped.
+        :param xmlPath: path to the XML file with the new documents
+        :type xmlPath: str
+        :param workers: number of worker processes that preprocess the documents
+        :type workers: int
+        :param replace: boolean that indicates if documents that are already part of the index are replaced
+        :type replace: bool
+        :return: number of added documents, including the replaced ones
+        :rtype: int
+        """
+        self.checkWritable()
+        with self.lock:
+            segment = "%s.%d" % (self.path, self.nextSegment)
+            # a document index that appears twice in the file is only added once
+            seen = set()
+            documents = (document for document in iterate_xml(xmlPath)
+                         if (replace or document[0] not in self.locations) and not (document[0] in seen or
+                                                                                   seen.add(document[0])))
+            if buildSegment(segment, documents, workers, memoryBudget=self.memoryBudget, analyzer=self.analyzer) == 0:
+                # no new documents, the empty segment isn't added
+                removeSegmentFiles(segment)
+                return 0
+            self.nextSegment += 1
+            self.analyzer.stemCache.write(self.path + ".stems")
+            self.writeFormat(segment)
+            tf = readSegmentFile(segment, ".tf")
+            removed_words = self.removeDocuments([ind for ind in tf if ind in self.locations])
+            new_words = []
+            for key, value in readFromFileTabSeparated(segment + ".df").items():
+                if key not in self.df:
+                    new_words.append(key)
+                self.df[key] = self.df.get(key, 0) + value
+            self.addWords(segment)
+            self.tf.update(tf)
+            self.segments.append(segment)
+            self.deletions.append(DeletionBitmap())
+            self.segmentDocuments.append(list(tf))
+            for position, ind in enumerate(tf):
+                self.locations[ind] = (len(self.segments) - 1, position)
+            self.updateIndex(new_words, removed_words, segment)
+            self.writeSegments()
+            self.openDocumentStore()
+            return len(tf)
+
+    def deleteDocuments(self, inds):
+        """
+        Delete documents from the index. The documents are marked in the deletion bitmaps of their segments, the files
+        of the segments don't change until the segments are merged, see merge. The index is updated like after
+        addDocuments, see updateIndex.
+        :param inds: the indices of the documents, indices that aren't part of the index are ignored
+        :type inds: iterable[str]
+        :return: number of deleted documents
+        :rtype: int
+        """
+        self.checkWritable()
+        with self.lock:
+            num_docs = len(self.tf)
+            removed_words = self.removeDocuments(inds)
+            if len(self.tf) == num_docs:
+                return 0
+            self.updateIndex([], removed_words)
+            return num_docs - len(self.tf)
+
+    def removeDocuments(self, inds):
+        """
+        Mark documents as deleted in the deletion bitmaps of their segments and remove their tf values, document
+        frequencies and positions, the .del files of the changed segments are written
+        :param inds: the indices of the documents, they must be part of the index
+        :type inds: iterable[str]
+        :return: list of the words that no longer appear in any document
+        :rtype: list[str]
+        """
+        removed_words = []
+        changed = set()
+        for ind in inds:
+            if ind not in self.locations:
+                continue
+            number, position = self.locations.pop(ind)
+            self.deletions[number].delete(position)
+            changed.add(number)
+            doc_id = self.documentIds[ind]
+            for key in self.tf.pop(ind):
+                self.df[key] -= 1
+                if self.df[key] == 0:
+                    del self.df[key]
+                    removed_words.append(key)
+                if self.positions is not None and key in self.positions:
+                    self.positions[key].pop(doc_id, None)
+                    if not self.positions[key]:
+                        del self.positions[key]
+        for number in changed:
+            self.deletions[number].write(self.segments[number] + ".del")
+        return removed_words
+
+    def updateIndex(self, newWords, removedWords, segment=None):
+        """
+        Update the index after documents were added or deleted: the idf, the document norms and the postings are
+        calculated again from the tf values and document frequencies in memory, the documents after a deleted document
+        get new document ids in the positional index, the new words are added to and the removed words are removed
+        from the spelling correction, and the .df, .idf, .norm and .spell files of the index are rewritten
+        :param newWords: the words that appear in a document for the first time
+        :type newWords: list[str]
+        :param removedWords: the words that no longer appear in any document
+        :type removedWords: list[str]
+        :param segment: path of the added segment without file ending, its .len and .pos files are read, None if no
+         segment was added
+        :type segment: str or None
+        :return: None
+        :rtype: None
+        """
+        old_documents = self.documents
+        self.idf = calculateIDF(self.df, len(self.tf))
+        self.norms = calculateNorms(self.tf, self.idf)
+        if self.lengths is not None:
+            lengths = {ind: (length, self.maxCounts[ind]) for ind, length in self.lengths.items() if ind in self.tf}
+            if segment is not None:
+                lengths.update(readSegmentFile(segment, ".len"))
+            self.createLengths(lengths)
+        self.createPostings()
+        if self.positions is not None:
+            if self.documents[:len(old_documents)] != old_documents:
+                new_ids = [self.documentIds.get(ind) for ind in old_documents]
+                self.positions = {key: {new_ids[doc_id]: value for doc_id, value in position_dict.items()}
+                                  for key, position_dict in self.positions.items()}
+            if segment is not None:
+                self.addPositions(readSegmentFile(segment, ".pos"))
+        deletes = self.spelling.deletes
+        removeDeletes(deletes, removedWords)
+        addDeletes(deletes, newWords)
+        self.createSpelling(deletes)
+        writeToFileTabSeparated(self.path + ".df", dict(sorted(self.df.items())))
+        writeToFileTabSeparated(self.path + ".idf", self.idf)
+        writeToFileTabSeparated(self.path + ".norm", self.norms)
+        writeToFileTabSeparated(self.path + ".spell", deletes)
+
+    def merge(self):
+        """
+        Merge segments as long as the tiered merge policy finds segments to merge, see segments.findMerge
+        :return: number of merges
+        :rtype: int
+        """
+        self.checkWritable()
+        merges = 0
+        while True:
+            with self.lock:
+                segments = findMerge([len(inds) for inds in self.segmentDocuments],
+                                     [len(bitmap) for bitmap in self.deletions])
+            if segments is None:
+                return merges
+            self.mergeSegments(*segments)
+            merges += 1
+
+    def mergeSegments(self, start, end):
+        """
+        Replace the adjacent segments start to end - 1 by one segment with their live documents, see
+        segments.writeMergedSegment. The documents keep their order and their document ids, so only the segment files
+        and the document store change. The new segment is written without holding the lock, documents that are deleted
+        meanwhile are marked in the deletion bitmap of the new segment.
+        :param start: number of the first merged segment
+        :type start: int
+        :param end: number of the segment after the last merged segment
+        :type end: int
+        :return: None
+        :rtype: None
+        """
+        with self.lock:
+            segments = self.segments[start:end]
+            documents = self.segmentDocuments[start:end]
+            deletions = [bitmap.copy() for bitmap in self.deletions[start:end]]
+            target = "%s.%d" % (self.path, self.nextSegment)
+            self.nextSegment += 1
+        merged = writeMergedSegment(target, segments, documents, deletions)
+        if merged:
+            self.writeFormat(target)
+        with self.lock:
+            # only merge and addDocuments change the list of segments and addDocuments only appends to it
+            assert self.segments[start:end] == segments
+            bitmap = DeletionBitmap()
+            position = 0
+            for number, old_bitmap in enumerate(deletions):
+                for old_position in range(len(documents[number])):
+                    if not old_bitmap.isDeleted(old_position):
+                        if self.deletions[start + number].isDeleted(old_position):
+                            bitmap.delete(position)
+                        position += 1
+            if merged:
+                if len(bitmap):
+                    bitmap.write(target + ".del")
+                self.segments[start:end] = [target]
+                self.segmentDocuments[start:end] = [merged]
+                self.deletions[start:end] = [bitmap]
+            else:
+                # all documents of the segments were deleted
+                self.removeSegment(target)
+                del self.segments[start:end]
+                del self.segmentDocuments[start:end]
+                del self.deletions[start:end]
+            self.createLocations()
+            self.writeSegments()
+            self.openDocumentStore()
+            for segment in segments:
+                self.removeSegment(segment)
+
+    def startMerge(self):
+        """
+        Start merging segments in a background thread, see merge, nothing happens if a merge is already running
+        :return: None
+        :rtype: None
+        """
+        with self.lock:
+            if self.mergeThread is not None and self.mergeThread.is_alive():
+                return
+            self.mergeThread = threading.Thread(target=self.merge, daemon=True)
+            self.mergeThread.start()
+
+    def waitForMerge(self):
+        """
+        Wait until the background merge is finished
+        :return: None
+        :rtype: None
+        """
+        if self.mergeThread is not None:
+            self.mergeThread.join()
+
+    def createPostings(self):
+        """
+        Create the inverted index from the tf and idf dicts, this allows scoring a query by only visiting the documents
+        that contain at least one of the query words
+        :return: None
+        :rtype: None
+        """
+        self.documents, self.postings = calculatePostings(self.tf, self.idf, self.norms)
+        self.documentIds = {ind: doc_id for doc_id, ind in enumerate(self.documents)}
+        self.maxWeights = calculateMaxWeights(self.postings)
+        self.terms = TermDictionary(self.words if self.words is not None else self.idf, self.idf)
+        self.scorerPostings = dict()
+        self.generation = next(generationCounter)
+
+    def createLengths(self, lengths):
+        """
+        Set the document lengths and largest word counts
+        :param lengths: dict with document index as key and a tuple of the number of words and the largest word count
+         as value, None if the index was created without lengths
+        :type lengths: dict[str, tuple[int, int]] or None
+        :return: None
+        :rtype: None
+        """
+        if lengths is None:
+            self.lengths = self.maxCounts = self.averageLength = None
+            return
+        self.lengths = {ind: length for ind, (length, _) in lengths.items()}
+        self.maxCounts = {ind: max_count for ind, (_, max_count) in lengths.items()}
+        self.averageLength = sum(self.lengths.values()) / len(self.lengths) if self.lengths else 0.0
+
+    def rawTF(self, ind, key):
+        """
+        Return how often a word occurs in a document
+        :param ind: document index
+        :type ind: str
+        :param key: stemmed word
+        :type key: str
+        :return: number of occurrences
+        :rtype: int
+        """
+        return round(self.tf[ind].get(key, 0.0) * self.maxCounts[ind])
+
+    def impacts(self, scorer):
+        """
+        Return the postings and upper bounds of a ranking function, they are calculated on first use and cached until
+        the index changes
+        :param scorer: the ranking function
+        :type scorer: Scorer
+        :return: dict with the words as keys and the postings list of (document id, impact) as value, and a dict with
+         the words as keys and their largest impact as value
+        :rtype: (dict[str, list[tuple[int, float]]], dict[str, float])
+        """
+        if scorer.name not in self.scorerPostings:
+            self.scorerPostings[scorer.name] = scorer.createPostings(self)
+        return self.scorerPostings[scorer.name]
+
+    def createPositions(self, positions):
+        """
+        Create the positional index, which is ordered by word like the postings, from the positions of the words in
+        every document
+        :param positions: dict with the document index as key and as value a dict with the words as keys and the list
+         of their positions in the document as value
+        :type positions: dict[str, dict[str, list[int]]]
+        :return: None
+        :rtype: None
+        """
+        self.positions = dict()
+        self.addPositions(positions)
+
+    def addPositions(self, positions):
+        """
+        Add the positions of the words of documents to the positional index, see createPositions
+        :param positions: dict with the document index as key and as value a dict with the words as keys and the list
+         of their positions in the document as value
+        :type positions: dict[str, dict[str, list[int]]]
+        :return: None
+        :rtype: None
+        """
+        for ind, position_dict in positions.items():
+            doc_id = self.documentIds.get(ind)
+            if doc_id is None:
+                continue
+            for key, value in position_dict.items():
+                if key not in self.positions:
+                    self.positions[key] = dict()
+                self.positions[key][doc_id] = value
+
+    def createSpelling(self, deletes):
+        """
+        Create the spelling correction, words that occur in more documents are suggested first
+        :param deletes: dict with the deletes as keys and the list of words they were created from as value, see
+         spelling.createDeletes
+        :type deletes: dict[str, list[str]]
+        :return: None
+        :rtype: None
+        """
+        self.spelling = SpellingCorrector(deletes, self.df)
+
+    def spellingCorrector(self):
+        """
+        Return the spelling correction, a lazily opened index reads it on first use
+        :return: the spelling correction
+        :rtype: SpellingCorrector
+        """
+        if self.spelling is None:
+            with self.lock:
+                if self.spelling is None:
+                    if os.path.exists(self.path + ".df"):
+                        self.df = readFromFileTabSeparated(self.path + ".df")
+                    else:
+                        self.df = {key: len(value) for key, value in self.postings.items()}
+                    if os.path.exists(self.path + ".spell"):
+                        self.createSpelling(readFromFileTabSeparated(self.path + ".spell"))
+                    else:
+                        self.createSpelling(createDeletes(self.idf))
+        return self.spelling
+
+    def openDocumentStore(self):
+        """
+        Open the document stores of all segments, if a segment was created without one, documentStore is None
+        :return: None
+        :rtype: None
+        """
+        if self.documentStore is not None:
+            self.documentStore.close()
+            self.documentStore = None
+        if all(os.path.exists(segment + ".docs") for segment in self.segments):
+            self.documentStore = DocumentStoreList([DocumentStore(segment + ".docs") for segment in self.segments])
+
+    def readDocument(self, ind):
+        """
+        Read the headline and text of a document from the document store of its segment
+        :param ind: document index
+        :type ind: str
+        :raises ValueError: if the index has no document store
+        :return: (headline, text)
+        :rtype: (str, str)
+        """
+        with self.lock:
+            if self.documentStore is None:
+                raise ValueError("The index has no document store, create it again to show snippets")
+            number, position = self.locations[ind]
+            _, headline, text = self.documentStore.stores[number].get(position)
+            return headline, text
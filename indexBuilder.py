@@ -0,0 +1,835 @@
+import heapq
+import itertools
+import math
+import multiprocessing
+import os
+import struct
+from array import array
+from collections import defaultdict, deque
+from operator import itemgetter
+
+from analyzer import DEFAULT_ANALYZER, StemCache
+from binaryIndex import writeSegmentFile
+from documentStore import DocumentStoreWriter
+from searchEngineUtil import preprocessDocument, calculateDocumentTF, calculateIDF, calculateNorms, \
+    formatTabSeparated, writeToFileTabSeparated, iterateTF
+from spelling import createDeletes, addDeletes
+from xmlParser import iterate_sorted_xml
+
+
+# the analyzer of a worker process of a parallel build, every worker has its own copy of the analyzer and its stem
+# cache, see initWorker
+workerAnalyzer = None
+# the header of a term in a run file of SpimiWriter: number of bytes of the term, number of postings and number of
+# positions, it is followed by the term and its document id, TF, position count and position arrays
+RUN_HEADER = struct.Struct("<III")
+# estimated number of bytes a new term of a SpimiWriter block takes: the string, the dict entry and four empty arrays
+TERM_BYTES = 600
+# estimated number of bytes of a posting in a block: a uint32 document id, a float64 TF and a uint32 position count,
+# plus the growth reserve of the arrays
+POSTING_BYTES = 18
+# estimated number of bytes of a position in a block
+POSITION_BYTES = 5
+# estimated number of bytes of a word before stemming that is counted for the .words file: the string, the dict entry
+# and the list of its stem and count
+WORD_BYTES = 170
+# estimated number of bytes of the deletes of a term in the delete index of the spelling correction, see
+# spelling.createDeletes
+DELETE_TERM_BYTES = 2300
+# largest number of run files that are merged at once, more runs are merged in several passes, so the number of open
+# files stays bounded
+MERGE_FAN_IN = 64
+
+
+def tokenizeDocuments(documents, analyzer=None):
+    """
+    Preprocess the documents of a collection one by one, see searchEngineUtil.preprocessDocument, the stems are cached
+    in the stem cache of the analyzer
+    :param documents: iterator over (document index, list of sentences, (headline, text)) tuples, see
+     xmlParser.iterate_xml
+    :type documents: iterator[tuple[str, list[str], tuple[str, str]]]
+    :param analyzer: the analyzer that turns the text into words, None for the default analyzer
+    :type analyzer: Analyzer or None
+    :return: iterator over (document index, dict with the stemmed words as keys and their number of occurrences as
+     value, dict with the stemmed words as keys and their positions as value, (headline, text), dict with the words of
+     the document as keys and their stem as value) tuples, documents without any words are skipped
+    :rtype: iterator[tuple[str, dict[str, int], dict[str, list[int]], tuple[str, str], dict[str, str]]]
+    """
+    for ind, sentences, original in documents:
+        stems = dict()
+        word_count, positions = preprocessDocument(sentences, stems, positions=True, analyzer=analyzer)
+        if word_count:
+            yield ind, word_count, positions, original, stems
+
+
+def countWords(words, stems):
+    """
+    Count the documents the words of a document appear in
+    :param words: dict with the words as keys and a list of their stem and the number of documents they appear in as
+     value
+    :type words: dict[str, list]
+    :param stems: dict with the words of the document as keys and their stem as value
+    :type stems: dict[str, str]
+    :return: None
+    :rtype: None
+    """
+    for word, stem in stems.items():
+        entry = words.get(word)
+        if entry is None:
+            words[word] = [stem, 1]
+        else:
+            entry[1] += 1
+
+
+def addWords(words, counted):
+    """
+    Add counted words to the counts of the words, see countWords
+    :param words: dict with the words as keys and a list of their stem and the number of documents they appear in as
+     value
+    :type words: dict[str, list]
+    :param counted: the counted words of other documents in the same format
+    :type counted: dict[str, list]
+    :return: None
+    :rtype: None
+    """
+    for word, (stem, count) in counted.items():
+        entry = words.get(word)
+        if entry is None:
+            words[word] = [stem, count]
+        else:
+            entry[1] += count
+
+
+class IndexWriter:
+    """
+    Class that writes the index files of a collection while the documents are streamed through it. The .tf, .pos and
+    .len lines and the document store entry of a document are written as soon as the document is added, only the
+    document frequencies of the vocabulary are kept in memory. The .idf, .norm and .spell files are written by close,
+    the norms need the idf of the whole collection, so they are calculated in a second pass over the .tf file.
+    The document frequencies are written to a .df file, so that the idf can be calculated again when documents are
+    added. The words of the documents before stemming are written to a .words file with their stem and document
+    frequency, wildcard patterns are expanded over these words, see termDictionary.TermDictionary. A segment that is
+    added to an existing index only gets the .df and .words files, its idf, norms and spelling correction are part of
+    the whole index, see Index.addDocuments.
+    """
+    def __init__(self, path_to_files, segment=False):
+        """
+        Create the index files
+        :param path_to_files: path of the collection or segment without file ending
+        :type path_to_files: str
+        :param segment: boolean that indicates if the files are a segment of an existing index
+        :type segment: bool
+        :return: None
+        :rtype: None
+        """
+        self.path = path_to_files
+        self.segment = segment
+        self.tfFile = open(path_to_files + ".tf", "w")
+        self.posFile = open(path_to_files + ".pos", "w")
+        self.lenFile = open(path_to_files + ".len", "w")
+        self.documentStore = DocumentStoreWriter(path_to_files + ".docs")
+        # dict with the stemmed words as keys and the number of documents they appear in as value
+        self.vocab = defaultdict(int)
+        # dict with the words before stemming as keys and a list of their stem and the number of documents they appear
+        # in as value, see countWords
+        self.words = dict()
+        self.numDocs = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            # the collection wasn't written completely, so only the files are closed
+            self.closeFiles()
+
+    def add(self, ind, word_count, positions, original, stems=None):
+        """
+        Write a document to the index files
+        :param ind: document index
+        :type ind: str
+        :param word_count: dict with the stemmed words as keys and their number of occurrences as value
+        :type word_count: dict[str, int]
+        :param positions: dict with the stemmed words as keys and the sorted list of their positions as value
+        :type positions: dict[str, list[int]]
+        :param original: the headline and text of the document
+        :type original: (str, str)
+        :param stems: dict with the words of the document as keys and their stem as value, None if the words are
+         added with addWords
+        :type stems: dict[str, str] or None
+        :return: None
+        :rtype: None
+        """
+        if stems is not None:
+            countWords(self.words, stems)
+        for key in word_count.keys():
+            self.vocab[key] += 1
+        self.numDocs += 1
+        self.tfFile.writelines(formatTabSeparated(".tf", {ind: calculateDocumentTF(word_count)}))
+        self.posFile.writelines(formatTabSeparated(".pos", {ind: positions}))
+        self.lenFile.writelines(formatTabSeparated(".len", {ind: (sum(word_count.values()),
+                                                                  max(word_count.values()))}))
+        self.documentStore.add(ind, *original)
+
+    def addWords(self, words):
+        """
+        Add the counted words of several documents, see countWords
+        :param words: dict with the words as keys and a list of their stem and the number of documents they appear in
+         as value
+        :type words: dict[str, list]
+        :return: None
+        :rtype: None
+        """
+        addWords(self.words, words)
+
+    def close(self):
+        """
+        Close the per-document files and write the .df and .words files and, if the files are not a segment, the .idf,
+        .norm and .spell files
+        :return: None
+        :rtype: None
+        """
+        if self.tfFile.closed:
+            return
+        self.closeFiles()
+        writeToFileTabSeparated(self.path + ".df", dict(sorted(self.vocab.items())))
+        writeToFileTabSeparated(self.path + ".words", dict(sorted(self.words.items())))
+        if self.segment:
+            return
+        idf = calculateIDF(self.vocab, self.numDocs)
+        writeToFileTabSeparated(self.path + ".idf", idf)
+        with open(self.path + ".norm", "w") as f:
+            for ind, tf_dict in iterateTF(self.path + ".tf"):
+                f.writelines(formatTabSeparated(".norm", calculateNorms({ind: tf_dict}, idf)))
+        writeToFileTabSeparated(self.path + ".spell", createDeletes(idf))
+
+    def closeFiles(self):
+        """
+        Close the per-document files
+        :return: None
+        :rtype: None
+        """
+        for f in (self.tfFile, self.posFile, self.lenFile, self.documentStore):
+            f.close()
+
+
+class SpimiWriter:
+    """
+    Class that writes the index files of a collection with single-pass in-memory indexing (SPIMI): the postings of the
+    added documents are collected per term in a block in memory, when the block and the counted words of the .words
+    file reach memoryBudget bytes, the terms are written to a run file and the words to a run of .words lines, both in
+    sorted order. The vocabulary isn't held in memory, the document frequency of a term is the number of its postings
+    in the runs. close merges the runs with a k-way merge, at most fanIn runs at once, if there are more runs, groups
+    of fanIn consecutive runs are first merged into larger runs. The merged runs are read twice, once for the .df file
+    and the sizes of the binary segment file and once for its postings, see binaryIndex.writeSegmentFile, the postings
+    of a term are copied run by run, so the merge only holds one term of every run in memory. The deletes of the
+    spelling correction are written to runs of .spell lines as well. The memory needed besides the budget is 16 bytes
+    per document for the lengths, largest word counts and norms. The files are the same as the ones of IndexWriter
+    after binaryIndex.compileSegment, only the lines of the .spell file are sorted by the deletes.
+    """
+    def __init__(self, path_to_files, memoryBudget, segment=False, fanIn=MERGE_FAN_IN):
+        """
+        Create the index files
+        :param path_to_files: path of the collection or segment without file ending
+        :type path_to_files: str
+        :param memoryBudget: the number of bytes of postings and counted words that are held in memory, they are
+         written to runs when the budget is reached
+        :type memoryBudget: int
+        :param segment: boolean that indicates if the files are a segment of an existing index
+        :type segment: bool
+        :param fanIn: largest number of runs that are merged at once
+        :type fanIn: int
+        :return: None
+        :rtype: None
+        """
+        self.path = path_to_files
+        self.memoryBudget = memoryBudget
+        self.segment = segment
+        self.fanIn = fanIn
+        # the document indices in the order of the documents, separated by newlines, see writeSegmentFile
+        self.documentFile = open(path_to_files + ".ids", "w")
+        self.documentStore = DocumentStoreWriter(path_to_files + ".docs")
+        # the counted words of the documents of the current block, see countWords
+        self.words = dict()
+        self.lengths = array("I")
+        self.maxCounts = array("I")
+        self.numDocs = 0
+        self.numPositions = 0
+        # dict with the terms as keys and a tuple of the document id, TF, position count and position arrays of their
+        # postings in the current block as value
+        self.block = dict()
+        # estimated number of bytes of the current block
+        self.blockBytes = 0
+        # the paths of the runs of postings that are left to merge in the order of their documents
+        self.runs = []
+        # the paths of the runs of .words lines that are left to merge in the order of their documents
+        self.wordRuns = []
+        # the paths of the runs of .spell lines that are left to merge in the order of their terms
+        self.spellRuns = []
+        # the paths of all run files that were written, including the ones that were merged into larger runs
+        self.runFiles = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.closeFiles()
+            self.removeTemporaryFiles()
+
+    def add(self, ind, word_count, positions, original, stems=None):
+        """
+        Add a document to the current block, the block is written to a run file when it is larger than the memory
+        budget
+        :param ind: document index
+        :type ind: str
+        :param word_count: dict with the stemmed words as keys and their number of occurrences as value
+        :type word_count: dict[str, int]
+        :param positions: dict with the stemmed words as keys and the sorted list of their positions as value
+        :type positions: dict[str, list[int]]
+        :param original: the headline and text of the document
+        :type original: (str, str)
+        :param stems: dict with the words of the document as keys and their stem as value, None if the words are
+         added with addWords
+        :type stems: dict[str, str] or None
+        :return: None
+        :rtype: None
+        """
+        if stems is not None:
+            countWords(self.words, stems)
+        doc_id = self.numDocs
+        max_count = max(word_count.values())
+        for key, count in word_count.items():
+            postings = self.block.get(key)
+            if postings is None:
+                postings = self.block[key] = (array("I"), array("d"), array("I"), array("I"))
+                self.blockBytes += TERM_BYTES
+            # the same TF as calculateDocumentTF
+            postings[0].append(doc_id)
+            postings[1].append(count / max_count)
+            postings[2].append(len(positions[key]))
+            postings[3].extend(positions[key])
+            self.blockBytes += POSTING_BYTES + POSITION_BYTES * len(positions[key])
+            self.numPositions += len(positions[key])
+        self.lengths.append(sum(word_count.values()))
+        self.maxCounts.append(max_count)
+        self.documentFile.write(("\n" if doc_id else "") + ind)
+        self.documentStore.add(ind, *original)
+        self.numDocs += 1
+        if self.blockBytes + WORD_BYTES * len(self.words) >= self.memoryBudget:
+            self.writeRun()
+
+    def addWords(self, words):
+        """
+        Add the counted words of several documents, see countWords
+        :param words: dict with the words as keys and a list of their stem and the number of documents they appear in
+         as value
+        :type words: dict[str, list]
+        :return: None
+        :rtype: None
+        """
+        addWords(self.words, words)
+
+    def writeRun(self):
+        """
+        Write the current block to a new run file with its terms in sorted order and the counted words to a new run of
+        .words lines, then start an empty block
+        :return: None
+        :rtype: None
+        """
+        path = self.newRun()
+        self.runs.append(path)
+        with open(path, "wb") as f:
+            for key in sorted(self.block):
+                writeRunTerm(f, key, *self.block[key])
+        path = self.newRun(".words")
+        self.wordRuns.append(path)
+        writeToFileTabSeparated(path, dict(sorted(self.words.items())))
+        self.block = dict()
+        self.blockBytes = 0
+        self.words = dict()
+
+    def newRun(self, extension=""):
+        """
+        Return the path of a new run file
+        :param extension: "" for a run of postings, ".words" or ".spell" for a run of the lines of these files
+        :type extension: str
+        :return: the path
+        :rtype: str
+        """
+        path = "%s.run%d%s" % (self.path, len(self.runFiles), extension)
+        self.runFiles.append(path)
+        return path
+
+    def mergeRuns(self, runs, extension=""):
+        """
+        Merge groups of fanIn consecutive runs into new runs until at most fanIn runs are left, see writeMergedRun. A
+        term may appear several times in a merged run of postings, once for every run it was in. The runs hold
+        consecutive documents, so the postings of a term stay in the order of the documents.
+        :param runs: the paths of the runs in the order of their documents or terms
+        :type runs: list[str]
+        :param extension: "" for runs of postings, ".words" or ".spell" for runs of the lines of these files
+        :type extension: str
+        :return: the paths of the remaining runs
+        :rtype: list[str]
+        """
+        while len(runs) > self.fanIn:
+            merged = []
+            for start in range(0, len(runs), self.fanIn):
+                group = runs[start:start + self.fanIn]
+                if len(group) == 1:
+                    merged.append(group[0])
+                    continue
+                path = self.newRun(extension)
+                writeMergedRun(path, group, extension)
+                merged.append(path)
+                for run in group:
+                    os.remove(run)
+            runs = merged
+        return runs
+
+    def close(self):
+        """
+        Write the last block, merge the runs into the binary segment file and write the .df and .words files and, if
+        the files are not a segment, the .idf, .norm and .spell files
+        :return: None
+        :rtype: None
+        """
+        if self.documentFile.closed:
+            return
+        try:
+            if self.block or self.words:
+                self.writeRun()
+            self.closeFiles()
+            self.wordRuns = self.mergeRuns(self.wordRuns, ".words")
+            writeMergedRun(self.path + ".words", self.wordRuns, ".words")
+            self.runs = self.mergeRuns(self.runs)
+            num_terms, term_bytes, num_postings = self.writeDF()
+            norms = None
+            if not self.segment:
+                self.writeIDF()
+                # the norms are summed term by term in the sorted order of the terms like in calculateNorms
+                norms = array("d", bytes(8 * self.numDocs))
+            writeSegmentFile(self.path, self.path + ".ids", num_terms, term_bytes, num_postings, self.numPositions,
+                             self.lengths, self.maxCounts, self.mergedPostings(norms))
+            if norms is not None:
+                with open(self.path + ".ids", "r") as f, open(self.path + ".norm", "w") as out:
+                    for line, norm in zip(f, norms):
+                        out.writelines(formatTabSeparated(".norm", {line.rstrip("\n"): math.sqrt(norm)}))
+                self.spellRuns = self.mergeRuns(self.spellRuns, ".spell")
+                writeMergedRun(self.path + ".spell", self.spellRuns, ".spell")
+        finally:
+            self.closeFiles()
+            self.removeTemporaryFiles()
+
+    def writeDF(self):
+        """
+        Write the .df file from the merged runs, only the terms and the number of their postings are read
+        :return: the number of terms, the number of bytes of the terms encoded with UTF-8 and separated by newlines and
+         the number of postings
+        :rtype: (int, int, int)
+        """
+        num_terms = 0
+        term_bytes = 0
+        num_postings = 0
+        with open(self.path + ".df", "w") as f:
+            for key, counts in itertools.groupby(mergeRunFiles(self.runs, readRunTerms), key=itemgetter(0)):
+                df = sum(count for _, count in counts)
+                f.writelines(formatTabSeparated(".df", {key: df}))
+                num_terms += 1
+                term_bytes += len(key.encode("utf-8"))
+                num_postings += df
+        return num_terms, term_bytes + max(num_terms - 1, 0), num_postings
+
+    def writeIDF(self):
+        """
+        Write the .idf file from the .df file like calculateIDF and the deletes of the spelling correction to runs of
+        .spell lines, the deletes of consecutive terms are collected until they reach the memory budget, see
+        spelling.createDeletes
+        :return: None
+        :rtype: None
+        """
+        deletes = dict()
+        num_terms = 0
+        with open(self.path + ".df", "r") as f, open(self.path + ".idf", "w") as out:
+            for line in f:
+                key, value = line.split("\t")
+                out.writelines(formatTabSeparated(".idf", {key: math.log(self.numDocs / int(value))}))
+                addDeletes(deletes, [key])
+                num_terms += 1
+                if DELETE_TERM_BYTES * num_terms >= self.memoryBudget:
+                    self.writeSpellRun(deletes)
+                    deletes = dict()
+                    num_terms = 0
+        if deletes:
+            self.writeSpellRun(deletes)
+
+    def writeSpellRun(self, deletes):
+        """
+        Write the deletes of consecutive terms to a new run of .spell lines in the sorted order of the deletes
+        :param deletes: dict with the deletes as keys and the list of words as value
+        :type deletes: dict[str, list[str]]
+        :return: None
+        :rtype: None
+        """
+        path = self.newRun(".spell")
+        self.spellRuns.append(path)
+        writeToFileTabSeparated(path, dict(sorted(deletes.items())))
+
+    def mergedPostings(self, norms=None):
+        """
+        Merge the runs into the postings of the binary segment file and add the squared tf.idf weights of the postings
+        to the norms of their documents, the idf of a term is read from the .idf file, which has the same order
+        :param norms: the squared norms of the documents by document id, None if the files are a segment
+        :type norms: array[float] or None
+        :return: iterator over (term, document ids, TF values, position counts, positions) tuples in the order of the
+         terms
+        :rtype: iterator[tuple[str, array[int], array[float], array[int], array[int]]]
+        """
+        idf_file = None if norms is None else open(self.path + ".idf", "r")
+        try:
+            current = None
+            weight = 0.0
+            for key, docs, tfs, counts, positions in mergeRunFiles(self.runs):
+                if idf_file is not None:
+                    if key != current:
+                        current = key
+                        weight = float(idf_file.readline().split("\t")[1])
+                    for doc_id, value in zip(docs, tfs):
+                        norms[doc_id] += (value * weight) ** 2
+                yield key, docs, tfs, counts, positions
+        finally:
+            if idf_file is not None:
+                idf_file.close()
+
+    def closeFiles(self):
+        """
+        Close the document files
+        :return: None
+        :rtype: None
+        """
+        self.documentFile.close()
+        self.documentStore.close()
+
+    def removeTemporaryFiles(self):
+        """
+        Remove the run files and the file with the document indices
+        :return: None
+        :rtype: None
+        """
+        for path in self.runFiles + [self.path + ".ids"]:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def writeRunTerm(f, key, docs, tfs, counts, positions):
+    """
+    Write the postings of a term to a run file, see readRun
+    :param f: the run file opened for writing in binary mode
+    :type f: io.BufferedWriter
+    :param key: the term
+    :type key: str
+    :param docs: the document ids
+    :type docs: array[int]
+    :param tfs: the TF values
+    :type tfs: array[float]
+    :param counts: the number of positions of every posting
+    :type counts: array[int]
+    :param positions: the positions
+    :type positions: array[int]
+    :return: None
+    :rtype: None
+    """
+    encoded = key.encode("utf-8")
+    f.write(RUN_HEADER.pack(len(encoded), len(docs), len(positions)))
+    f.write(encoded)
+    for values in (docs, tfs, counts, positions):
+        values.tofile(f)
+
+
+def writeMergedRun(path, runs, extension=""):
+    """
+    Merge runs into a new file, see mergeRunFiles and mergeTextRuns
+    :param path: path to the new file
+    :type path: str
+    :param runs: the paths of the runs in the order of their documents or terms
+    :type runs: list[str]
+    :param extension: "" for runs of postings, ".words" or ".spell" for runs of the lines of these files
+    :type extension: str
+    :return: None
+    :rtype: None
+    """
+    if extension:
+        with open(path, "w") as f:
+            f.writelines(mergeTextRuns(runs, extension))
+        return
+    with open(path, "wb") as f:
+        for postings in mergeRunFiles(runs):
+            writeRunTerm(f, *postings)
+
+
+def mergeRunFiles(paths, read=None):
+    """
+    Merge run files with a k-way merge, the terms of the runs are read one by one, see readRun. Terms that appear in
+    several runs are returned in the order of the runs. All run files are closed when the merge is done or stopped.
+    :param paths: paths to the run files in the order of their documents
+    :type paths: list[str]
+    :param read: function that reads the terms of a run file, readRun if None, e.g. readRunTerms
+    :type read: function or None
+    :return: iterator over (term, document ids, TF values, position counts, positions) tuples in the order of the terms
+    :rtype: iterator[tuple[str, array[int], array[float], array[int], array[int]]]
+    """
+    runs = [(read or readRun)(path) for path in paths]
+    try:
+        yield from heapq.merge(*runs, key=itemgetter(0))
+    finally:
+        for run in runs:
+            run.close()
+
+
+def readRun(path):
+    """
+    Read the terms of a run file of SpimiWriter one by one
+    :param path: path to the run file
+    :type path: str
+    :return: iterator over (term, document ids, TF values, position counts, positions) tuples in the order of the terms
+    :rtype: iterator[tuple[str, array[int], array[float], array[int], array[int]]]
+    """
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(RUN_HEADER.size)
+            if not header:
+                return
+            key_size, num_postings, num_positions = RUN_HEADER.unpack(header)
+            key = f.read(key_size).decode("utf-8")
+            arrays = []
+            for item_format, size in (("I", num_postings), ("d", num_postings), ("I", num_postings),
+                                      ("I", num_positions)):
+                values = array(item_format)
+                values.fromfile(f, size)
+                arrays.append(values)
+            yield (key, *arrays)
+
+
+def readRunTerms(path):
+    """
+    Read the terms of a run file of SpimiWriter and the number of their postings, the postings are skipped
+    :param path: path to the run file
+    :type path: str
+    :return: iterator over (term, number of postings) tuples in the order of the terms
+    :rtype: iterator[tuple[str, int]]
+    """
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(RUN_HEADER.size)
+            if not header:
+                return
+            key_size, num_postings, num_positions = RUN_HEADER.unpack(header)
+            key = f.read(key_size).decode("utf-8")
+            # a posting takes 16 bytes, a uint32 document id, a float64 TF and a uint32 position count
+            f.seek(16 * num_postings + 4 * num_positions, os.SEEK_CUR)
+            yield key, num_postings
+
+
+def mergeTextRuns(paths, extension):
+    """
+    Merge runs of the lines of a .words or .spell file with a k-way merge, the lines of a key that appears in several
+    runs are combined: the numbers of documents of a word are added and the words of a delete are joined in the order
+    of the runs
+    :param paths: paths to the runs in the order of their documents or terms
+    :type paths: list[str]
+    :param extension: ".words" or ".spell"
+    :type extension: str
+    :return: iterator over the lines in the order of their keys
+    :rtype: iterator[str]
+    """
+    runs = [readTextRun(path) for path in paths]
+    try:
+        for key, lines in itertools.groupby(heapq.merge(*runs, key=itemgetter(0)), key=itemgetter(0)):
+            values = [value for _, value in lines]
+            if len(values) == 1:
+                value = values[0]
+            elif extension == ".words":
+                stem = values[0].split("\t")[0]
+                value = stem + "\t" + str(sum(int(value.split("\t")[1]) for value in values))
+            else:
+                value = ",".join(values)
+            yield key + "\t" + value + "\n"
+    finally:
+        for run in runs:
+            run.close()
+
+
+def readTextRun(path):
+    """
+    Read the lines of a run of .words or .spell lines one by one
+    :param path: path to the run
+    :type path: str
+    :return: iterator over (key, rest of the line without the newline) tuples in the order of the keys
+    :rtype: iterator[tuple[str, str]]
+    """
+    with open(path, "r") as f:
+        for line in f:
+            key, value = line[:-1].split("\t", 1)
+            yield key, value
+
+
+def initWorker(analyzer):
+    """
+    Set the analyzer of a worker process of a parallel build, the words that the worker stems are collected, so that
+    they can be sent back with the results of a batch
+    :param analyzer: the analyzer with a stem cache
+    :type analyzer: Analyzer
+    :return: None
+    :rtype: None
+    """
+    global workerAnalyzer
+    workerAnalyzer = analyzer
+    workerAnalyzer.stemCache.added = dict()
+
+
+def tokenizeBatch(batch):
+    """
+    Preprocess a batch of documents in a worker process of a parallel build, the stems are cached for all batches of
+    the worker
+    :param batch: list of (document index, list of sentences) tuples
+    :type batch: list[tuple[str, list[str]]]
+    :return: list of (document index, dict with the stemmed words as keys and their number of occurrences as value,
+     dict with the stemmed words as keys and their positions as value) tuples, dict with the words that were stemmed
+     for the batch as keys and their stem as value and the counted words of the documents of the batch, see countWords
+    :rtype: (list[tuple[str, dict[str, int], dict[str, list[int]]]], dict[str, str], dict[str, list])
+    """
+    results = []
+    words = dict()
+    for ind, sentences in batch:
+        stems = dict()
+        word_count, positions = preprocessDocument(sentences, stems, positions=True, analyzer=workerAnalyzer)
+        results.append((ind, word_count, positions))
+        countWords(words, stems)
+    added = workerAnalyzer.stemCache.added
+    workerAnalyzer.stemCache.added = dict()
+    return results, added, words
+
+
+def createWriter(path_to_files, memoryBudget=None, segment=False):
+    """
+    Create the writer of the index files, a SpimiWriter if a memory budget is given, otherwise an IndexWriter
+    :param path_to_files: path of the collection or segment without file ending
+    :type path_to_files: str
+    :param memoryBudget: number of bytes of postings and words that are held in memory
+    :type memoryBudget: int or None
+    :param segment: boolean that indicates if the files are a segment of an existing index
+    :type segment: bool
+    :return: the writer
+    :rtype: IndexWriter or SpimiWriter
+    """
+    if memoryBudget is None:
+        return IndexWriter(path_to_files, segment)
+    return SpimiWriter(path_to_files, memoryBudget, segment)
+
+
+def buildIndex(path_to_files, workers=1, batchSize=64, memoryBudget=None, analyzer=None):
+    """
+    Create the index files of a collection with a generator pipeline: the XML file is parsed in chunks, every document
+    is preprocessed and written as soon as it is parsed. The memory needed depends on the size of the vocabulary and
+    of the largest document, not on the number of documents. The documents get their integer ids in the order of their
+    indices like in parse_xml, a file whose documents are not sorted is sorted first, see xmlParser.iterate_sorted_xml.
+    If workers is larger than 1, batches of batchSize documents are preprocessed by a pool of worker processes, see
+    writeDocuments.
+    If memoryBudget is given, the postings are inverted in blocks of about memoryBudget bytes and the binary segment
+    file is written instead of the .tf, .pos and .len files, see SpimiWriter.
+    :param path_to_files: path of the collection without file ending, the collection is read from path_to_files.xml
+    :type path_to_files: str
+    :param workers: number of worker processes
+    :type workers: int
+    :param batchSize: number of documents that are sent to a worker at once
+    :type batchSize: int
+    :param memoryBudget: number of bytes of postings and words that are held in memory, None to write the text files
+    :type memoryBudget: int or None
+    :param analyzer: the analyzer that turns the text into words, None for the default analyzer
+    :type analyzer: Analyzer or None
+    :return: None
+    :rtype: None
+    """
+    with createWriter(path_to_files, memoryBudget) as writer:
+        writeDocuments(writer, iterate_sorted_xml(path_to_files + ".xml"), workers, batchSize, analyzer)
+
+
+def buildSegment(path_to_segment, documents, workers=1, batchSize=64, memoryBudget=None, analyzer=None):
+    """
+    Write the files of a segment that is added to an existing index, see buildIndex
+    :param path_to_segment: path of the segment without file ending
+    :type path_to_segment: str
+    :param documents: iterator over (document index, list of sentences, (headline, text)) tuples, see
+     xmlParser.iterate_xml
+    :type documents: iterator[tuple[str, list[str], tuple[str, str]]]
+    :param workers: number of worker processes
+    :type workers: int
+    :param batchSize: number of documents that are sent to a worker at once
+    :type batchSize: int
+    :param memoryBudget: number of bytes of postings and words that are held in memory, None to write the text files
+    :type memoryBudget: int or None
+    :param analyzer: the analyzer that turns the text into words, None for the default analyzer
+    :type analyzer: Analyzer or None
+    :return: number of documents of the segment
+    :rtype: int
+    """
+    with createWriter(path_to_segment, memoryBudget, segment=True) as writer:
+        writeDocuments(writer, documents, workers, batchSize, analyzer)
+    return writer.numDocs
+
+
+def writeDocuments(writer, documents, workers=1, batchSize=64, analyzer=None):
+    """
+    Preprocess the documents and add them to the writer. If workers is larger than 1, batches of batchSize documents
+    are preprocessed by a pool of worker processes, at most 2 * workers batches are in flight. The batches are written
+    in the order of the documents, so the files are identical to the ones of a single process.
+    :param writer: the writer of the index files
+    :type writer: IndexWriter or SpimiWriter
+    :param documents: iterator over (document index, list of sentences, (headline, text)) tuples, see
+     xmlParser.iterate_xml
+    :type documents: iterator[tuple[str, list[str], tuple[str, str]]]
+    :param workers: number of worker processes
+    :type workers: int
+    :param batchSize: number of documents that are sent to a worker at once
+    :type batchSize: int
+    :param analyzer: the analyzer that turns the text into words, None for the default analyzer. Only the words that
+     are not in its stem cache are stemmed, the workers get a copy of the cache and send back the words they stemmed,
+     which are added to the cache.
+    :type analyzer: Analyzer or None
+    :return: None
+    :rtype: None
+    """
+    analyzer = analyzer or DEFAULT_ANALYZER
+    if analyzer.stemCache is None:
+        analyzer = analyzer.withStemCache(StemCache())
+    if workers <= 1:
+        for document in tokenizeDocuments(documents, analyzer):
+            writer.add(*document)
+        return
+    # the workers get the words of the .stems file with the cache, and the stems they send back are added to them
+    analyzer.stemCache.load(analyzer.stemmer)
+    with multiprocessing.Pool(workers, initWorker, (analyzer,)) as pool:
+        # the results of the batches that are being preprocessed and the headlines and texts of their documents, the
+        # originals stay in this process because the workers don't need them
+        pending = deque()
+        while True:
+            batch = list(itertools.islice(documents, batchSize))
+            if batch:
+                result = pool.apply_async(tokenizeBatch, ([(ind, sentences) for ind, sentences, _ in batch],))
+                pending.append((result, [original for _, _, original in batch]))
+            if pending and (not batch or len(pending) >= 2 * workers):
+                result, originals = pending.popleft()
+                results, added, words = result.get()
+                analyzer.stemCache.update(added)
+                writer.addWords(words)
+                for (ind, word_count, positions), original in zip(results, originals):
+                    # documents without any words are skipped like in tokenizeDocuments
+                    if word_count:
+                        writer.add(ind, word_count, positions, original)
+            elif not batch:
+                break
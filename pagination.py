@@ -0,0 +1,95 @@
+import itertools
+import threading
+from collections import OrderedDict
+
+
+class CursorStore:
+    """
+    Class that holds the state of paginated queries. A cursor keeps the ranked top N (document id, score) tuples of a
+    query, so the following pages are slices of that list. The number of live cursors is bounded, the least recently
+    used cursor is dropped first.
+    """
+    def __init__(self, maxCursors=1000):
+        """
+        Initialize the store
+        :param maxCursors: maximal number of live cursors
+        :type maxCursors: int
+        :return: None
+        :rtype: None
+        """
+        self.maxCursors = maxCursors
+        # OrderedDict that holds the cursor states from least to most recently used
+        self.cursors = OrderedDict()
+        self.counter = itertools.count(1)
+        self.lock = threading.Lock()
+
+    def create(self, state):
+        """
+        Store the state of a new query
+        :param state: dict with the query, the index generation and the ranked top N
+        :type state: dict
+        :return: id of the cursor
+        :rtype: str
+        """
+        with self.lock:
+            cursorId = "c%d" % next(self.counter)
+            self.cursors[cursorId] = state
+            while len(self.cursors) > self.maxCursors:
+                self.cursors.popitem(last=False)
+            return cursorId
+
+    def get(self, cursorId):
+        """
+        Return the state of a cursor and mark it as most recently used
+        :param cursorId: id of the cursor
+        :type cursorId: str
+        :return: the state or None if the cursor doesn't exist (anymore)
+        :rtype: dict or None
+        """
+        with self.lock:
+            state = self.cursors.get(cursorId)
+            if state is not None:
+                self.cursors.move_to_end(cursorId)
+            return state
+
+    def remove(self, cursorId):
+        """
+        Drop a cursor, e.g. after its last page was fetched
+        :param cursorId: id of the cursor
+        :type cursorId: str
+        :return: None
+        :rtype: None
+        """
+        with self.lock:
+            self.cursors.pop(cursorId, None)
+
+    def __len__(self):
+        return len(self.cursors)
+
+
+def encodeCursor(cursorId, offset):
+    """
+    Create the cursor string that is handed to the client, it names the cursor state and the next result
+    :param cursorId: id of the cursor state
+    :type cursorId: str
+    :param offset: number of results that were already returned
+    :type offset: int
+    :return: cursor string
+    :rtype: str
+    """
+    return "%s:%d" % (cursorId, offset)
+
+
+def decodeCursor(cursor):
+    """
+    Split a cursor string into the cursor id and the offset
+    :param cursor: cursor string, see encodeCursor
+    :type cursor: str
+    :raises ValueError: if the cursor string is malformed
+    :return: (cursor id, offset)
+    :rtype: (str, int)
+    """
+    cursorId, _, offset = cursor.partition(":")
+    if not cursorId or not offset.isdigit():
+        raise ValueError("Malformed cursor: " + str(cursor))
+    return cursorId, int(offset)
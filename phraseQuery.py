@@ -0,0 +1,104 @@
+from bisect import bisect_left
+from operator import itemgetter
+
+
+def gallopingSearch(postingsList, target, low):
+    """
+    Find the first entry of a postings list at or after low with a document id >= target. The step size is doubled
+    until the target is passed, then the last step is searched with a binary search, so skipping far ahead costs
+    O(log distance) instead of O(distance).
+    :param postingsList: list of (document id, value) tuples sorted by document id
+    :type postingsList: list[tuple]
+    :param target: the document id to search for
+    :type target: int
+    :param low: position to start the search at
+    :type low: int
+    :return: position of the first entry with a document id >= target, len(postingsList) if there is none
+    :rtype: int
+    """
+    step = 1
+    high = low
+    while high < len(postingsList) and postingsList[high][0] < target:
+        low = high + 1
+        high += step
+        step *= 2
+    return bisect_left(postingsList, target, lo=low, hi=min(high, len(postingsList)), key=itemgetter(0))
+
+
+def intersectPostings(postingsLists):
+    """
+    Intersect postings lists, starting from the rarest (shortest) list. Every document id of the current result is
+    searched in the next list with a galloping search, so long lists are mostly skipped.
+    :param postingsLists: list of postings lists of (document id, value) tuples sorted by document id
+    :type postingsLists: list[list[tuple]]
+    :return: sorted list of the document ids that appear in every list
+    :rtype: list[int]
+    """
+    if not postingsLists:
+        return []
+    postingsLists = sorted(postingsLists, key=len)
+    result = [doc_id for doc_id, _ in postingsLists[0]]
+    for postingsList in postingsLists[1:]:
+        intersection = []
+        position = 0
+        for doc_id in result:
+            position = gallopingSearch(postingsList, doc_id, position)
+            if position == len(postingsList):
+                break
+            if postingsList[position][0] == doc_id:
+                intersection.append(doc_id)
+        result = intersection
+        if not result:
+            break
+    return result
+
+
+def phraseFrequency(positionLists):
+    """
+    Count how often the words occur as a phrase, i.e. word i at position p + i for every word i. The positions of the
+    word with the fewest occurrences are checked against the positions of the other words.
+    :param positionLists: list with the sorted positions of every phrase word in the document, in phrase order
+    :type positionLists: list[list[int]]
+    :return: number of occurrences of the phrase
+    :rtype: int
+    """
+    rarest = min(range(len(positionLists)), key=lambda i: len(positionLists[i]))
+    position_sets = [set(positions) for positions in positionLists]
+    count = 0
+    for position in positionLists[rarest]:
+        start = position - rarest
+        if all(start + i in position_sets[i] for i in range(len(positionLists))):
+            count += 1
+    return count
+
+
+def proximityFrequency(positionLists, window):
+    """
+    Count the windows in which all words occur within window words of each other, i.e. the distance between the first
+    and the last word of the window is at most window. The positions of all words are merged and the smallest window
+    covering every word is searched for every start position.
+    :param positionLists: list with the sorted positions of every word in the document
+    :type positionLists: list[list[int]]
+    :param window: maximal distance between the first and the last word
+    :type window: int
+    :return: number of start positions that begin such a window
+    :rtype: int
+    """
+    merged = sorted((position, i) for i, positions in enumerate(positionLists) for position in positions)
+    counts = [0] * len(positionLists)
+    covered = 0
+    count = 0
+    end = 0
+    for start in range(len(merged)):
+        # extend the window until every word is covered or the window gets too large
+        while end < len(merged) and covered < len(positionLists) and merged[end][0] - merged[start][0] <= window:
+            counts[merged[end][1]] += 1
+            if counts[merged[end][1]] == 1:
+                covered += 1
+            end += 1
+        if covered == len(positionLists):
+            count += 1
+        counts[merged[start][1]] -= 1
+        if counts[merged[start][1]] == 0:
+            covered -= 1
+    return count
@@ -0,0 +1,134 @@
+from itertools import accumulate
+
+try:
+    import numpy as np
+except ImportError:
+    # numpy is optional, without it the variable-byte codes are decoded byte by byte
+    np = None
+
+# table that clears the stop bit of every byte, see decodeVByte
+CLEAR_STOP_BIT = bytes(range(128)) * 2
+
+
+def encodeVByte(values):
+    """
+    Encode non-negative integers with the variable-byte code: every integer is split into groups of 7 bits, lowest
+    group first, and the last byte of an integer has the stop bit 0x80 set. Small integers like the gaps between the
+    document ids of a frequent word take a single byte.
+    :param values: the integers
+    :type values: iterable[int]
+    :return: the code
+    :rtype: bytearray
+    """
+    data = bytearray()
+    for value in values:
+        while value >= 128:
+            data.append(value & 0x7F)
+            value >>= 7
+        data.append(value | 0x80)
+    return data
+
+
+def decodeVByte(data):
+    """
+    Decode variable-byte coded integers, see encodeVByte. If every integer takes a single byte, the stop bits are
+    cleared with bytes.translate, otherwise the integers are decoded with numpy if it is available.
+    :param data: the code
+    :type data: bytes
+    :return: list of the integers
+    :rtype: list[int]
+    """
+    if not data:
+        return []
+    if min(data) >= 0x80:
+        return list(data.translate(CLEAR_STOP_BIT))
+    if np is not None:
+        code = np.frombuffer(data, dtype=np.uint8)
+        stops = np.flatnonzero(code >= 0x80)
+        starts = np.empty_like(stops)
+        starts[0] = 0
+        starts[1:] = stops[:-1] + 1
+        # the number of 7 bit groups below every byte of its integer
+        shifts = (np.arange(len(code)) - np.repeat(starts, stops - starts + 1)) * 7
+        return np.add.reduceat((code & 0x7F).astype(np.int64) << shifts, starts).tolist()
+    values = []
+    value = 0
+    shift = 0
+    for byte in data:
+        if byte >= 0x80:
+            values.append(value | ((byte & 0x7F) << shift))
+            value = 0
+            shift = 0
+        else:
+            value |= byte << shift
+            shift += 7
+    return values
+
+
+def encodePostings(docs, counts):
+    """
+    Encode the postings of a word as variable-byte coded pairs of the gap to the previous document id and the number of
+    occurrences of the word, the first gap is the first document id
+    :param docs: the sorted document ids
+    :type docs: list[int]
+    :param counts: the number of occurrences of the word in every document
+    :type counts: list[int]
+    :return: the code
+    :rtype: bytearray
+    """
+    pairs = []
+    previous = 0
+    for doc, count in zip(docs, counts):
+        pairs.append(doc - previous)
+        pairs.append(count)
+        previous = doc
+    return encodeVByte(pairs)
+
+
+def decodePostings(data):
+    """
+    Decode the postings of a word, see encodePostings
+    :param data: the code
+    :type data: bytes
+    :return: list of the document ids and list of the number of occurrences
+    :rtype: (list[int], list[int])
+    """
+    pairs = decodeVByte(data)
+    return list(accumulate(pairs[0::2])), pairs[1::2]
+
+
+def encodePositions(positionLists):
+    """
+    Encode the positions of a word in several documents, the positions of every document are coded as gaps to the
+    previous position, the first gap of a document is its first position
+    :param positionLists: the sorted positions of the word in every document
+    :type positionLists: list[list[int]]
+    :return: the code
+    :rtype: bytearray
+    """
+    gaps = []
+    for positions in positionLists:
+        previous = 0
+        for position in positions:
+            gaps.append(position - previous)
+            previous = position
+    return encodeVByte(gaps)
+
+
+def decodePositions(data, counts):
+    """
+    Decode the positions of a word, see encodePositions
+    :param data: the code
+    :type data: bytes
+    :param counts: the number of positions of every document
+    :type counts: list[int]
+    :return: the sorted positions of the word in every document
+    :rtype: list[list[int]]
+    """
+    gaps = decodeVByte(data)
+    positionLists = []
+    start = 0
+    for count in counts:
+        positionLists.append(list(accumulate(gaps[start:start + count])))
+        start += count
+    return positionLists
@@ -0,0 +1,134 @@
+import sys
+import threading
+from collections import OrderedDict
+
+
+def estimateSize(key, value):
+    """
+    Estimates the number of bytes a cache entry occupies, this counts the key tuple with its words and the result list
+    with its tuples, document indices and scores
+    :param key: cache key, see QueryResultCache.createKey
+    :type key: tuple
+    :param value: list of (document index, score) tuples
+    :type value: list[tuple[str, float]]
+    :return: approximate size of the entry in bytes
+    :rtype: int
+    """
+    size = sys.getsizeof(key) + sys.getsizeof(key[0])
+    for word, weight in key[0]:
+        size += sys.getsizeof(word) + sys.getsizeof(weight)
+    size += sys.getsizeof(value)
+    for ind, score in value:
+        size += sys.getsizeof(ind) + sys.getsizeof(score)
+    return size
+
+
+class QueryResultCache:
+    """
+    Class that represents a bounded LRU cache for query results. The cache is bounded by the number of entries and by
+    the approximate number of bytes of all entries, the least recently used entries are evicted first.
+    The cache belongs to an index generation, once the index is created or read again all entries are dropped.
+    All methods can be called from several threads.
+    """
+    def __init__(self, maxEntries=1024, maxBytes=8 * 1024 * 1024):
+        """
+        Initialize the cache
+        :param maxEntries: maximal number of cached queries, 0 disables the cache
+        :type maxEntries: int
+        :param maxBytes: maximal approximate size of all cached queries in bytes
+        :type maxBytes: int
+        :return: None
+        :rtype: None
+        """
+        self.maxEntries = maxEntries
+        self.maxBytes = maxBytes
+        # OrderedDict that holds the entries from least to most recently used, values are (result, size) tuples
+        self.entries = OrderedDict()
+        self.bytes = 0
+        # generation of the index the cached results belong to
+        self.generation = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def createKey(queryTf, k):
+        """
+        Create the cache key of a query, this is the normalized tf of the stemmed query words sorted by word, so queries
+        with the same words in a different order or in a different inflection share the same entry
+        :param queryTf: dict with the stemmed query words as keys and their TF as value
+        :type queryTf: dict[str, float]
+        :param k: number of requested results
+        :type k: int
+        :return: the cache key
+        :rtype: tuple
+        """
+        return tuple(sorted(queryTf.items())), k
+
+    def checkGeneration(self, generation):
+        """
+        Drop all entries if they belong to another index generation
+        :param generation: generation of the current index
+        :type generation: int
+        :return: None
+        :rtype: None
+        """
+        with self.lock:
+            if generation != self.generation:
+                self.entries.clear()
+                self.bytes = 0
+                self.generation = generation
+
+    def get(self, key):
+        """
+        Return the cached result for the key and mark it as most recently used
+        :param key: cache key, see createKey
+        :type key: tuple
+        :return: copy of the cached list of (document index, score) tuples or None if the key isn't cached
+        :rtype: list[tuple[str, float]] or None
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return list(entry[0])
+
+    def put(self, key, value):
+        """
+        Add a result to the cache and evict the least recently used entries until both limits are met again.
+        Results that are larger than the byte limit on their own are not cached.
+        :param key: cache key, see createKey
+        :type key: tuple
+        :param value: list of (document index, score) tuples
+        :type value: list[tuple[str, float]]
+        :return: None
+        :rtype: None
+        """
+        if self.maxEntries <= 0:
+            return
+        size = estimateSize(key, value)
+        if size > self.maxBytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.bytes -= self.entries.pop(key)[1]
+            self.entries[key] = (list(value), size)
+            self.bytes += size
+            while len(self.entries) > self.maxEntries or self.bytes > self.maxBytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def stats(self):
+        """
+        Return the counters of the cache
+        :return: dict with the number of entries, their approximate size in bytes, hits, misses and evictions
+        :rtype: dict[str, int]
+        """
+        with self.lock:
+            return {"entries": len(self.entries), "bytes": self.bytes, "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions}
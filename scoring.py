@@ -0,0 +1,189 @@
+import math
+
+from binaryIndex import LazyDict
+from searchEngineUtil import calculateDocumentTF
+from topK import calculateMaxWeights
+from vector import Vector
+
+
+class Scorer:
+    """
+    Base class of the ranking functions. A ranking function is split into per-posting impacts, which are calculated
+    once per index, and query weights, the score of a document is the sum of query weight * impact over the query
+    words. This allows all scoring paths (postings accumulation, MaxScore, the numpy matrix) to use every ranking
+    function.
+    """
+    # name of the ranking function, the index caches the impacts under this name
+    name = None
+
+    def createPostings(self, index):
+        """
+        Calculate the impact of every posting of the index
+        :param index: the index of the collection
+        :type index: Index
+        :return: dict with the words as keys and the postings list of (document id, impact) as value, and a dict with
+         the words as keys and their largest impact as value
+        :rtype: (dict[str, list[tuple[int, float]]], dict[str, float])
+        """
+        raise NotImplementedError
+
+    def checkIndex(self, index):
+        """
+        Check that the index holds the data the ranking function needs
+        :param index: the index of the collection
+        :type index: Index
+        :raises ValueError: if the index lacks data of the ranking function
+        :return: None
+        :rtype: None
+        """
+        pass
+
+    def termImpacts(self, index, key):
+        """
+        Calculate the impacts of the postings of a single word without caching them in the index, this is used by the
+        shard workers, which only keep the postings of their documents, see shardedSearch.shardWorker
+        :param index: the index of the collection
+        :type index: Index
+        :param key: stemmed word of the vocabulary
+        :type key: str
+        :return: postings list of (document id, impact) tuples
+        :rtype: list[tuple[int, float]]
+        """
+        raise NotImplementedError
+
+    def queryWeights(self, queryCounts, index):
+        """
+        Calculate the weight of every query word
+        :param queryCounts: dict with the stemmed query words as keys and their number of occurrences as value
+        :type queryCounts: dict[str, int]
+        :param index: the index of the collection
+        :type index: Index
+        :return: dict with the query words as keys and their weight as value
+        :rtype: dict[str, float]
+        """
+        raise NotImplementedError
+
+    def queryKey(self, queryCounts):
+        """
+        Create the part of the cache key that identifies the query, queries with the same key get the same scores
+        :param queryCounts: dict with the stemmed query words as keys and their number of occurrences as value
+        :type queryCounts: dict[str, int]
+        :return: dict that identifies the query
+        :rtype: dict[str, float]
+        """
+        return dict(queryCounts)
+
+
+class CosineScorer(Scorer):
+    """
+    Class that represents the cosine similarity of tf.idf vectors, the same ranking as Vector.similarity
+    """
+    name = "cosine"
+
+    def createPostings(self, index):
+        """
+        The postings of the index already hold the tf.idf weights divided by the document norms
+        """
+        return index.postings, index.maxWeights
+
+    def termImpacts(self, index, key):
+        """
+        The postings of a lazily opened index are decoded without being cached
+        """
+        return index.decodePostings(key) if index.lazy else index.postings[key]
+
+    def queryWeights(self, queryCounts, index):
+        """
+        The query weights are the tf.idf weights of the query divided by the query norm
+        """
+        queryVector = Vector(index_name="query", tf=calculateDocumentTF(queryCounts), idf=index.idf)
+        if queryVector.norm == 0:
+            return dict()
+        return {key: value / queryVector.norm for key, value in queryVector.tf_idf.items()}
+
+    def queryKey(self, queryCounts):
+        """
+        The cosine similarity doesn't change if all query counts are multiplied, so the normalized tf is used
+        """
+        return calculateDocumentTF(queryCounts)
+
+
+class BM25Scorer(Scorer):
+    """
+    Class that represents the Okapi BM25 ranking function, it needs the raw term counts and document lengths of the
+    index
+    """
+    def __init__(self, k1=1.2, b=0.75):
+        """
+        Initialize the ranking function
+        :param k1: term frequency saturation
+        :type k1: float
+        :param b: document length normalization
+        :type b: float
+        :return: None
+        :rtype: None
+        """
+        self.k1 = k1
+        self.b = b
+        self.name = "bm25(k1=%r,b=%r)" % (k1, b)
+
+    def createPostings(self, index):
+        """
+        The impact of a posting is idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * document length / average length)),
+        with the BM25 idf log(1 + (N - df + 0.5) / (df + 0.5))
+        :raises ValueError: if the index has no document lengths
+        """
+        self.checkIndex(index)
+        if index.lazy:
+            # the impacts of a word are calculated when its postings are decoded
+            postings = LazyDict(index.postings, lambda key: self.termImpacts(index, key))
+            return postings, LazyDict(index.postings, lambda key: max([weight for _, weight in postings[key]]))
+        postings = dict()
+        for key in index.postings:
+            postings[key] = self.termImpacts(index, key)
+        return postings, calculateMaxWeights(postings)
+
+    def checkIndex(self, index):
+        """
+        BM25 needs the document lengths
+        """
+        if index.lengths is None:
+            raise ValueError("The index has no document lengths, create it again to use BM25")
+
+    def termImpacts(self, index, key):
+        """
+        Calculate the impacts of the postings of a word, see createPostings
+        """
+        counts = index.postingCounts(key)
+        num_docs = len(index.documents)
+        df = len(counts)
+        idf = math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+        impacts = []
+        for doc_id, tf in counts:
+            length_norm = 1 - self.b + self.b * index.lengths[index.documents[doc_id]] / index.averageLength
+            impacts.append((doc_id, idf * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)))
+        return impacts
+
+    def queryWeights(self, queryCounts, index):
+        """
+        Every occurrence of a word in the query counts once
+        """
+        return {key: float(value) for key, value in queryCounts.items() if key in index.postings}
+
+
+def createScorer(scorer):
+    """
+    Return the ranking function for a name or a Scorer
+    :param scorer: "cosine", "bm25" or a Scorer
+    :type scorer: str or Scorer
+    :raises ValueError: if the name is unknown
+    :return: the ranking function
+    :rtype: Scorer
+    """
+    if isinstance(scorer, Scorer):
+        return scorer
+    if scorer == "cosine":
+        return CosineScorer()
+    if scorer == "bm25":
+        return BM25Scorer()
+    raise ValueError("Unknown scorer: " + str(scorer))
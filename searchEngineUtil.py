@@ -1,16 +1,27 @@
 import math
-import string
-from stemming.porter2 import stem
 from collections import defaultdict
 
+from analyzer import DEFAULT_ANALYZER, StemCache
+from termDictionary import isWildcardTerm, normalizePattern
+
 
 def readFromFileTabSeparated(path):
     """
     Reads the data from a file with the given path, the data is tab separated.
     Different file types are read differently:
     - .idf files are read as a dictionary with the words as keys and the IDF as value
+    - .df files are read as a dictionary with the words as keys and the number of documents they appear in as value
+    - .norm files are read as a dictionary with the document index as key and the norm of its tf.idf vector as value
+    - .len files are read as a dictionary with the document index as key and a tuple of the document length (number of
+     words) and the largest word count of the document as value
+    - .pos files are read as a dictionary with the document index as key and as value a dictionary with the words as
+     keys and the list of their positions in the document as value
     - .tf files are read as a dictionary with the document index as key and as value a dictionary with the words as keys
      and the TF as value
+    - .spell files are read as a dictionary with the deletes of the spelling correction as keys and the list of words
+     they were created from as value
+    - .words files are read as a dictionary with the words of the documents before stemming as keys and a tuple of
+     their stem and the number of documents they appear in as value
     :param path: path to the file
     :type path: str
     :return: data from the file
@@ -25,6 +36,40 @@ def readFromFileTabSeparated(path):
                 value = value.replace("\n", "")
                 idf_dict[key] = float(value)
             return idf_dict
+    # check if path ends with .df
+    elif path.endswith(".df"):
+        with open(path, "r") as f:
+            df = dict()
+            for line in f:
+                key, value = line.split("\t")
+                df[key] = int(value)
+            return df
+    # check if path ends with .norm
+    elif path.endswith(".norm"):
+        with open(path, "r") as f:
+            norms = dict()
+            for line in f:
+                key, value = line.split("\t")
+                norms[key] = float(value)
+            return norms
+    # check if path ends with .len
+    elif path.endswith(".len"):
+        with open(path, "r") as f:
+            lengths = dict()
+            for line in f:
+                index, length, max_count = line.split("\t")
+                lengths[index] = (int(length), int(max_count))
+            return lengths
+    # check if path ends with .pos
+    elif path.endswith(".pos"):
+        with open(path, "r") as f:
+            positions = dict()
+            for line in f:
+                index, key, value = line.split("\t")
+                if index not in positions:
+                    positions[index] = dict()
+                positions[index][key] = [int(position) for position in value.split(",")]
+            return positions
     # check if path ends with .tf
     elif path.endswith(".tf"):
         with open(path, "r") as f:
@@ -36,6 +81,22 @@ def readFromFileTabSeparated(path):
                     tf[index] = defaultdict(float)
                 tf[index][key] = float(value)
             return tf
+    # check if path ends with .spell
+    elif path.endswith(".spell"):
+        with open(path, "r") as f:
+            deletes = dict()
+            for line in f:
+                key, value = line.split("\t")
+                deletes[key] = value.replace("\n", "").split(",")
+            return deletes
+    # check if path ends with .words
+    elif path.endswith(".words"):
+        with open(path, "r") as f:
+            words = dict()
+            for line in f:
+                key, stem, value = line.split("\t")
+                words[key] = (stem, int(value))
+            return words
 
 
 def sort_lists(list1, list2):
@@ -58,79 +119,164 @@ def sort_lists(list1, list2):
     return sorted_list1, sorted_list2
 
 
-def binaryJoining(l: list):
-    """
-    Joins a list of strings by splitting the list in half and joining the two halves recursively
-    :param l: list of strings
-    :type l: list
-    :return: joined string
-    :rtype: str
-    """
-    if len(l) == 1:
-        return l[0]
-    elif len(l) == 2:
-        return l[0] + " " + l[1]
-    else:
-        return binaryJoining(l[:len(l) // 2]) + " " + binaryJoining(l[len(l) // 2:])
-
-
-def preprocess(data):
+def preprocess(data, positions=False, analyzer=None):
     """
     Preprocess the input data, this includes:
         - all words to lowercase
         - remove punctuation
         - split on whitespace
-        - create a word2stem dict to store the stemmed words (This allows for faster stemming of words because we only need to stem unseen words)
+        - remove stopwords, see analyzer.Analyzer
+        - stem the words with the stem cache of the analyzer (This allows for faster stemming of words because we only need to stem unseen words)
         - create a vocab_dict to store the number of documents a stemmed word appears in
+        - if positions is True, record the positions of every stemmed word in the document, the position of a word is
+          its number among the non-empty words of the document
     :param data: list of documents containing lists of sentences
     :type data: list[list[str]]
+    :param positions: boolean that indicates if the positions of the words should be recorded
+    :type positions: bool
+    :param analyzer: the analyzer that turns the text into words, None for the default analyzer
+    :type analyzer: Analyzer or None
     :return: the modified data list now containing for every document a defaultdict with the stemmed words as keys and
      their number of occurrences in this document, a vocab_dict containing the number of documents a word appears in
-    :rtype: (list[defaultdict], defaultdict)
+     and, if positions is True, a list with a dict for every document with the stemmed words as keys and the sorted
+     list of their positions as value
+    :rtype: (list[defaultdict], defaultdict) or (list[defaultdict], defaultdict, list[dict[str, list[int]]])
     """
-    # all words to lowercase, remove punctuation, split on whitespace
-    # create a defaultdict for vocabulary with key being the word and value beeing the stemmed word
-    # This is faster than stemming every unique words in every document
-    word2stem_dict = defaultdict(str)
+    # the stem cache of the analyzer holds the stemmed words, this is faster than stemming every unique word in every
+    # document
+    analyzer = analyzer or DEFAULT_ANALYZER
+    if analyzer.stemCache is None:
+        analyzer = analyzer.withStemCache(StemCache())
     # vocab_dict contains as keys the stemmed words and as values the number of documents the word appears in
-    # vocab_dicts = []
     vocab_dict = defaultdict(int)
+    # position_dicts contains for every document a dict with the stemmed words as keys and their positions as value
+    position_dicts = []
     for i in range(len(data)):
-        data[i] = binaryJoining(data[i]).split()
-        # remove all characters that are in string.punctuation
-        # Remove punctuation and empty entries
-        words = [''.join(char for char in word if char not in string.punctuation) for word in data[i]]
-        # create a defaultdict to count the number of times a word appears in a document, don't add empty strings
-        word_count = defaultdict(int)
-        for word in words:
-            if word != "":
-                word_count[word] += 1
-        # create a defaultdict to count the number of times a stemmed word appears in a document
-        stemmed_word_count_dict = defaultdict(int)
-        # this _temp_vocab_dict is used to check if a word has already been added to the vocab_dict
-        _temp_vocab_dict = defaultdict(bool)
-        for key, value in word_count.items():
-            # check for empty string
-            if key == "":
-                continue
-            # check if word was already stemmed, if not stem it and save it in the word2stem_dict
-            if key not in word2stem_dict:
-                word2stem_dict[key] = stem(key)
-            # get the stemmed word from the word2stem_dict
-            stemmed_word = word2stem_dict[key]
-            # increment the value of the stemmed word in the stemmed_word_count_dict
-            stemmed_word_count_dict[stemmed_word] += value
-            # set the value of the stemmed word in the _temp_vocab_dict to True which means the word occurs in the
-            # document
-            _temp_vocab_dict[stemmed_word] = True
-        # add the stemmed_word_count_dict to the data list replacing the list of sentences in the document
-        data[i] = stemmed_word_count_dict
+        if positions:
+            data[i], position_dict = preprocessDocument(data[i], positions=True, analyzer=analyzer)
+            position_dicts.append(position_dict)
+        else:
+            data[i] = preprocessDocument(data[i], analyzer=analyzer)
         # increment the vocab_dict for every word that occurred in the document
-        for key in _temp_vocab_dict.keys():
+        for key in data[i].keys():
             vocab_dict[key] += 1
+    if positions:
+        return data, vocab_dict, position_dicts
     return data, vocab_dict
 
 
+def preprocessDocument(sentences, word2stem_dict=None, positions=False, analyzer=None):
+    """
+    Preprocess a single document, see preprocess, the stemmed words are looked up in and added to word2stem_dict so
+    that it can be shared by the documents of a collection
+    :param sentences: list of sentences of the document
+    :type sentences: list[str]
+    :param word2stem_dict: dict with the words as keys and their stem as value, None to stem the words with the analyzer
+     only, whose stem cache is shared by the documents
+    :type word2stem_dict: dict[str, str] or None
+    :param positions: boolean that indicates if the positions of the words should be recorded
+    :type positions: bool
+    :param analyzer: the analyzer that turns the text into words, None for the default analyzer
+    :type analyzer: Analyzer or None
+    :return: defaultdict with the stemmed words as keys and their number of occurrences in the document and, if
+     positions is True, a dict with the stemmed words as keys and the sorted list of their positions as value
+    :rtype: defaultdict or (defaultdict, dict[str, list[int]])
+    """
+    analyzer = analyzer or DEFAULT_ANALYZER
+    # all words to lowercase, remove punctuation, split on whitespace, remove stopwords
+    words = analyzer.words(" ".join(sentences))
+    # create a defaultdict to count the number of times a word appears in a document
+    word_count = defaultdict(int)
+    for word in words:
+        word_count[word] += 1
+    if word2stem_dict is None:
+        # the stem cache may drop words while the document is stemmed, so the stems of the document are kept here
+        word2stem_dict = analyzer.stemWords(word_count)
+    else:
+        # the words that weren't stemmed yet are stemmed together and saved in the word2stem_dict
+        word2stem_dict.update(analyzer.stemWords([key for key in word_count if key not in word2stem_dict]))
+    # create a defaultdict to count the number of times a stemmed word appears in a document
+    stemmed_word_count_dict = defaultdict(int)
+    for key, value in word_count.items():
+        # get the stemmed word from the word2stem_dict
+        stemmed_word = word2stem_dict[key]
+        # increment the value of the stemmed word in the stemmed_word_count_dict
+        stemmed_word_count_dict[stemmed_word] += value
+    if not positions:
+        return stemmed_word_count_dict
+    # every word was stemmed above, so the word2stem_dict holds the stem of every word
+    position_dict = defaultdict(list)
+    for position, word in enumerate(words):
+        position_dict[word2stem_dict[word]].append(position)
+    return stemmed_word_count_dict, dict(sorted(position_dict.items(), key=lambda x: x[0]))
+
+
+def preprocessQueries(queryTermsList, analyzer=None):
+    """
+    Count the stemmed words of a list of queries, the queries are preprocessed together like the documents of a
+    collection, so they share the stemming of their words. The documents are lowercased by the XMLParser, so the query
+    terms are lowercased as well.
+    :param queryTermsList: list of queries, every query is a list of query terms
+    :type queryTermsList: list[list[str]]
+    :param analyzer: the analyzer that turns the query terms into words, None for the default analyzer
+    :type analyzer: Analyzer or None
+    :return: list with a defaultdict of the stemmed words and their number of occurrences for every query, None for
+     queries without any words
+    :rtype: list[defaultdict or None]
+    """
+    data, vocab = preprocess([[term.lower() for term in queryTerms] if queryTerms else [] for queryTerms in
+                              queryTermsList], analyzer=analyzer)
+    return [word_count if word_count else None for word_count in data]
+
+
+def preprocessWildcardQueries(queryTermsList, analyzer, terms, maxExpansions=50):
+    """
+    Count the stemmed words of a list of queries like preprocessQueries, terms with wildcards are expanded with the term
+    dictionary of the index, the expanded words are already stemmed, so they are counted directly, every expanded word
+    counts once
+    :param queryTermsList: list of queries, every query is a list of query terms
+    :type queryTermsList: list[list[str]]
+    :param analyzer: the analyzer that turns the query terms into words, None for the default analyzer
+    :type analyzer: Analyzer or None
+    :param terms: the term dictionary of the index
+    :type terms: TermDictionary
+    :param maxExpansions: maximal number of words a pattern is expanded to
+    :type maxExpansions: int
+    :return: list with a defaultdict of the stemmed words and their number of occurrences for every query, None for
+     queries without any words
+    :rtype: list[defaultdict or None]
+    """
+    if not any(isWildcardTerm(term) for queryTerms in queryTermsList if queryTerms for term in queryTerms):
+        return preprocessQueries(queryTermsList, analyzer)
+    plainTermsList = []
+    patternsList = []
+    for queryTerms in queryTermsList:
+        words = " ".join(queryTerms).split() if queryTerms else []
+        plainTermsList.append([word for word in words if not isWildcardTerm(word)])
+        patternsList.append([normalizePattern(word) for word in words if isWildcardTerm(word)])
+    queryCountsList = preprocessQueries(plainTermsList, analyzer)
+    for i, patterns in enumerate(patternsList):
+        for pattern in patterns:
+            for word in terms.expand(pattern, maxExpansions):
+                if queryCountsList[i] is None:
+                    queryCountsList[i] = defaultdict(int)
+                queryCountsList[i][word] += 1
+    return queryCountsList
+
+
+def stemQueryTerms(queryTerms, analyzer=None):
+    """
+    Preprocess query terms like the words of a document, but keep their order, this is needed for phrase queries
+    :param queryTerms: list of query terms, a term may contain several words separated by whitespace
+    :type queryTerms: list[str]
+    :param analyzer: the analyzer that turns the query terms into words, None for the default analyzer
+    :type analyzer: Analyzer or None
+    :return: list of the stemmed words in query order
+    :rtype: list[str]
+    """
+    return (analyzer or DEFAULT_ANALYZER).analyze(" ".join(queryTerms).lower())
+
+
 def calculateIDF(vocab_dict, num_docs):
     """
     Calculates the IDF for every word in the vocabulary
@@ -165,6 +311,24 @@ def calculateTF(index, document_list):
     return tf
 
 
+def calculateLengths(index, document_list):
+    """
+    Calculates the length and the largest word count of every document in the collection. calculateDocumentTF divides
+    the word counts by the largest word count, so the raw word counts can be restored from the TF with it.
+    :param index: list of document indices
+    :type index: list[str]
+    :param document_list: list of documents containing defaultdicts with the words as keys and their number of
+     occurrences as value
+    :type document_list: list[defaultdict]
+    :return: dict with document index as key and a tuple of the number of words and the largest word count as value
+    :rtype: dict[str, tuple[int, int]]
+    """
+    lengths = dict()
+    for ind, document_dict in zip(index, document_list):
+        lengths[ind] = (sum(document_dict.values()), max(document_dict.values()))
+    return lengths
+
+
 def calculateDocumentTF(document_dict):
     """
     Calculates the TF for every word in the provided document
@@ -181,26 +345,119 @@ def calculateDocumentTF(document_dict):
     return defaultdict(float, sorted(tf_dict.items(), key=lambda x: x[0]))
 
 
+def calculatePostings(tf, idf, norms):
+    """
+    Inverts the tf dict into postings lists. Every document gets an integer document id which is its position in the
+    tf dict, the postings of a word hold the (document id, weight) of every document the word appears in, sorted
+    by document id. The weight is the tf.idf weight divided by the norm of the document, so the cosine similarity with
+    a query is the dot product of the weights divided by the norm of the query.
+    :param tf: dict with document index as key and as value a dict with the words as keys and the TF as value
+    :type tf: dict[str, dict[str, float]]
+    :param idf: dictionary with the vocabulary every word as key and the IDF as value
+    :type idf: defaultdict
+    :param norms: dictionary with the document index as key and the norm of its tf.idf vector as value
+    :type norms: dict[str, float]
+    :return: list of document indices where the position is the document id, dict with the words as keys and the
+     postings list as value
+    :rtype: (list[str], dict[str, list[tuple[int, float]]])
+    """
+    documents = list(tf.keys())
+    postings = defaultdict(list)
+    for doc_id, ind in enumerate(documents):
+        norm = norms[ind]
+        for key, value in tf[ind].items():
+            # words that don't appear in the idf dict get a tf.idf of 0, like in the Vector class
+            postings[key].append((doc_id, value * idf.get(key, 0.0) / norm if norm != 0 else 0.0))
+    return documents, dict(postings)
+
+
+def calculateNorms(tf, idf):
+    """
+    Calculates the norm of the tf.idf vector of every document, the same way Vector.calculateNorm does
+    :param tf: dict with document index as key and as value a dict with the words as keys and the TF as value
+    :type tf: dict[str, dict[str, float]]
+    :param idf: dictionary with the vocabulary every word as key and the IDF as value
+    :type idf: defaultdict
+    :return: dictionary with the document index as key and the norm of its tf.idf vector as value
+    :rtype: dict[str, float]
+    """
+    norms = dict()
+    for ind, tf_dict in tf.items():
+        norms[ind] = math.sqrt(sum([(value * idf.get(key, 0.0)) ** 2 for key, value in tf_dict.items()]))
+    return norms
+
+
 def writeToFileTabSeparated(path, data):
     """
-    Writes the data to a file with the given path, the data is tab separated. Different handling for .idf and .tf files
+    Writes the data to a file with the given path, the data is tab separated. Different handling for .idf, .df and
+    .norm files, which hold one value per key, .tf files, .len files, which hold two values per key, .pos files, which hold
+    a comma separated list of positions, .spell files, which hold a comma separated list of words, and .words files,
+    which hold the stem and number of documents of a word
     :param path: path to the file
     :type path: str
     :param data: data to be written to the file
-    :type data: dict[str, float] or dict[str, dict[str, float]]
-    :raises NotImplementedError: if the file ending is not .idf or .tf
+    :type data: dict[str, float] or dict[str, dict[str, float]] or dict[str, tuple[int, int]] or
+     dict[str, dict[str, list[int]]] or dict[str, list[str]] or dict[str, tuple[str, int]]
+    :raises NotImplementedError: if the file ending is not .idf, .df, .norm, .tf, .len, .pos, .spell or .words
     :return: None
     :rtype: None
     """
+    lines = formatTabSeparated(path, data)
+    with open(path, "w") as f:
+        f.writelines(lines)
+
+
+def formatTabSeparated(path, data):
+    """
+    Format the data as the lines of a file with the given path, see writeToFileTabSeparated. The lines are created
+    lazily, so the data of a single document can be appended to an open file while the collection is streamed.
+    :param path: path to the file, only the file ending is used
+    :type path: str
+    :param data: data to be written to the file
+    :type data: dict[str, float] or dict[str, dict[str, float]] or dict[str, tuple[int, int]] or
+     dict[str, dict[str, list[int]]] or dict[str, list[str]] or dict[str, tuple[str, int]]
+    :raises NotImplementedError: if the file ending is not .idf, .df, .norm, .tf, .len, .pos, .spell or .words
+    :return: iterator over the lines
+    :rtype: iterator[str]
+    """
     # check file ending
-    if path.endswith(".idf"):
-        with open(path, "w") as f:
-            for key, value in data.items():
-                f.write(key + "\t" + str(value) + "\n")
+    if path.endswith(".idf") or path.endswith(".df") or path.endswith(".norm"):
+        return (key + "\t" + str(value) + "\n" for key, value in data.items())
     elif path.endswith(".tf"):
-        with open(path, "w") as f:
-            for index, item_dict in data.items():
-                for key, value in item_dict.items():
-                    f.write(str(index) + "\t" + key + "\t" + str(value) + "\n")
+        return (str(index) + "\t" + key + "\t" + str(value) + "\n"
+                for index, item_dict in data.items() for key, value in item_dict.items())
+    elif path.endswith(".len"):
+        return (str(index) + "\t" + str(length) + "\t" + str(max_count) + "\n"
+                for index, (length, max_count) in data.items())
+    elif path.endswith(".pos"):
+        return (str(index) + "\t" + key + "\t" + ",".join([str(position) for position in value]) + "\n"
+                for index, item_dict in data.items() for key, value in item_dict.items())
+    elif path.endswith(".spell"):
+        return (key + "\t" + ",".join(value) + "\n" for key, value in data.items())
+    elif path.endswith(".words"):
+        return (key + "\t" + stem + "\t" + str(count) + "\n" for key, (stem, count) in data.items())
     else:
         raise NotImplementedError
+
+
+def iterateTF(path):
+    """
+    Read a .tf file document by document, the lines of a document are written one after another
+    :param path: path to the .tf file
+    :type path: str
+    :return: iterator over (document index, dict with the words as keys and the TF as value) tuples
+    :rtype: iterator[tuple[str, dict[str, float]]]
+    """
+    with open(path, "r") as f:
+        current = None
+        tf_dict = None
+        for line in f:
+            index, key, value = line.split("\t")
+            if index != current:
+                if current is not None:
+                    yield current, tf_dict
+                current = index
+                tf_dict = defaultdict(float)
+            tf_dict[key] = float(value)
+        if current is not None:
+            yield current, tf_dict
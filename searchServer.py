@@ -0,0 +1,346 @@
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+
+from softwareAssignment import SearchEngine
+
+# reason phrases of the status codes the server sends
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+           500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class HTTPError(Exception):
+    """
+    Exception that is turned into an HTTP error response with a JSON body
+    """
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class SearchServer:
+    """
+    Class that represents an asyncio HTTP/JSON server on top of a SearchEngine.
+    The server offers the endpoints:
+    - GET /search?q=hurricane+philadelphia&k=10 or POST /search {"query": ["hurricane", "philadelphia"], "k": 10}
+    - POST /batch {"queries": [["hurricane"], ["orange", "bowl"]], "k": 10}
+    - GET /status
+    Scoring runs in a thread pool so the event loop keeps accepting and parsing requests while a slow query is scored.
+    Connections are kept alive and requests can be pipelined, the responses are sent in the order of the requests.
+    """
+    def __init__(self, searchEngine, maxConcurrency=8, maxPipelined=16, maxBodySize=1024 * 1024):
+        """
+        Initialize the server
+        :param searchEngine: the search engine that answers the queries
+        :type searchEngine: SearchEngine
+        :param maxConcurrency: maximal number of queries or batches that are scored at the same time
+        :type maxConcurrency: int
+        :param maxPipelined: maximal number of requests of one connection that are read ahead of their responses
+        :type maxPipelined: int
+        :param maxBodySize: maximal size of a request body in bytes
+        :type maxBodySize: int
+        :return: None
+        :rtype: None
+        """
+        self.searchEngine = searchEngine
+        self.maxConcurrency = maxConcurrency
+        self.maxPipelined = maxPipelined
+        self.maxBodySize = maxBodySize
+        self.executor = ThreadPoolExecutor(max_workers=maxConcurrency)
+        self.semaphore = None
+        self.server = None
+        self.startTime = None
+        self.requests = 0
+        self.inFlight = 0
+
+    async def start(self, host="127.0.0.1", port=8080):
+        """
+        Start listening on host:port
+        :param host: host name or address to bind to
+        :type host: str
+        :param port: port to bind to, 0 picks a free port
+        :type port: int
+        :return: the port the server listens on
+        :rtype: int
+        """
+        self.semaphore = asyncio.Semaphore(self.maxConcurrency)
+        self.startTime = time.time()
+        self.server = await asyncio.start_server(self.handleConnection, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """
+        Stop listening and shut down the thread pool
+        :return: None
+        :rtype: None
+        """
+        self.server.close()
+        await self.server.wait_closed()
+        self.executor.shutdown(wait=True)
+
+    async def handleConnection(self, reader, writer):
+        """
+        Serve one connection. Requests are read and dispatched as soon as they arrive, a separate writer coroutine
+        sends their responses in order, so pipelined requests are scored concurrently.
+        :param reader: stream of the connection
+        :type reader: asyncio.StreamReader
+        :param writer: stream of the connection
+        :type writer: asyncio.StreamWriter
+        :return: None
+        :rtype: None
+        """
+        # queue of response tasks in request order, None marks the end of the connection
+        responses = asyncio.Queue(self.maxPipelined)
+        sender = asyncio.ensure_future(self.sendResponses(responses, writer))
+        try:
+            while True:
+                request = await self.readRequest(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                await responses.put(asyncio.ensure_future(self.handleRequest(method, target, body)))
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except HTTPError as e:
+            await responses.put(asyncio.ensure_future(self.errorResponse(e)))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            # the sender closes the connection once it got the responses of all requests that were read
+            await responses.put(None)
+            await sender
+
+    async def sendResponses(self, responses, writer):
+        """
+        Write the responses of a connection in request order and close the connection afterwards
+        :param responses: queue of response tasks, see handleConnection
+        :type responses: asyncio.Queue
+        :param writer: stream of the connection
+        :type writer: asyncio.StreamWriter
+        :return: None
+        :rtype: None
+        """
+        try:
+            while True:
+                task = await responses.get()
+                if task is None:
+                    break
+                status, payload = await task
+                body = json.dumps(payload).encode()
+                writer.write(("HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n"
+                              % (status, REASONS[status], len(body))).encode() + body)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def readRequest(self, reader):
+        """
+        Read one HTTP/1.1 request from the connection
+        :param reader: stream of the connection
+        :type reader: asyncio.StreamReader
+        :raises HTTPError: if the request is malformed or its body is too large
+        :return: (method, target, headers, body) or None if the client closed the connection
+        :rtype: (str, str, dict[str, str], bytes) or None
+        """
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as e:
+            if e.partial.strip():
+                raise HTTPError(400, "incomplete request")
+            return None
+        except asyncio.LimitOverrunError:
+            raise HTTPError(400, "request head too large")
+        lines = head.decode("latin-1").split("\r\n")
+        parts = lines[0].split()
+        if len(parts) != 3:
+            raise HTTPError(400, "malformed request line")
+        headers = dict()
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        length = headers.get("content-length") or "0"
+        if not (length.isascii() and length.isdigit()):
+            raise HTTPError(400, "Content-Length must be a non-negative integer")
+        length = int(length)
+        if length > self.maxBodySize:
+            raise HTTPError(413, "request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return parts[0], parts[1], headers, body
+
+    async def errorResponse(self, error):
+        """
+        Create the response for an HTTPError
+        :param error: the error
+        :type error: HTTPError
+        :return: (status, JSON payload)
+        :rtype: (int, dict)
+        """
+        return error.status, {"error": error.message}
+
+    async def handleRequest(self, method, target, body):
+        """
+        Dispatch a request to its endpoint
+        :param method: HTTP method
+        :type method: str
+        :param target: request target with path and query string
+        :type target: str
+        :param body: request body
+        :type body: bytes
+        :return: (status, JSON payload)
+        :rtype: (int, dict)
+        """
+        self.requests += 1
+        url = urlsplit(target)
+        try:
+            if url.path == "/status":
+                if method != "GET":
+                    raise HTTPError(405, "use GET")
+                return 200, self.status()
+            if url.path == "/search":
+                if method == "GET":
+                    parameters = parse_qs(url.query)
+                    query = " ".join(parameters.get("q", [])).split()
+                    k = parameters.get("k", ["10"])[0]
+                elif method == "POST":
+                    request = self.parseBody(body)
+                    query = self.parseQuery(request.get("query", []))
+                    k = request.get("k", 10)
+                else:
+                    raise HTTPError(405, "use GET or POST")
+                k = self.parseK(k)
+                results = await self.score(self.searchEngine.executeQuery, query, k)
+                return 200, {"query": query, "k": k, "results": results}
+            if url.path == "/batch":
+                if method != "POST":
+                    raise HTTPError(405, "use POST")
+                request = self.parseBody(body)
+                queries = request.get("queries", [])
+                if not isinstance(queries, list):
+                    raise HTTPError(400, "queries must be a list")
+                queries = [self.parseQuery(query) for query in queries]
+                k = self.parseK(request.get("k", 10))
+                results = await self.score(self.searchEngine.executeQueries, queries, k)
+                return 200, {"k": k, "results": results}
+            raise HTTPError(404, "unknown endpoint " + url.path)
+        except HTTPError as e:
+            return await self.errorResponse(e)
+        except Exception:
+            # a failing query must not break the connection, the other pipelined requests are still answered
+            return await self.errorResponse(HTTPError(500, "internal server error"))
+
+    @staticmethod
+    def parseBody(body):
+        """
+        Parse a JSON request body
+        :param body: request body
+        :type body: bytes
+        :raises HTTPError: if the body is not a JSON object
+        :return: the parsed body
+        :rtype: dict
+        """
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "body is not valid JSON")
+        if not isinstance(request, dict):
+            raise HTTPError(400, "body must be a JSON object")
+        return request
+
+    @staticmethod
+    def parseQuery(query):
+        """
+        Parse a query of a JSON request body
+        :param query: query as string or list of query terms
+        :type query: str or list[str]
+        :raises HTTPError: if the query is neither a string nor a list of strings
+        :return: list of query terms
+        :rtype: list[str]
+        """
+        if isinstance(query, str):
+            return query.split()
+        if not isinstance(query, list) or not all(isinstance(term, str) for term in query):
+            raise HTTPError(400, "a query must be a string or a list of strings")
+        return query
+
+    @staticmethod
+    def parseK(k):
+        """
+        Parse the number of requested results
+        :param k: number of results as int or str
+        :type k: int or str
+        :raises HTTPError: if k is not a positive integer
+        :return: k
+        :rtype: int
+        """
+        try:
+            k = int(k)
+        except (TypeError, ValueError):
+            raise HTTPError(400, "k must be an integer")
+        if k <= 0:
+            raise HTTPError(400, "k must be positive")
+        return k
+
+    async def score(self, function, *args):
+        """
+        Run a scoring function in the thread pool, at most maxConcurrency scoring calls run at the same time
+        :param function: executeQuery or executeQueries of the search engine
+        :type function: callable
+        :return: the result of the function
+        """
+        async with self.semaphore:
+            self.inFlight += 1
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+            finally:
+                self.inFlight -= 1
+
+    def status(self):
+        """
+        Create the payload of the status endpoint
+        :return: dict with information about the index, the cache and the server
+        :rtype: dict
+        """
+        index = self.searchEngine.index
+        return {"documents": len(index.documents), "terms": len(index.idf), "backend": self.searchEngine.backend,
+                "generation": index.generation, "cache": self.searchEngine.cache.stats(),
+                "requests": self.requests, "inFlight": self.inFlight, "maxConcurrency": self.maxConcurrency,
+                "uptime": time.time() - self.startTime}
+
+
+async def serve(searchEngine, host, port, maxConcurrency, maxPipelined):
+    """
+    Run a SearchServer until the process is interrupted
+    :return: None
+    :rtype: None
+    """
+    server = SearchServer(searchEngine, maxConcurrency=maxConcurrency, maxPipelined=maxPipelined)
+    port = await server.start(host, port)
+    print("Listening on http://%s:%d" % (host, port))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="JSON search server")
+    parser.add_argument("--collection", default="nytsmall")
+    parser.add_argument("--create", action="store_true", help="create the index instead of reading it")
+    parser.add_argument("--backend", default="maxscore")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--concurrency", type=int, default=8, help="maximal number of queries scored at once")
+    parser.add_argument("--pipelined", type=int, default=16, help="maximal pipelined requests per connection")
+    arguments = parser.parse_args()
+    engine = SearchEngine(arguments.collection, arguments.create, backend=arguments.backend)
+    try:
+        asyncio.run(serve(engine, arguments.host, arguments.port, arguments.concurrency, arguments.pipelined))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,212 @@
+import math
+import os
+from collections import defaultdict
+
+from binaryIndex import hasSegmentFile, readSegmentFile
+from documentStore import DocumentStore, DocumentStoreWriter
+from searchEngineUtil import writeToFileTabSeparated, formatTabSeparated
+
+# file endings of the files that belong to a single segment, the files are never changed after the segment was written,
+# only the .del file with the deleted documents is written again
+SEGMENT_EXTENSIONS = (".tf", ".pos", ".len", ".bin", ".docs", ".df", ".words", ".del")
+# file endings of the text files that a binary segment file replaces, see binaryIndex.compileSegment
+TEXT_EXTENSIONS = (".tf", ".pos", ".len")
+# number of segments of about the same size that are merged into one segment
+MERGE_FACTOR = 4
+# segments with at most this number of documents are in the smallest tier
+MIN_SEGMENT_SIZE = 64
+# a segment in which more than this ratio of the documents is deleted is rewritten without them
+MAX_DELETED_RATIO = 0.5
+
+
+def removeSegmentFiles(segment, extensions=SEGMENT_EXTENSIONS):
+    """
+    Remove the files of a segment
+    :param segment: path of the segment without file ending
+    :type segment: str
+    :param extensions: the file endings of the files that are removed
+    :type extensions: tuple[str]
+    :return: None
+    :rtype: None
+    """
+    for extension in extensions:
+        if os.path.exists(segment + extension):
+            os.remove(segment + extension)
+
+
+class DeletionBitmap:
+    """
+    Class that marks the deleted documents of a segment, bit i is set if the document at position i of the segment is
+    deleted. The documents stay in the files of the segment until it is merged, see writeMergedSegment.
+    """
+    def __init__(self, bits=b""):
+        """
+        Initialize the bitmap
+        :param bits: the bytes of the bitmap, the lowest bit of the first byte belongs to the first document
+        :type bits: bytes
+        :return: None
+        :rtype: None
+        """
+        self.bits = bytearray(bits)
+        self.numDeleted = sum(bin(byte).count("1") for byte in self.bits)
+
+    def __len__(self):
+        return self.numDeleted
+
+    @classmethod
+    def read(cls, path):
+        """
+        Read a bitmap from a .del file
+        :param path: path to the file
+        :type path: str
+        :return: the bitmap, an empty bitmap if the file doesn't exist
+        :rtype: DeletionBitmap
+        """
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def write(self, path):
+        """
+        Write the bitmap to a .del file
+        :param path: path to the file
+        :type path: str
+        :return: None
+        :rtype: None
+        """
+        with open(path, "wb") as f:
+            f.write(self.bits)
+
+    def copy(self):
+        """
+        Return a copy of the bitmap
+        :rtype: DeletionBitmap
+        """
+        return DeletionBitmap(self.bits)
+
+    def delete(self, position):
+        """
+        Mark a document as deleted
+        :param position: position of the document in the segment
+        :type position: int
+        :return: None
+        :rtype: None
+        """
+        byte, bit = divmod(position, 8)
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(byte + 1 - len(self.bits)))
+        if not self.bits[byte] & (1 << bit):
+            self.bits[byte] |= 1 << bit
+            self.numDeleted += 1
+
+    def isDeleted(self, position):
+        """
+        Check if a document is deleted
+        :param position: position of the document in the segment
+        :type position: int
+        :return: True if the document is deleted
+        :rtype: bool
+        """
+        byte, bit = divmod(position, 8)
+        return byte < len(self.bits) and bool(self.bits[byte] & (1 << bit))
+
+
+def findMerge(sizes, numDeleted, mergeFactor=MERGE_FACTOR, minSize=MIN_SEGMENT_SIZE,
+              maxDeletedRatio=MAX_DELETED_RATIO):
+    """
+    Tiered merge policy: every segment belongs to a tier by its number of documents, tier t holds the segments with up
+    to minSize * mergeFactor ** t documents. As soon as mergeFactor adjacent segments are in the same tier, they are
+    merged into one segment of the next tier, so the number of segments grows with the logarithm of the number of
+    documents and every document is rewritten once per tier. Only adjacent segments are merged, this keeps the order
+    of the documents. A segment in which more than maxDeletedRatio of the documents is deleted is rewritten alone.
+    :param sizes: number of documents of every segment, including the deleted ones
+    :type sizes: list[int]
+    :param numDeleted: number of deleted documents of every segment
+    :type numDeleted: list[int]
+    :param mergeFactor: number of segments that are merged at once
+    :type mergeFactor: int
+    :param minSize: largest number of documents of a segment in the smallest tier
+    :type minSize: int
+    :param maxDeletedRatio: largest ratio of deleted documents of a segment that isn't rewritten
+    :type maxDeletedRatio: float
+    :return: (start, end) so that the segments start to end - 1 should be merged, None if no merge is needed
+    :rtype: (int, int) or None
+    """
+    tiers = [int(math.log(max(size - deleted, minSize) / minSize, mergeFactor))
+             for size, deleted in zip(sizes, numDeleted)]
+    start = 0
+    for end in range(1, len(tiers) + 1):
+        if end == len(tiers) or tiers[end] != tiers[start]:
+            if end - start >= mergeFactor:
+                return start, start + mergeFactor
+            start = end
+    for number, (size, deleted) in enumerate(zip(sizes, numDeleted)):
+        if deleted > maxDeletedRatio * size:
+            return number, number + 1
+    return None
+
+
+def segmentLines(segment, extension):
+    """
+    Return the lines of a text file of a segment, they are created from the binary file if the segment has one
+    :param segment: path of the segment without file ending
+    :type segment: str
+    :param extension: file ending, .tf, .len or .pos
+    :type extension: str
+    :return: iterator over the lines
+    :rtype: iterator[str]
+    """
+    if os.path.exists(segment + ".bin"):
+        yield from formatTabSeparated(extension, readSegmentFile(segment, extension))
+        return
+    with open(segment + extension, "r") as f:
+        yield from f
+
+
+def writeMergedSegment(target, segments, documents, deletions):
+    """
+    Write the live documents of segments to a new segment, the documents keep their order. The .tf, .pos and .len
+    lines are copied without parsing the values, the .df file of the new segment is counted from its .tf lines. A .pos,
+    .len or .docs file is only written if all segments have one. The new segment is written as text files, see
+    Index.writeFormat.
+    :param target: path of the new segment without file ending
+    :type target: str
+    :param segments: paths of the merged segments without file ending
+    :type segments: list[str]
+    :param documents: list with the document indices of every merged segment in the order of the segment
+    :type documents: list[list[str]]
+    :param deletions: the deletion bitmap of every merged segment
+    :type deletions: list[DeletionBitmap]
+    :return: list with the document indices of the new segment in the order of the segment
+    :rtype: list[str]
+    """
+    merged = []
+    # the live document indices of every segment
+    live = []
+    for inds, bitmap in zip(documents, deletions):
+        live_inds = [ind for position, ind in enumerate(inds) if not bitmap.isDeleted(position)]
+        merged.extend(live_inds)
+        live.append(set(live_inds))
+    df = defaultdict(int)
+    for extension in TEXT_EXTENSIONS:
+        if not all(hasSegmentFile(segment, extension) for segment in segments):
+            continue
+        with open(target + extension, "w") as out:
+            for segment, live_inds in zip(segments, live):
+                for line in segmentLines(segment, extension):
+                    fields = line.split("\t", 2)
+                    if fields[0] in live_inds:
+                        out.write(line)
+                        if extension == ".tf":
+                            df[fields[1]] += 1
+    writeToFileTabSeparated(target + ".df", dict(sorted(df.items())))
+    if all(os.path.exists(segment + ".docs") for segment in segments):
+        with DocumentStoreWriter(target + ".docs") as writer:
+            for segment, bitmap in zip(segments, deletions):
+                store = DocumentStore(segment + ".docs")
+                for position in range(len(store)):
+                    if not bitmap.isDeleted(position):
+                        writer.add(*store.get(position))
+                store.close()
+    return merged
@@ -0,0 +1,191 @@
+import heapq
+import multiprocessing
+import os
+
+from analyzer import DEFAULT_ANALYZER, STEM_CACHE_SIZE, StemCache
+from binaryIndex import LazyDict
+from index import Index
+from scoring import createScorer
+from searchEngineUtil import readFromFileTabSeparated, preprocessWildcardQueries
+from termDictionary import TermDictionary
+from topK import maxScoreTopK
+
+
+def shardWorker(collectionName, shard, numShards, scorer, analyzer, connection):
+    """
+    Main loop of a shard worker process. The worker opens the index lazily, so the binary segments are memory mapped
+    and no postings are read up front. The postings of a word are decoded the first time a query needs them and only
+    the postings of the documents with document id % numShards == shard are kept. The worker answers batches of queries
+    with the local top k of every query until it receives None.
+    The worker first sends None once the index is opened, or the exception that prevented it.
+    :param collectionName: string that holds the name of the collection file
+    :type collectionName: str
+    :param shard: number of the shard held by this worker
+    :type shard: int
+    :param numShards: total number of shards
+    :type numShards: int
+    :param scorer: the ranking function
+    :type scorer: Scorer
+    :param analyzer: the analyzer the index was created with
+    :type analyzer: Analyzer or None
+    :param connection: connection to the coordinator
+    :type connection: multiprocessing.connection.Connection
+    :return: None
+    :rtype: None
+    """
+    try:
+        index = Index(collectionName, False, lazy=True, analyzer=analyzer)
+        scorer.checkIndex(index)
+    except Exception as error:
+        connection.send(error)
+        connection.close()
+        return
+    # the impacts of a word are calculated from all its postings, so the idf and BM25 statistics are those of the
+    # whole collection, but only the postings of the shard are kept
+    postings = LazyDict(index.idf, lambda key: [(doc_id, impact) for doc_id, impact in scorer.termImpacts(index, key)
+                                                if doc_id % numShards == shard])
+    max_weights = LazyDict(index.idf, lambda key: max([impact for _, impact in postings[key]], default=0.0))
+    connection.send(None)
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        queryCountsList, k = message
+        results = []
+        for queryCounts in queryCountsList:
+            if queryCounts is None:
+                results.append([])
+                continue
+            top_k = maxScoreTopK(scorer.queryWeights(queryCounts, index), postings, max_weights, k)
+            # the document indices are sent along, so the coordinator doesn't need the documents of the index
+            results.append([(doc_id, score, index.documents[doc_id]) for doc_id, score in top_k])
+        connection.send(results)
+    connection.close()
+
+
+class ShardedSearchEngine:
+    """
+    Class that represents a search engine that partitions the documents of a collection into shards, every shard is held
+    by a persistent worker process. A query is sent to all workers, every worker computes the top k of its shard and the
+    partial results are merged into the exact global top k, the same result as SearchEngine with the "maxscore" backend.
+    The coordinator only reads the idf of the index, it stems the queries and expands their wildcards.
+    """
+    def __init__(self, collectionName, create, numShards=None, scorer="cosine", analyzer=None, maxExpansions=50,
+                 stemCacheSize=STEM_CACHE_SIZE):
+        """
+        Initialize the search engine, create the index or read its idf and start one worker process per shard.
+        The workers open the index lazily, so it has to consist of binary segments, a created index is written with
+        binary segments, an existing index in the text format can be converted with Index.convertFormat.
+        :param collectionName: string that holds the name of the collection file
+        :type collectionName: str
+        :param create: boolean that indicates if the index should be created or read from files
+        :type create: bool
+        :param numShards: number of shards and worker processes, defaults to the number of CPU cores
+        :type numShards: int
+        :param scorer: the ranking function, "cosine", "bm25" or a scoring.Scorer, see SearchEngine
+        :type scorer: str or Scorer
+        :param analyzer: the analyzer that turns the documents and queries into words, None for the default analyzer
+        :type analyzer: Analyzer or None
+        :param maxExpansions: maximal number of words a query term with wildcards is expanded to
+        :type maxExpansions: int
+        :param stemCacheSize: largest number of words whose stem is cached, see analyzer.StemCache
+        :type stemCacheSize: int
+        :raises ValueError: if the index can't be opened by the workers, e.g. because it has text segments
+        :return: None
+        :rtype: None
+        """
+        path_to_files = os.path.join(os.getcwd(), collectionName)
+        self.scorer = createScorer(scorer)
+        if create:
+            print("Creating index")
+            # the index is opened lazily, so creating it doesn't read the postings back into memory
+            Index(collectionName, True, indexFormat="binary", lazy=True, analyzer=analyzer, stemCacheSize=stemCacheSize)
+        else:
+            print("Reading index")
+        self.analyzer = (analyzer or DEFAULT_ANALYZER).withStemCache(StemCache(stemCacheSize, path_to_files + ".stems"))
+        self.idf = readFromFileTabSeparated(path_to_files + ".idf")
+        if os.path.exists(path_to_files + ".words"):
+            self.terms = TermDictionary(readFromFileTabSeparated(path_to_files + ".words"), self.idf)
+        else:
+            self.terms = TermDictionary(self.idf)
+        self.maxExpansions = maxExpansions
+        self.numShards = numShards or os.cpu_count() or 1
+        self.connections = []
+        self.workers = []
+        for shard in range(self.numShards):
+            parent_connection, child_connection = multiprocessing.Pipe()
+            worker = multiprocessing.Process(target=shardWorker, daemon=True,
+                                             args=(collectionName, shard, self.numShards, self.scorer, analyzer,
+                                                   child_connection))
+            worker.start()
+            child_connection.close()
+            self.connections.append(parent_connection)
+            self.workers.append(worker)
+        # wait until every worker has opened the index
+        errors = [error for error in [connection.recv() for connection in self.connections] if error is not None]
+        if errors:
+            self.close()
+            raise errors[0]
+        print("Done")
+
+    def executeQuery(self, queryTerms, k=10):
+        """
+        Execute a query on all shards, see SearchEngine.executeQuery
+        :param queryTerms: list of query terms
+        :type queryTerms: list[str]
+        :param k: maximal number of documents to return
+        :type k: int
+        :return: list of at most k (document index, score) tuples sorted by score
+        :rtype: list[tuple[str, float]]
+        """
+        result = self.executeQueries([queryTerms], k)[0]
+        if len(result) == 0:
+            print("No results found")
+        return result
+
+    def executeQueries(self, queryTermsList, k=10):
+        """
+        Execute a batch of queries on all shards, every worker receives the whole batch at once. The queries are
+        stemmed and their wildcards are expanded once by the coordinator, see searchEngineUtil.preprocessWildcardQueries.
+        :param queryTermsList: list of queries, every query is a list of query terms
+        :type queryTermsList: list[list[str]]
+        :param k: maximal number of documents to return per query
+        :type k: int
+        :return: list with the result of every query, in the same format as executeQuery
+        :rtype: list[list[tuple[str, float]]]
+        """
+        queryCountsList = preprocessWildcardQueries(queryTermsList, self.analyzer, self.terms, self.maxExpansions)
+        for connection in self.connections:
+            connection.send((queryCountsList, k))
+        partial_results = [connection.recv() for connection in self.connections]
+        results = []
+        for i in range(len(queryCountsList)):
+            # every shard returns at most k documents, so the global top k is among them
+            candidates = [x for partial_result in partial_results for x in partial_result[i]]
+            merged = heapq.nsmallest(k, candidates, key=lambda x: (-x[1], x[0]))
+            results.append([(ind, score) for _, score, ind in merged])
+        return results
+
+    def close(self):
+        """
+        Stop all worker processes
+        :return: None
+        :rtype: None
+        """
+        for connection in self.connections:
+            try:
+                connection.send(None)
+            except OSError:
+                # the worker already stopped because it couldn't open the index
+                pass
+            connection.close()
+        for worker in self.workers:
+            worker.join()
+        self.connections = []
+        self.workers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
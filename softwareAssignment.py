@@ -4,13 +4,29 @@ Software Assignment WS 2014/2015
 SEARCH ENGINE
 
 '''
+from collections import defaultdict
+
+from analyzer import STEM_CACHE_SIZE
+from booleanQuery import SkipList, parseBooleanQuery, evaluateBooleanQuery, queryWords
+from documentStore import createSnippet
 from index import Index
+from pagination import CursorStore, encodeCursor, decodeCursor
+from phraseQuery import gallopingSearch, intersectPostings, phraseFrequency, proximityFrequency
+from queryCache import QueryResultCache
+from scoring import createScorer, CosineScorer
+from searchEngineUtil import preprocessWildcardQueries, stemQueryTerms, calculateDocumentTF
+from sparseMatrix import DocumentTermMatrix, topKFromArray
+from termDictionary import isWildcardTerm
+from topK import selectTopK, maxScoreTopK
 from vector import Vector
 
 
 class SearchEngine:
     
-    def __init__(self, collectionName, create):
+    def __init__(self, collectionName, create, backend="maxscore", scorer="cosine", cacheEntries=1024,
+                 cacheBytes=8 * 1024 * 1024, maxCursors=1000, maxExpansions=50, buildWorkers=1,
+                 backgroundMerge=True, indexFormat=None, lazy=None, buildMemory=None, analyzer=None,
+                 stemCacheSize=STEM_CACHE_SIZE):
         '''
         Initialize the search engine, i.e. create or read in index.
         If create=True, the search index should be created and written
@@ -24,43 +40,474 @@ class SearchEngine:
         If your program does not adhere to this "interface specification",
         we will subtract some points as it will be impossible for us
         to test your program automatically!
+        The backend selects how queries are scored:
+        - "maxscore" walks the postings of the query words document by document and skips documents that
+          can't enter the top k (default)
+        - "inverted" accumulates the scores of all documents in the postings of the query words
+        - "dict" compares the query vector with every document vector
+        - "numpy" scores all documents with one sparse matrix-vector product, this requires numpy
+        The scorer selects the ranking function, "cosine" (default), "bm25" or a scoring.Scorer, the "dict" backend
+        only supports the cosine similarity.
+        Query results are kept in an LRU cache bounded by cacheEntries entries and about cacheBytes bytes,
+        cacheEntries=0 disables the cache.
+        At most maxCursors paginated queries are kept, see executeQueryPage.
+        Query terms with the wildcards * and ? (e.g. 'hurric*') are expanded to at most maxExpansions words of the
+        index.
+        If create=True, buildWorkers > 1 preprocesses the documents in that many worker processes, the index files are
+        the same as with a single process.
+        If backgroundMerge=True, the segments that addDocuments and deleteDocuments leave behind are merged in a
+        background thread, see Index.merge.
+        The indexFormat selects how the postings of new segments are written, "text" (default) for the tab separated
+        .tf, .len and .pos files of the interface above, "binary" for a memory mapped file per segment instead of the
+        .tf file or "compressed" for a memory mapped file with variable-byte coded postings that is about a third of
+        the size, see Index.convertFormat. If buildMemory is given, the default is "binary".
+        If lazy=True, an index of binary segments is opened without reading its postings, the postings of a word are
+        decoded the first time a query needs them, see Index.openLazy. A lazily opened index can't be changed and
+        doesn't support the "dict" backend. By default an index is only opened lazily if buildMemory is given and all
+        its segments are binary, lazy=False reads it into memory, e.g. to add documents.
+        If buildMemory is given, the index and the segments of addDocuments are built with at most about buildMemory
+        bytes of postings in memory, larger collections are inverted in sorted runs on disk that are merged afterwards,
+        see indexBuilder.SpimiWriter.
+        The analyzer turns the documents and the queries into words, e.g. analyzer.Analyzer(stopwords=...) leaves out
+        stopwords. An index has to be read with the analyzer it was created with, None uses the default analyzer.
+        The stems of at most stemCacheSize words are cached and stored with the index in <collectionName>.stems, so
+        only words that weren't seen before are stemmed when the index is built, documents are added or queries are
+        run, see analyzer.StemCache.
         '''
+        if backend not in ("maxscore", "inverted", "dict", "numpy"):
+            raise ValueError("Unknown backend: " + str(backend))
+        self.backend = backend
+        self.scorer = createScorer(scorer)
+        if self.backend == "dict" and not isinstance(self.scorer, CosineScorer):
+            raise ValueError("The dict backend only supports the cosine similarity")
+        if self.backend == "dict" and lazy:
+            raise ValueError("The dict backend needs the tf values of all documents, it can't be used with lazy=True")
+        if self.backend == "dict":
+            lazy = False
         if create:
             print("Creating index")
         else:
             print("Reading index")
-        self.index = Index(collectionName, create)
+        self.index = Index(collectionName, create, buildWorkers, indexFormat, lazy, buildMemory, analyzer,
+                           stemCacheSize)
         print("Done")
+        self.buildWorkers = buildWorkers
+        self.backgroundMerge = backgroundMerge
         self.VectorList = []
-        # create VectorList using self.index.tf
-        for doc in self.index.tf:
-            vector = Vector(index_name=doc, tf=self.index.tf[doc], idf=self.index.idf)
-            self.VectorList.append(vector)
+        self.matrix = None
+        self.refresh()
+        self.cache = QueryResultCache(cacheEntries, cacheBytes)
+        self.cursors = CursorStore(maxCursors)
+        self.maxExpansions = maxExpansions
 
+    def refresh(self):
+        '''
+        Create the data structures of the backend from the index again, this is needed after the index changed, e.g.
+        after addDocuments. Cached results and cursors notice the change by the generation number of the index.
+        '''
+        self.VectorList = []
+        if self.backend == "dict":
+            # create VectorList using self.index.tf
+            for doc in self.index.tf:
+                vector = Vector(index_name=doc, tf=self.index.tf[doc], idf=self.index.idf, norm=self.index.norms[doc])
+                self.VectorList.append(vector)
+        self.matrix = None
+        if self.backend == "numpy":
+            self.matrix = DocumentTermMatrix(self.index, self.index.impacts(self.scorer)[0])
 
-    def executeQuery(self, queryTerms):
+    def addDocuments(self, xmlPath, replace=False):
+        '''
+        Input to this function: path to an XML file with new <DOC> elements
+        Adds the documents to the index as a new segment without creating the whole index again, see
+        Index.addDocuments. If replace=True, documents whose id is already part of the index replace the old
+        documents, otherwise they are skipped.
+        Returns the number of added documents.
+        '''
+        added = self.index.addDocuments(xmlPath, self.buildWorkers, replace)
+        if added:
+            self.refresh()
+            self.startMerge()
+        return added
+
+    def deleteDocuments(self, documentIds):
+        '''
+        Input to this function: list of document ids, e.g. ['NYT_ENG_19950101.0001']
+        Deletes the documents from the index, see Index.deleteDocuments, ids that aren't part of the index are
+        ignored.
+        Returns the number of deleted documents.
+        '''
+        deleted = self.index.deleteDocuments(documentIds)
+        if deleted:
+            self.refresh()
+            self.startMerge()
+        return deleted
+
+    def startMerge(self):
+        '''
+        Merge the segments of the index in a background thread if backgroundMerge is True, see Index.merge. The
+        documents keep their ids, so queries can run while the segments are merged.
+        '''
+        if self.backgroundMerge:
+            self.index.startMerge()
+
+    def executeQuery(self, queryTerms, k=10):
         '''
         Input to this function: list of query terms
         Returns a sorted list of tuples: [('NYT_ENG_19950101.0001', 0.07237004260325626),
         ('NYT_ENG_19950101.0022', 0.013039249597972629)]
-        ==> Top 10 documents, sorted by their tf.idf-sum score (highest score,
+        ==> Top k (default 10) documents, sorted by their tf.idf-sum score (highest score,
             = most relevant document comes first).
-            (May be less than 10 documents if there aren't as many documents that contain
+            (May be less than k documents if there aren't as many documents that contain
             the terms.)
         '''
-        # create query vector
-        queryVector = Vector(idf=self.index.idf, world_list=[queryTerms])
-        result = []
-        # iterate over all document vectors and calculate similarity
-        for vector in self.VectorList:
-            result.append((vector.index_name, queryVector.similarity(vector)))
-        result.sort(key=lambda x: x[1], reverse=True)
-        # return max top ten results, results with score 0 are not returned
-        r_result = [x for x in result if x[1] != 0][:10]
+        # count the stemmed query words
+        queryCounts = self.createQueryCounts([queryTerms])[0]
+        if queryCounts is None:
+            print("No results found")
+            return []
+        return self.executeQueryCounts(queryCounts, k)
+
+    def executeQueryCounts(self, queryCounts, k=10):
+        '''
+        Input to this function: dict with the stemmed query words as keys and their number of occurrences as value
+        Returns the top k documents in the same format as executeQuery, the results are cached.
+        '''
+        self.cache.checkGeneration(self.index.generation)
+        key = QueryResultCache.createKey(self.scorer.queryKey(queryCounts), k)
+        r_result = self.cache.get(key)
+        if r_result is None:
+            r_result = [(self.index.documents[doc_id], score) for doc_id, score in self.scoreQuery(queryCounts, k)]
+            self.cache.put(key, r_result)
+        # results with score 0 are not returned
         if len(r_result) == 0:
             print("No results found")
         return r_result
 
+    def executeQueryPage(self, queryTerms=None, pageSize=10, cursor=None, prefetchPages=5):
+        '''
+        Input to this function: list of query terms for the first page, or the cursor returned with the previous page
+        Returns a dict {'results': [...], 'cursor': '...'}, the results have the format of executeQuery, the cursor is
+        None after the last page.
+        The first page ranks the top pageSize * prefetchPages documents and keeps them with the cursor, so the following
+        pages are slices of that list. Only when a page goes beyond it, the query is ranked again with twice as many
+        documents. Cursors that were dropped because more than maxCursors queries are live raise a ValueError.
+        '''
+        if cursor is None:
+            queryCounts = self.createQueryCounts([queryTerms])[0]
+            if queryCounts is None:
+                return {"results": [], "cursor": None}
+            state = {"queryCounts": queryCounts, "generation": None, "ranked": [], "complete": False}
+            cursorId = self.cursors.create(state)
+            offset = 0
+        else:
+            cursorId, offset = decodeCursor(cursor)
+            state = self.cursors.get(cursorId)
+            if state is None:
+                raise ValueError("Unknown or expired cursor: " + cursor)
+        if state["generation"] != self.index.generation:
+            # the index changed since the query was ranked, so the kept ranking can't be used anymore
+            state["ranked"] = []
+            state["complete"] = False
+            state["generation"] = self.index.generation
+        if offset + pageSize > len(state["ranked"]) and not state["complete"]:
+            k = max(pageSize * prefetchPages, 2 * len(state["ranked"]), offset + pageSize)
+            state["ranked"] = self.scoreQuery(state["queryCounts"], k)
+            state["complete"] = len(state["ranked"]) < k
+        page = state["ranked"][offset:offset + pageSize]
+        offset += len(page)
+        if offset >= len(state["ranked"]) and state["complete"]:
+            self.cursors.remove(cursorId)
+            nextCursor = None
+        else:
+            nextCursor = encodeCursor(cursorId, offset)
+        return {"results": [(self.index.documents[doc_id], score) for doc_id, score in page], "cursor": nextCursor}
+
+    def scoreQuery(self, queryCounts, k):
+        '''
+        Score a single query with the selected backend and ranking function.
+        Returns the top k (document id, score) tuples sorted by score, ties are sorted by document id.
+        '''
+        if self.backend == "dict":
+            return self.scoreExhaustive(self.createQueryVector(queryCounts), k)
+        queryWeights = self.scorer.queryWeights(queryCounts, self.index)
+        if self.backend == "inverted":
+            return self.scoreInverted(queryWeights, k)
+        elif self.backend == "numpy":
+            return self.scoreMatrix(queryWeights, k)
+        return self.scoreMaxScore(queryWeights, k)
+
+    def executeQueries(self, queryTermsList, k=10):
+        '''
+        Input to this function: list of queries, every query is a list of query terms
+        Returns a list with the result of every query, in the same format as executeQuery.
+        All queries are preprocessed together so every distinct word is only stemmed once, and are scored as a batch:
+        the "inverted" and "maxscore" backends walk every postings list only once for all queries that contain the
+        word, the "numpy" backend multiplies the document matrix with a query matrix.
+        '''
+        queryCountsList = self.createQueryCounts(queryTermsList)
+        self.cache.checkGeneration(self.index.generation)
+        results = [None] * len(queryCountsList)
+        keys = [None] * len(queryCountsList)
+        # only the queries that are not cached are scored
+        missing = []
+        for i, queryCounts in enumerate(queryCountsList):
+            if queryCounts is None:
+                results[i] = []
+                continue
+            keys[i] = QueryResultCache.createKey(self.scorer.queryKey(queryCounts), k)
+            results[i] = self.cache.get(keys[i])
+            if results[i] is None:
+                missing.append(i)
+        if self.backend == "dict":
+            scored = [self.scoreExhaustive(self.createQueryVector(queryCountsList[i]), k) for i in missing]
+        else:
+            queryWeightsList = [self.scorer.queryWeights(queryCountsList[i], self.index) for i in missing]
+            if self.backend == "numpy":
+                scored = self.scoreMatrixBatch(queryWeightsList, k)
+            else:
+                scored = self.scoreInvertedBatch(queryWeightsList, k)
+        for i, result in zip(missing, scored):
+            results[i] = [(self.index.documents[doc_id], score) for doc_id, score in result]
+            self.cache.put(keys[i], results[i])
+        return results
+
+    def createQueryCounts(self, queryTermsList):
+        '''
+        Count the stemmed words of a list of queries, see searchEngineUtil.preprocessQueries.
+        Terms with wildcards are expanded with the term dictionary of the index, see
+        searchEngineUtil.preprocessWildcardQueries.
+        Returns a list with a dict of the stemmed words and their counts for every query, None for queries without any
+        words.
+        '''
+        return preprocessWildcardQueries(queryTermsList, self.index.analyzer, self.index.terms, self.maxExpansions)
+
+    def executeQuerySnippets(self, queryTerms, k=10, length=30):
+        '''
+        Input to this function: list of query terms
+        Returns the top k documents like executeQuery, every result is a dict with the document index ('id'), the
+        'score', the 'headline' and a 'snippet' of length words in which the query words are highlighted, see
+        createSnippets.
+        '''
+        queryCounts = self.createQueryCounts([queryTerms])[0]
+        if queryCounts is None:
+            print("No results found")
+            return []
+        return self.createSnippets(self.executeQueryCounts(queryCounts, k), queryCounts, length)
+
+    def createSnippets(self, results, words, length=30, highlight=("<b>", "</b>")):
+        '''
+        Fetch the headline and text of the result documents from the document store and create a snippet for each of
+        them, see documentStore.createSnippet, only the documents of the results are read.
+        Returns a list of dicts with the keys 'id', 'score', 'headline' and 'snippet'.
+        '''
+        if self.index.documentStore is None:
+            raise ValueError("The index has no document store, create it again to show snippets")
+        words = set(words)
+        snippets = []
+        for ind, score in results:
+            headline, text = self.index.readDocument(ind)
+            snippets.append({"id": ind, "score": score, "headline": headline,
+                             "snippet": createSnippet(text, words, length, highlight, self.index.analyzer)})
+        return snippets
+
+    def correctQuery(self, queryTerms):
+        '''
+        Input to this function: list of query terms
+        Returns the list of query words in which every word that isn't part of the vocabulary is replaced by the
+        closest word of the vocabulary, see spelling.SpellingCorrector, or None if no word could be corrected. A
+        suggestion is a stem, it is shown as the word with this stem that appears in the most documents, e.g.
+        "hurricane" instead of "hurrican", see TermDictionary.surfaceForm. The other words are kept as they were
+        typed, terms with wildcards are ignored.
+        '''
+        analyzer = self.index.analyzer
+        words = analyzer.words(" ".join(term for term in queryTerms if not isWildcardTerm(term)).lower())
+        corrected = []
+        changed = False
+        for word in words:
+            stem = analyzer.stem(word)
+            suggestions = self.index.spellingCorrector().lookup(stem, 1)
+            if suggestions and suggestions[0][0] != stem:
+                corrected.append(self.index.terms.surfaceForm(suggestions[0][0]))
+                changed = True
+            else:
+                corrected.append(word)
+        if not changed:
+            return None
+        return corrected
+
+    def createQueryVector(self, queryCounts):
+        '''
+        Create the query vector of the counted query words, it is used by the "dict" backend.
+        '''
+        return Vector(index_name="query", tf=calculateDocumentTF(queryCounts), idf=self.index.idf)
+
+    def scoreExhaustive(self, queryVector, k):
+        '''
+        Calculate the similarity between the query vector and every document vector.
+        Returns the top k (document id, score) tuples sorted by score, ties are sorted by document id.
+        '''
+        # iterate over all document vectors and calculate similarity, VectorList is ordered by document id
+        return selectTopK(((doc_id, queryVector.similarity(vector)) for doc_id, vector in enumerate(self.VectorList)), k)
+
+    def scoreInverted(self, queryWeights, k):
+        '''
+        Calculate the scores of the documents that contain at least one query word by accumulating query weight * impact
+        over the postings lists of the query words, for the cosine similarity the impacts are the tf.idf weights divided
+        by the document norm and the query weights are divided by the query norm.
+        Returns the top k (document id, score) tuples sorted by score, ties are sorted by document id.
+        '''
+        postings, maxWeights = self.index.impacts(self.scorer)
+        scores = defaultdict(float)
+        # the words are visited in sorted order, so every backend adds the contributions of a document in the same order
+        for key in sorted(queryWeights):
+            value = queryWeights[key]
+            # words with a weight of 0 can't change the score
+            if value == 0:
+                continue
+            for doc_id, weight in postings.get(key, ()):
+                scores[doc_id] += value * weight
+        return selectTopK(scores.items(), k)
+
+    def scoreInvertedBatch(self, queryWeightsList, k):
+        '''
+        Calculate the scores of several queries by accumulating query weight * impact over the postings lists of their
+        words, every postings list is walked once for all queries that contain the word.
+        Returns a list with the top k (document id, score) tuples of every query.
+        '''
+        postings, maxWeights = self.index.impacts(self.scorer)
+        # dict that maps every word to the list of (query number, query weight) of the queries that contain it
+        wordQueries = defaultdict(list)
+        for i, queryWeights in enumerate(queryWeightsList):
+            for key, value in queryWeights.items():
+                if value != 0:
+                    wordQueries[key].append((i, value))
+        scores = [defaultdict(float) for _ in queryWeightsList]
+        # sorted like in scoreInverted, so a query scores the same alone and in a batch
+        for key in sorted(wordQueries):
+            weights = wordQueries[key]
+            for doc_id, weight in postings.get(key, ()):
+                for i, value in weights:
+                    scores[i][doc_id] += value * weight
+        return [selectTopK(query_scores.items(), k) for query_scores in scores]
+
+    def scoreMaxScore(self, queryWeights, k):
+        '''
+        Calculate the top k documents for the query weights with MaxScore dynamic pruning, documents that can't reach the
+        score of the current k-th best document are skipped.
+        Returns the top k (document id, score) tuples sorted by score, ties are sorted by document id.
+        '''
+        postings, maxWeights = self.index.impacts(self.scorer)
+        return maxScoreTopK(queryWeights, postings, maxWeights, k)
+
+    def scoreMatrix(self, queryWeights, k):
+        '''
+        Calculate the score of every document with a single sparse matrix-vector product over the CSR document-term
+        matrix.
+        Returns the top k (document id, score) tuples sorted by score, ties are sorted by document id.
+        '''
+        return topKFromArray(self.matrix.dot(self.matrix.queryVector(queryWeights)), k)
+
+    def scoreMatrixBatch(self, queryWeightsList, k):
+        '''
+        Calculate the scores of several queries with one product of the document matrix and a query matrix.
+        Returns a list with the top k (document id, score) tuples of every query.
+        '''
+        scores = self.matrix.dotBatch(queryWeightsList)
+        return [topKFromArray(scores[:, column], k) for column in range(len(queryWeightsList))]
+
+    def executePhraseQuery(self, queryTerms, k=10):
+        '''
+        Input to this function: list of query terms that form a phrase, e.g. ['orange', 'bowl']
+        Returns the top k documents that contain the exact phrase, in the same format as executeQuery, the documents
+        are ranked by the similarity with the query words.
+        '''
+        words = stemQueryTerms(queryTerms, self.index.analyzer)
+        return self.executePositionalQuery(words, phraseFrequency, k)
+
+    def executeProximityQuery(self, queryTerms, window, k=10):
+        '''
+        Input to this function: list of query terms and the maximal distance in words between the first and the last
+        query word
+        Returns the top k documents in which all query words occur within window words of each other, in the same
+        format as executeQuery, the documents are ranked by the similarity with the query words.
+        '''
+        # the order of the words doesn't matter for proximity, so every word only has to be covered once
+        words = sorted(set(stemQueryTerms(queryTerms, self.index.analyzer)))
+        return self.executePositionalQuery(words, lambda positionLists: proximityFrequency(positionLists, window), k)
+
+    def executePositionalQuery(self, words, matches, k):
+        '''
+        Find the documents that contain all words, starting the intersection from the rarest word, keep the documents
+        for which matches(positions of every word) is not 0 and rank them by their similarity with the words.
+        '''
+        if self.index.positions is None:
+            raise ValueError("The index has no positions, create it again to use phrase and proximity queries")
+        if not words or any(word not in self.index.positions for word in words):
+            print("No results found")
+            return []
+        candidates = intersectPostings([self.index.postings[word] for word in set(words)])
+        position_dicts = [self.index.positions[word] for word in words]
+        matched = [doc_id for doc_id in candidates
+                   if matches([position_dict[doc_id] for position_dict in position_dicts])]
+        return self.rankCandidates(words, SkipList(matched), k)
+
+    def executeBooleanQuery(self, query, k=10):
+        '''
+        Input to this function: boolean query string with the operators AND, OR, NOT and parentheses, e.g.
+        'hurricane AND (miami OR philadelphia) AND NOT nebraska', terms without an operator between them are combined
+        with AND
+        Returns the top k documents that match the query, in the same format as executeQuery, the documents are ranked by
+        their similarity with the words of the query that are not negated.
+        '''
+        node = parseBooleanQuery(query, self.index.analyzer)
+        matches = evaluateBooleanQuery(node, self.index.postings)
+        return self.rankCandidates(queryWords(node), matches, k)
+
+    def rankCandidates(self, words, matches, k):
+        '''
+        Rank the matching documents by their score for the stemmed words. Every candidate is looked up in the postings
+        of the words with a galloping search, so only the candidates are scored, for a negated list of matches the
+        documents in the postings of the words that are not excluded are scored.
+        Returns the top k candidates in the same format as executeQuery.
+        '''
+        # the words are already stemmed, so they are counted directly
+        word_count = defaultdict(int)
+        for word in words:
+            word_count[word] += 1
+        scores = dict()
+        if word_count:
+            postings, maxWeights = self.index.impacts(self.scorer)
+            queryWeights = self.scorer.queryWeights(word_count, self.index)
+            excluded = set(matches.docIds) if matches.negated else None
+            # the words are visited in sorted order like in scoreInverted
+            for key in sorted(queryWeights):
+                value = queryWeights[key]
+                postings_list = postings.get(key, ())
+                if matches.negated:
+                    for doc_id, weight in postings_list:
+                        if doc_id not in excluded:
+                            scores[doc_id] = scores.get(doc_id, 0.0) + value * weight
+                    continue
+                position = 0
+                for doc_id in matches.docIds:
+                    position = gallopingSearch(postings_list, doc_id, position)
+                    if position == len(postings_list):
+                        break
+                    if postings_list[position][0] == doc_id:
+                        scores[doc_id] = scores.get(doc_id, 0.0) + value * postings_list[position][1]
+        result = selectTopK(scores.items(), k)
+        # matches that only contain words with a weight of 0 (or no words at all, e.g. for NOT queries) get a score of
+        # 0 and are ranked last by document id, the complement of a negated list is only walked until k are found
+        if len(result) < k:
+            for doc_id in matches.iterate(len(self.index.documents)):
+                if scores.get(doc_id, 0.0) == 0:
+                    result.append((doc_id, 0.0))
+                    if len(result) == k:
+                        break
+        if len(result) == 0:
+            print("No results found")
+        return [(self.index.documents[doc_id], score) for doc_id, score in result]
+
     def executeQueryConsole(self):
         '''
         When calling this, the interactive console should be started, ask for queries
@@ -73,8 +520,24 @@ class SearchEngine:
             else:
                 # print(self.executeQuery(query.split()))
                 # for testing format result to have each doc with score in one line
-                for result in self.executeQuery(query.split()):
-                    print(result[0], result[1])
+                results = self.executeQuery(query.split())
+                words = self.createQueryCounts([query.split()])[0]
+                if not results:
+                    # misspelled words produce no results, so the query is searched again with the closest words
+                    corrected = self.correctQuery(query.split())
+                    if corrected is not None:
+                        print("Did you mean: " + " ".join(corrected) + "?")
+                        words = self.createQueryCounts([corrected])[0]
+                        results = self.executeQuery(corrected)
+                if self.index.documentStore is None:
+                    for result in results:
+                        print(result[0], result[1])
+                else:
+                    for result in self.createSnippets(results, words or (), highlight=("*", "*")):
+                        print(result["id"], result["score"])
+                        if result["headline"]:
+                            print("  " + result["headline"])
+                        print("  " + result["snippet"])
         
         
 
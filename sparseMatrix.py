@@ -0,0 +1,152 @@
+# numpy is optional, it is only needed for the "numpy" backend of the search engine and imported when the first matrix
+# is created, see importNumpy
+np = None
+
+
+def importNumpy():
+    """
+    Import numpy once for the matrix backend
+    :raises ImportError: if numpy is not installed
+    :return: None
+    :rtype: None
+    """
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("The numpy backend requires numpy to be installed")
+        np = numpy
+
+
+class DocumentTermMatrix:
+    """
+    Class that holds the impacts of a collection, e.g. the normalized tf.idf weights, as a CSR (compressed sparse row)
+    document-term matrix, so a query can be scored against every document with a single sparse matrix-vector product
+    """
+    def __init__(self, index, postings=None):
+        """
+        Initialize the matrix from an index. The rows are the documents in document id order, the columns are the words
+        of the vocabulary in the (sorted) order of index.idf.
+        :param index: the index of the collection
+        :type index: Index
+        :param postings: dict with the words as keys and the postings list of (document id, impact) as value, defaults
+         to the postings of the index
+        :type postings: dict[str, list[tuple[int, float]]]
+        :raises ImportError: if numpy is not installed
+        :return: None
+        :rtype: None
+        """
+        importNumpy()
+        # dict that maps every word of the vocabulary to its integer term id, which is its column in the matrix
+        self.vocabulary = {key: term_id for term_id, key in enumerate(index.idf)}
+        # collect the rows from the postings, the cosine postings already hold the weights divided by the document norms
+        rows = [[] for _ in index.documents]
+        for key, postings_list in (index.postings if postings is None else postings).items():
+            term_id = self.vocabulary.get(key)
+            if term_id is None:
+                continue
+            for doc_id, weight in postings_list:
+                rows[doc_id].append((term_id, weight))
+        indptr = [0]
+        indices = []
+        data = []
+        for row in rows:
+            row.sort()
+            indices.extend(term_id for term_id, _ in row)
+            data.extend(weight for _, weight in row)
+            indptr.append(len(indices))
+        # CSR arrays: the values of row i are data[indptr[i]:indptr[i + 1]] in the columns indices[indptr[i]:indptr[i + 1]]
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.indices = np.array(indices, dtype=np.int64)
+        self.data = np.array(data, dtype=np.float64)
+        # the row of every stored value, this allows computing all row sums at once with np.bincount
+        self.rows = np.repeat(np.arange(len(index.documents), dtype=np.int64), np.diff(self.indptr))
+        self.shape = (len(index.documents), len(self.vocabulary))
+
+    def queryVector(self, tf_idf):
+        """
+        Create a dense query vector over the vocabulary, words that are not in the vocabulary are dropped
+        :param tf_idf: dict with the query words as keys and their weight as value
+        :type tf_idf: dict[str, float]
+        :return: query vector with one entry per column of the matrix
+        :rtype: numpy.ndarray
+        """
+        query = np.zeros(self.shape[1], dtype=np.float64)
+        for key, value in tf_idf.items():
+            term_id = self.vocabulary.get(key)
+            if term_id is not None:
+                query[term_id] = value
+        return query
+
+    def dot(self, query):
+        """
+        Calculate the dot product of every document with the query vector, this is the score of every document
+        :param query: dense query vector, see queryVector
+        :type query: numpy.ndarray
+        :return: dot products indexed by document id
+        :rtype: numpy.ndarray
+        """
+        return np.bincount(self.rows, weights=self.data * query[self.indices], minlength=self.shape[0])
+
+    def dotBatch(self, tf_idfs, chunkSize=256):
+        """
+        Calculate the dot product of every document with every query, this is the product of the document matrix
+        with a query matrix that only has rows for the words used by at least one of the queries. The scores of a
+        query are the same as the ones of dot.
+        :param tf_idfs: list of dicts with the query words as keys and their weight as value
+        :type tf_idfs: list[dict[str, float]]
+        :param chunkSize: number of queries that are multiplied at once, this bounds the size of the intermediate arrays
+        :type chunkSize: int
+        :return: dot products with one row per document and one column per query
+        :rtype: numpy.ndarray
+        """
+        scores = np.zeros((self.shape[0], len(tf_idfs)), dtype=np.float64)
+        for start in range(0, len(tf_idfs), chunkSize):
+            chunk = tf_idfs[start:start + chunkSize]
+            # map the columns of the words used in this chunk to the rows of the compact query matrix
+            columns = sorted({self.vocabulary[key] for tf_idf in chunk for key in tf_idf if key in self.vocabulary})
+            if not columns:
+                continue
+            column_map = np.full(self.shape[1], -1, dtype=np.int64)
+            column_map[columns] = np.arange(len(columns))
+            query_matrix = np.zeros((len(columns), len(chunk)), dtype=np.float64)
+            for j, tf_idf in enumerate(chunk):
+                for key, value in tf_idf.items():
+                    term_id = self.vocabulary.get(key)
+                    if term_id is not None:
+                        query_matrix[column_map[term_id], j] = value
+            # only the stored values in the used columns contribute, they stay sorted by row
+            selected = np.flatnonzero(column_map[self.indices] >= 0)
+            if len(selected) == 0:
+                continue
+            data = self.data[selected]
+            rows = self.rows[selected]
+            query_rows = column_map[self.indices[selected]]
+            # every column is summed with np.bincount like in dot, so the products of a document are added in the same
+            # order and a query gets exactly the same scores alone and in a batch
+            for j in range(len(chunk)):
+                scores[:, start + j] = np.bincount(rows, weights=data * query_matrix[query_rows, j],
+                                                   minlength=self.shape[0])
+        return scores
+
+
+def topKFromArray(scores, k):
+    """
+    Select the k best scored documents from an array of scores, the result is the same as topK.selectTopK
+    :param scores: scores indexed by document id
+    :type scores: numpy.ndarray
+    :param k: maximal number of documents to return
+    :type k: int
+    :return: list of at most k (document id, score) tuples sorted by score, ties sorted by document id
+    :rtype: list[tuple[int, float]]
+    """
+    if k <= 0:
+        return []
+    candidates = np.flatnonzero(scores)
+    if len(candidates) > k:
+        # keep every document that scores at least as high as the k-th best, ties are resolved by the sort below
+        kth_score = np.partition(scores[candidates], len(candidates) - k)[len(candidates) - k]
+        candidates = candidates[scores[candidates] >= kth_score]
+    order = np.lexsort((candidates, -scores[candidates]))[:k]
+    return [(int(doc_id), float(scores[doc_id])) for doc_id in candidates[order]]
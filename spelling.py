@@ -0,0 +1,188 @@
+from collections import defaultdict
+
+# largest edit distance of a suggestion, the deletes of the index are created for this distance
+MAX_EDIT_DISTANCE = 2
+# only the first PREFIX_LENGTH characters of a word are used to create its deletes, this keeps the number of deletes of
+# long words small, the candidates are checked with the edit distance of the whole word
+PREFIX_LENGTH = 7
+
+
+def createWordDeletes(word, maxDistance=MAX_EDIT_DISTANCE, prefixLength=PREFIX_LENGTH):
+    """
+    Create all strings that result from deleting at most maxDistance characters of the prefix of a word
+    :param word: the word
+    :type word: str
+    :param maxDistance: largest number of deleted characters
+    :type maxDistance: int
+    :param prefixLength: length of the prefix
+    :type prefixLength: int
+    :return: set of the deletes, including the prefix itself
+    :rtype: set[str]
+    """
+    deletes = {word[:prefixLength]}
+    current = deletes
+    for _ in range(maxDistance):
+        current = {variant[:i] + variant[i + 1:] for variant in current for i in range(len(variant))}
+        deletes |= current
+    return deletes
+
+
+def createDeletes(words, maxDistance=MAX_EDIT_DISTANCE, prefixLength=PREFIX_LENGTH):
+    """
+    Create the symmetric delete index of a vocabulary, it maps every delete to the words it was created from
+    :param words: the words of the vocabulary
+    :type words: iterable[str]
+    :param maxDistance: largest number of deleted characters
+    :type maxDistance: int
+    :param prefixLength: length of the prefix of a word that is used to create its deletes
+    :type prefixLength: int
+    :return: dict with the deletes as keys and the list of words as value
+    :rtype: dict[str, list[str]]
+    """
+    deletes = defaultdict(list)
+    addDeletes(deletes, words, maxDistance, prefixLength)
+    return deletes
+
+
+def addDeletes(deletes, words, maxDistance=MAX_EDIT_DISTANCE, prefixLength=PREFIX_LENGTH):
+    """
+    Add the deletes of new words to a delete index, see createDeletes
+    :param deletes: dict with the deletes as keys and the list of words as value
+    :type deletes: dict[str, list[str]]
+    :param words: the new words
+    :type words: iterable[str]
+    :param maxDistance: largest number of deleted characters
+    :type maxDistance: int
+    :param prefixLength: length of the prefix of a word that is used to create its deletes
+    :type prefixLength: int
+    :return: None
+    :rtype: None
+    """
+    for word in words:
+        # the deletes are sorted so that the order of the .spell file doesn't depend on the hashing of strings
+        for delete in sorted(createWordDeletes(word, maxDistance, prefixLength)):
+            deletes.setdefault(delete, []).append(word)
+
+
+def removeDeletes(deletes, words, maxDistance=MAX_EDIT_DISTANCE, prefixLength=PREFIX_LENGTH):
+    """
+    Remove words that are no longer part of the vocabulary from a delete index, see createDeletes
+    :param deletes: dict with the deletes as keys and the list of words as value
+    :type deletes: dict[str, list[str]]
+    :param words: the removed words
+    :type words: iterable[str]
+    :param maxDistance: largest number of deleted characters
+    :type maxDistance: int
+    :param prefixLength: length of the prefix of a word that is used to create its deletes
+    :type prefixLength: int
+    :return: None
+    :rtype: None
+    """
+    for word in words:
+        for delete in createWordDeletes(word, maxDistance, prefixLength):
+            if word in deletes.get(delete, ()):
+                deletes[delete].remove(word)
+                if not deletes[delete]:
+                    del deletes[delete]
+
+
+def editDistance(word1, word2, maxDistance):
+    """
+    Calculate the optimal string alignment distance of two words, i.e. the number of insertions, deletions,
+    substitutions and transpositions of adjacent characters. The calculation stops as soon as the distance must be
+    larger than maxDistance.
+    :param word1: first word
+    :type word1: str
+    :param word2: second word
+    :type word2: str
+    :param maxDistance: largest distance of interest
+    :type maxDistance: int
+    :return: the distance or maxDistance + 1 if it is larger than maxDistance
+    :rtype: int
+    """
+    if abs(len(word1) - len(word2)) > maxDistance:
+        return maxDistance + 1
+    # a common prefix and suffix don't change the distance
+    start = 0
+    while start < len(word1) and start < len(word2) and word1[start] == word2[start]:
+        start += 1
+    end = 0
+    while end < len(word1) - start and end < len(word2) - start and word1[-1 - end] == word2[-1 - end]:
+        end += 1
+    word1 = word1[start:len(word1) - end]
+    word2 = word2[start:len(word2) - end]
+    if not word1 or not word2:
+        return min(len(word1) + len(word2), maxDistance + 1)
+    previous2 = None
+    previous = list(range(len(word2) + 1))
+    for i in range(1, len(word1) + 1):
+        current = [i] + [0] * len(word2)
+        for j in range(1, len(word2) + 1):
+            cost = 0 if word1[i - 1] == word2[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and word1[i - 1] == word2[j - 2] and word1[i - 2] == word2[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        # the distance can't get smaller than the smallest value of a row
+        if min(current) > maxDistance:
+            return maxDistance + 1
+        previous2, previous = previous, current
+    return min(previous[-1], maxDistance + 1)
+
+
+class SpellingCorrector:
+    """
+    Class that suggests words of the vocabulary for a misspelled word with the symmetric delete algorithm. The deletes
+    of every word of the vocabulary are created once, a word is looked up by creating its own deletes, the words that
+    share a delete are the only candidates whose edit distance has to be calculated.
+    """
+    def __init__(self, deletes, frequencies, maxDistance=MAX_EDIT_DISTANCE, prefixLength=PREFIX_LENGTH):
+        """
+        Initialize the corrector
+        :param deletes: the delete index of the vocabulary, see createDeletes
+        :type deletes: dict[str, list[str]]
+        :param frequencies: dict with the words of the vocabulary as keys and their document frequency as value, more
+         frequent words are suggested first
+        :type frequencies: dict[str, int]
+        :param maxDistance: largest edit distance of a suggestion, at most the distance the deletes were created for
+        :type maxDistance: int
+        :param prefixLength: length of the prefix the deletes were created from
+        :type prefixLength: int
+        :return: None
+        :rtype: None
+        """
+        self.deletes = deletes
+        self.frequencies = frequencies
+        self.maxDistance = maxDistance
+        self.prefixLength = prefixLength
+
+    def lookup(self, word, maxSuggestions=5):
+        """
+        Return the words of the vocabulary within maxDistance of word
+        :param word: the (stemmed) word
+        :type word: str
+        :param maxSuggestions: maximal number of suggestions
+        :type maxSuggestions: int
+        :return: list of (word, edit distance) tuples sorted by distance, then by decreasing frequency, then by word,
+         [(word, 0)] if the word is part of the vocabulary
+        :rtype: list[tuple[str, int]]
+        """
+        if word in self.frequencies:
+            return [(word, 0)]
+        distances = dict()
+        seen = set()
+        level = {word[:self.prefixLength]}
+        for deleted in range(self.maxDistance + 1):
+            for delete in level:
+                for candidate in self.deletes.get(delete, ()):
+                    if candidate not in distances:
+                        distances[candidate] = editDistance(word, candidate, self.maxDistance)
+            seen |= level
+            # every word within distance d shares a delete with word that needs at most d deletions, so if there are
+            # enough suggestions within the current number of deletions, the next levels can't add better ones
+            if sum(1 for distance in distances.values() if distance <= deleted) >= maxSuggestions:
+                break
+            level = {variant[:i] + variant[i + 1:] for variant in level for i in range(len(variant))} - seen
+        suggestions = [(candidate, distance) for candidate, distance in distances.items()
+                       if distance <= self.maxDistance]
+        suggestions.sort(key=lambda x: (x[1], -self.frequencies.get(x[0], 0), x[0]))
+        return suggestions[:maxSuggestions]
@@ -0,0 +1,170 @@
+import fnmatch
+import re
+import string
+from bisect import bisect_left
+
+# characters that are wildcards in a term pattern, * matches any number of characters and ? exactly one
+WILDCARDS = "*?"
+# table for str.translate that deletes the punctuation except the wildcards
+PATTERN_TABLE = str.maketrans("", "", "".join(char for char in string.punctuation if char not in WILDCARDS))
+
+
+def isWildcardTerm(term):
+    """
+    Check if a query term is a wildcard pattern
+    :param term: query term
+    :type term: str
+    :return: True if the term contains a wildcard
+    :rtype: bool
+    """
+    return any(char in term for char in WILDCARDS)
+
+
+def normalizePattern(pattern):
+    """
+    Lowercase a pattern and remove punctuation like preprocess does for the words of a document, wildcards are kept
+    :param pattern: wildcard pattern, e.g. "Hurric*"
+    :type pattern: str
+    :return: the normalized pattern
+    :rtype: str
+    """
+    return pattern.lower().translate(PATTERN_TABLE)
+
+
+class TermDictionary:
+    """
+    Class that holds the words of the documents as a sorted word array and a sorted array of the reversed words (a
+    reversed index). A prefix is a range in the sorted words, a suffix is a range in the reversed words, both ranges are
+    found with a binary search, so expanding a pattern only touches the words that share its literal prefix or suffix.
+    The words are the words of the documents before stemming, e.g. "hurricane", so a pattern matches what the user
+    sees in the documents, and every matching word is mapped to its stem, e.g. "hurrican", the word of the vocabulary.
+    """
+    def __init__(self, words, vocabulary=None):
+        """
+        Initialize the dictionary
+        :param words: dict with the words of the documents as keys and a tuple of their stem and the number of documents
+         they appear in as value, see Index.words, or the stemmed words of the vocabulary, e.g. the keys of Index.idf,
+         for an index without a .words file
+        :type words: dict[str, tuple[str, int]] or iterable[str]
+        :param vocabulary: the stemmed words of the vocabulary, words whose stem is not part of it are left out, None to
+         keep all words
+        :type vocabulary: dict[str, float] or set[str] or None
+        :return: None
+        :rtype: None
+        """
+        # dict with the words as keys and their stem as value
+        self.stems = dict()
+        # dict with the stems as keys and the word that appears in the most documents as value, see surfaceForm
+        self.surfaceForms = dict()
+        if isinstance(words, dict) and isinstance(next(iter(words.values()), None), tuple):
+            counts = dict()
+            for word, (stem, count) in words.items():
+                if vocabulary is not None and stem not in vocabulary:
+                    continue
+                self.stems[word] = stem
+                # ties are broken by the smaller word, so the result doesn't depend on the order of the words
+                if count > counts.get(stem, 0) or (count == counts[stem] and word < self.surfaceForms[stem]):
+                    counts[stem] = count
+                    self.surfaceForms[stem] = word
+        else:
+            self.stems = {word: word for word in words if vocabulary is None or word in vocabulary}
+        self.terms = sorted(self.stems)
+        self.reversedTerms = sorted(word[::-1] for word in self.terms)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def surfaceForm(self, stem):
+        """
+        Return the word of the documents that a stem is shown as, e.g. "hurricane" for "hurrican", this is the word
+        with the stem that appears in the most documents
+        :param stem: stemmed word of the vocabulary
+        :type stem: str
+        :return: the word, the stem itself if the dictionary has no word with this stem
+        :rtype: str
+        """
+        return self.surfaceForms.get(stem, stem)
+
+    @staticmethod
+    def prefixRange(sortedTerms, prefix):
+        """
+        Find the range of the terms that start with prefix
+        :param sortedTerms: sorted list of terms
+        :type sortedTerms: list[str]
+        :param prefix: the prefix
+        :type prefix: str
+        :return: (start, end) so that sortedTerms[start:end] are the terms with the prefix
+        :rtype: (int, int)
+        """
+        start = bisect_left(sortedTerms, prefix)
+        # every term with the prefix sorts before prefix followed by the largest code point
+        end = bisect_left(sortedTerms, prefix + chr(0x10FFFF), lo=start)
+        return start, end
+
+    def prefix(self, prefix, maxExpansions=50):
+        """
+        Return the words that start with prefix, at most maxExpansions of them in sorted order
+        :param prefix: the prefix
+        :type prefix: str
+        :param maxExpansions: maximal number of words
+        :type maxExpansions: int
+        :return: list of words
+        :rtype: list[str]
+        """
+        start, end = self.prefixRange(self.terms, prefix)
+        return self.terms[start:min(end, start + maxExpansions)]
+
+    def suffix(self, suffix, maxExpansions=50):
+        """
+        Return the words that end with suffix, at most maxExpansions of them in sorted order of the reversed words
+        :param suffix: the suffix
+        :type suffix: str
+        :param maxExpansions: maximal number of words
+        :type maxExpansions: int
+        :return: list of words
+        :rtype: list[str]
+        """
+        start, end = self.prefixRange(self.reversedTerms, suffix[::-1])
+        return [term[::-1] for term in self.reversedTerms[start:min(end, start + maxExpansions)]]
+
+    def expand(self, pattern, maxExpansions=50, maxScanned=10000):
+        """
+        Return the stems of the words that match a wildcard pattern like "hurric*", "*cane" or "hur*c?ne". The literal
+        prefix before the first wildcard and the literal suffix after the last wildcard select a range of the sorted or
+        of the reversed words, whichever is smaller, and only the words in that range are matched against the whole
+        pattern. Words with the same stem, e.g. "hurricane" and "hurricanes", are expanded to their stem once.
+        :param pattern: wildcard pattern, it should be normalized, see normalizePattern
+        :type pattern: str
+        :param maxExpansions: maximal number of stems that are returned
+        :type maxExpansions: int
+        :param maxScanned: maximal number of words that are matched against the pattern, this bounds the time of
+         patterns without a literal prefix or suffix
+        :type maxScanned: int
+        :return: list of the stems of the matching words
+        :rtype: list[str]
+        """
+        if not isWildcardTerm(pattern):
+            return [self.stems[pattern]] if pattern in self.stems else []
+        first = min(pattern.index(char) for char in WILDCARDS if char in pattern)
+        last = max(pattern.rindex(char) for char in WILDCARDS if char in pattern)
+        literal_prefix = pattern[:first]
+        literal_suffix = pattern[last + 1:]
+        prefix_start, prefix_end = self.prefixRange(self.terms, literal_prefix)
+        suffix_start, suffix_end = self.prefixRange(self.reversedTerms, literal_suffix[::-1])
+        if prefix_end - prefix_start <= suffix_end - suffix_start:
+            candidates = self.terms[prefix_start:min(prefix_end, prefix_start + maxScanned)]
+        else:
+            candidates = [term[::-1] for term in
+                          self.reversedTerms[suffix_start:min(suffix_end, suffix_start + maxScanned)]]
+        regex = re.compile(fnmatch.translate(pattern))
+        result = []
+        seen = set()
+        for term in candidates:
+            if regex.match(term):
+                stem = self.stems[term]
+                if stem not in seen:
+                    seen.add(stem)
+                    result.append(stem)
+                    if len(result) >= maxExpansions:
+                        break
+        return result
@@ -0,0 +1,50 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+# the modules of the search engine are at the root of the repository
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def nytsmall(tmp_path, monkeypatch):
+    """
+    Copy the nytsmall collection into a temporary folder that is the working directory of the test, the index files
+    are created next to the collection
+    """
+    shutil.copy(os.path.join(ROOT, "nytsmall.xml"), tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return "nytsmall"
+
+
+@pytest.fixture(scope="module")
+def sharedNytsmall(tmp_path_factory):
+    """
+    Copy the nytsmall collection into a temporary folder that the tests of a module share and return the absolute path
+    of the collection without file ending, so an index that is created once can be used by all tests of the module
+    """
+    folder = tmp_path_factory.mktemp("nytsmall")
+    shutil.copy(os.path.join(ROOT, "nytsmall.xml"), folder)
+    return str(folder / "nytsmall")
+
+
+@pytest.fixture
+def writeCollection(tmp_path, monkeypatch):
+    """
+    Return a function that writes a collection of (id, headline, text) documents into the working directory of the
+    test in the format of nytsmall.xml and returns its name
+    """
+    monkeypatch.chdir(tmp_path)
+
+    def write(name, documents):
+        with open(name + ".xml", "w") as f:
+            f.write("<DOCS>\n")
+            for doc_id, headline, text in documents:
+                f.write('\n<DOC id="%s" type="story" >\n<HEADLINE>\n%s\n</HEADLINE>\n<TEXT>\n<P>\n%s\n</P>\n</TEXT>\n'
+                        '</DOC>\n' % (doc_id, headline, text))
+            f.write("</DOCS>\n")
+        return name
+    return write
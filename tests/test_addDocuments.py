@@ -0,0 +1,61 @@
+import pytest
+
+from softwareAssignment import SearchEngine
+
+QUERIES = [["hurricane"], ["orange", "bowl"], ["storm", "coast", "team"], ["miami", "game"]]
+# the collections are smaller than the chunks of the parser, so the sentences don't depend on the file, see
+# xmlParser.iterate_xml
+DOCUMENTS = [("d01", "Hurricane season", "The hurricane reached the coast of Florida"),
+             ("d02", "Orange Bowl", "Miami won the Orange Bowl game against Nebraska"),
+             ("d03", "Storm warning", "A storm warning was issued for the coast"),
+             ("d04", "Bowl games", "The bowl games of the year drew large crowds"),
+             ("d05", "Team news", "The team signed a new coach before the game"),
+             ("d06", "Miami weather", "Miami expects rain and a tropical storm"),
+             ("d07", "Hurricane relief", "Relief teams arrived after the hurricane"),
+             ("d08", "Orange crop", "The orange crop suffered from the cold")]
+
+
+@pytest.fixture
+def collections(writeCollection):
+    """
+    Write the documents as one collection and split into two collections
+    """
+    writeCollection("full", DOCUMENTS)
+    writeCollection("first", DOCUMENTS[:5])
+    writeCollection("rest", DOCUMENTS[5:])
+    return DOCUMENTS
+
+
+def assertSameResults(engine, expected):
+    for query in QUERIES:
+        results = engine.executeQuery(query, k=20)
+        wanted = expected.executeQuery(query, k=20)
+        assert [ind for ind, _ in results] == [ind for ind, _ in wanted]
+        assert [score for _, score in results] == pytest.approx([score for _, score in wanted], abs=1e-12)
+
+
+def test_added_documents_are_indexed_like_a_new_index(collections):
+    full = SearchEngine("full", create=True)
+    engine = SearchEngine("first", create=True)
+    assert engine.addDocuments("rest.xml") == len(collections) - 5
+    assert engine.index.idf == pytest.approx(full.index.idf)
+    assert engine.index.documents == full.index.documents
+    assert engine.index.words == full.index.words
+    assertSameResults(engine, full)
+    # the segment is part of the index that is read again
+    assertSameResults(SearchEngine("first", create=False), full)
+
+
+def test_documents_that_are_already_indexed(collections, writeCollection):
+    engine = SearchEngine("first", create=True)
+    num_docs = len(engine.index.documents)
+    assert engine.addDocuments("first.xml") == 0
+    assert len(engine.index.documents) == num_docs
+    ind = collections[0][0]
+    writeCollection("changed", [(ind, "new headline", "a zeppelin landed")])
+    assert engine.addDocuments("changed.xml") == 0
+    assert engine.executeQuery(["zeppelin"]) == []
+    assert engine.addDocuments("changed.xml", replace=True) == 1
+    assert len(engine.index.documents) == num_docs
+    assert [result[0] for result in engine.executeQuery(["zeppelin"])] == [ind]
+    assert engine.index.readDocument(ind) == ("new headline", "a zeppelin landed")
@@ -0,0 +1,87 @@
+import random
+import string
+
+from stemming.porter2 import stem
+
+from analyzer import Analyzer, StemCache
+from softwareAssignment import SearchEngine
+
+DOCUMENTS = [("d01", "Hurricane season", "The hurricane reached the coast of Florida"),
+             ("d02", "Orange Bowl", "Miami won the Orange Bowl game against Nebraska"),
+             ("d03", "Storm warning", "A storm warning was issued for the coast"),
+             ("d04", "Hurricane relief", "Relief teams arrived after the hurricane")]
+
+
+class HyphenAnalyzer(Analyzer):
+    """
+    Analyzer that also splits on hyphens, the punctuation is removed from the tokens
+    """
+    def tokenize(self, text):
+        return text.replace("-", " ").split()
+
+    def normalize(self, text):
+        return text.lower()
+
+    def words(self, text):
+        return [word for word in (Analyzer.normalize(self, token) for token in self.tokenize(self.normalize(text)))
+                if word]
+
+
+def baselineWords(text):
+    """
+    Normalize every token on its own and drop the empty ones, like the preprocessing before the analyzer
+    """
+    words = ["".join(char for char in token if char not in string.punctuation) for token in text.lower().split()]
+    return [word for word in words if word != ""]
+
+
+def test_fast_path_equals_normalizing_every_token():
+    analyzer = Analyzer()
+    rng = random.Random(3)
+    alphabet = string.ascii_letters + string.digits + string.punctuation + " \t\n" + "éÄß  "
+    for _ in range(300):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 80)))
+        assert analyzer.words(text) == baselineWords(text)
+    assert analyzer.words("It's a U.S.-based -- company!") == ["its", "a", "usbased", "company"]
+
+
+def test_stopwords_and_stemmer():
+    analyzer = Analyzer(stopwords=["the", "of"])
+    assert analyzer.analyze("The Hurricanes of THE coast") == ["hurrican", "coast"]
+    assert analyzer.analyzeToken("The,") is None
+    assert analyzer.analyzeToken("...") is None
+    assert analyzer.analyzeToken("Storms!") == "storm"
+    upper = Analyzer(stemmer=str.upper, lowercase=False)
+    assert upper.analyze("Storm, coast") == ["STORM", "COAST"]
+    assert upper.stemWords(["a", "b"]) == {"a": "A", "b": "B"}
+
+
+def test_stem_cache_is_not_shared_by_copies():
+    analyzer = Analyzer(stemCache=StemCache())
+    assert analyzer.analyze("running runs") == [stem("running"), stem("runs")]
+    copy = analyzer.withStemCache(StemCache())
+    assert copy.stemCache is not analyzer.stemCache
+    assert len(copy.stemCache) == 0 and len(analyzer.stemCache) == 2
+    assert copy.stopwords is analyzer.stopwords
+
+
+def test_search_engine_with_stopwords(writeCollection):
+    writeCollection("docs", DOCUMENTS)
+    engine = SearchEngine("docs", create=True, analyzer=Analyzer(stopwords=["the", "a"]))
+    assert "the" not in engine.index.idf
+    assert engine.executeQuery(["the"]) == []
+    assert [ind for ind, _ in engine.executeQuery(["the", "hurricane"])] == \
+        [ind for ind, _ in engine.executeQuery(["hurricane"])]
+    assert engine.executePhraseQuery(["reached", "the", "coast"]) == engine.executePhraseQuery(["reached", "coast"])
+    # the index is read with the analyzer it was created with
+    engine = SearchEngine("docs", create=False, analyzer=Analyzer(stopwords=["the", "a"]))
+    assert "the" not in engine.index.idf
+
+
+def test_custom_analyzer_in_a_parallel_build(writeCollection):
+    writeCollection("docs", DOCUMENTS + [("d05", "Tropical-storm", "A tropical-storm warning")])
+    serial = SearchEngine("docs", create=True, analyzer=HyphenAnalyzer())
+    assert "tropic" in serial.index.idf and "tropicalstorm" not in serial.index.idf
+    parallel = SearchEngine("docs", create=True, buildWorkers=2, analyzer=HyphenAnalyzer())
+    assert parallel.index.idf == serial.index.idf
+    assert parallel.executeQuery(["tropical-storm"]) == serial.executeQuery(["tropical-storm"])
@@ -0,0 +1,35 @@
+import random
+
+import pytest
+
+from softwareAssignment import SearchEngine
+
+QUERIES = [["hurricane"], ["miami", "quarterback"], [], ["--"], ["Orange", "Bowl", "tonight"], ["zzzunknownword"],
+           ["the", "said", "year"], ["hurricane"]]
+
+
+@pytest.mark.parametrize("backend", ["dict", "inverted", "maxscore"])
+def test_batch_returns_the_result_of_every_query(nytsmall, backend):
+    SearchEngine(nytsmall, create=True)
+    engine = SearchEngine(nytsmall, create=False, backend=backend, cacheEntries=0)
+    results = engine.executeQueries(QUERIES, k=5)
+    assert len(results) == len(QUERIES)
+    for query, result in zip(QUERIES, results):
+        expected = engine.executeQuery(query, k=5) if any(term.strip("-") for term in query) else []
+        assert [ind for ind, _ in result] == [ind for ind, _ in expected]
+        assert [score for _, score in result] == pytest.approx([score for _, score in expected], abs=1e-12)
+
+
+def test_batch_of_no_queries(nytsmall):
+    engine = SearchEngine(nytsmall, create=True)
+    assert engine.executeQueries([]) == []
+
+
+def test_numpy_batch_scores_equal_the_single_query_scores(nytsmall):
+    pytest.importorskip("numpy")
+    engine = SearchEngine(nytsmall, create=True, backend="numpy", cacheEntries=0)
+    rng = random.Random(5)
+    words = sorted(engine.index.idf)
+    # long queries add many products per document, the batch adds them in the same order as a single query
+    queries = QUERIES + [rng.sample(words, rng.randint(2, 200)) for _ in range(50)]
+    assert engine.executeQueries(queries, k=20) == [engine.executeQuery(query, k=20) for query in queries]
@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+from binaryIndex import BinarySegment, segmentFormat
+from index import Index
+from searchEngineUtil import readFromFileTabSeparated
+
+
+def test_default_format_writes_the_interface_files(nytsmall):
+    index = Index(nytsmall, True)
+    assert segmentFormat(index.path) == "text"
+    assert not os.path.exists(nytsmall + ".bin")
+    assert readFromFileTabSeparated(nytsmall + ".tf") == index.tf
+    assert readFromFileTabSeparated(nytsmall + ".idf") == index.idf
+
+
+@pytest.mark.parametrize("indexFormat", ["binary", "compressed"])
+def test_binary_segments_hold_the_text_index(nytsmall, indexFormat):
+    text = Index(nytsmall, True)
+    index = Index(nytsmall, True, indexFormat=indexFormat)
+    assert segmentFormat(index.path) == indexFormat
+    assert not os.path.exists(nytsmall + ".tf")
+    assert index.tf == text.tf
+    assert index.postings == text.postings
+    assert index.positions == text.positions
+    assert index.lengths == text.lengths
+    segment = BinarySegment(nytsmall + ".bin")
+    assert segment.documents == text.documents
+    assert segment.readTF() == text.tf
+    segment.close()
+
+
+def test_format_conversion(nytsmall):
+    index = Index(nytsmall, True)
+    tf = readFromFileTabSeparated(nytsmall + ".tf")
+    for indexFormat in ("binary", "compressed", "text"):
+        index.convertFormat(indexFormat)
+        assert segmentFormat(index.path) == indexFormat
+        assert Index(nytsmall, False).tf == tf
+    assert readFromFileTabSeparated(nytsmall + ".tf") == tf
+    with pytest.raises(ValueError):
+        index.convertFormat("xml")
+
+
+def test_lazy_open_needs_binary_segments(nytsmall):
+    index = Index(nytsmall, True)
+    with pytest.raises(ValueError, match="binary segments"):
+        Index(nytsmall, False, lazy=True)
+    index.convertFormat("binary")
+    lazy = Index(nytsmall, False, lazy=True)
+    assert lazy.documents == index.documents
+    assert lazy.postings["hurrican"] == index.postings["hurrican"]
@@ -0,0 +1,40 @@
+import math
+
+import pytest
+
+from scoring import BM25Scorer, createScorer
+from softwareAssignment import SearchEngine
+
+# the words are left alone by the stemmer, a document has 4, 3 and 5 words with its headline, on average 4
+DOCUMENTS = [("D1", "red", "red red blue"), ("D2", "blue", "green blue"), ("D3", "green", "green green green red")]
+
+
+def bm25(tf, df, length, numDocs=3, averageLength=4.0, k1=1.2, b=0.75):
+    idf = math.log(1 + (numDocs - df + 0.5) / (df + 0.5))
+    return idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * length / averageLength))
+
+
+@pytest.mark.parametrize("backend", ["maxscore", "inverted"])
+def test_bm25_scores_from_raw_counts_and_lengths(writeCollection, backend):
+    engine = SearchEngine(writeCollection("colors", DOCUMENTS), create=True, backend=backend, scorer="bm25")
+    assert engine.index.lengths == {"D1": 4, "D2": 3, "D3": 5}
+    result = engine.executeQuery(["red"])
+    assert [ind for ind, _ in result] == ["D1", "D3"]
+    assert [score for _, score in result] == pytest.approx([bm25(3, 2, 4), bm25(1, 2, 5)], rel=1e-12)
+    # every occurrence of a word in the query counts once
+    result = dict(engine.executeQuery(["green", "blue", "blue"]))
+    assert result["D2"] == pytest.approx(bm25(1, 2, 3) + 2 * bm25(2, 2, 3), rel=1e-12)
+
+
+def test_bm25_matches_on_a_lazily_opened_index(nytsmall):
+    engine = SearchEngine(nytsmall, create=True, scorer="bm25", indexFormat="binary")
+    lazy = SearchEngine(nytsmall, create=False, scorer="bm25", lazy=True)
+    for query in (["hurricane"], ["miami", "orange", "bowl"]):
+        assert lazy.executeQuery(query) == engine.executeQuery(query)
+
+
+def test_createScorer():
+    assert createScorer("bm25").name == BM25Scorer().name
+    assert createScorer("cosine").name == "cosine"
+    with pytest.raises(ValueError):
+        createScorer("tfidf")
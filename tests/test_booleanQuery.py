@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from booleanQuery import SkipList, evaluateBooleanQuery, intersectSkipLists, parseBooleanQuery, queryWords, \
+    subtractSkipLists
+from softwareAssignment import SearchEngine
+
+NUM_DOCS = 60
+
+
+def bruteForce(node, postings):
+    if node[0] == "term":
+        return {doc_id for doc_id, _ in postings.get(node[1], ())}
+    if node[0] == "not":
+        return set(range(NUM_DOCS)) - bruteForce(node[1], postings)
+    sets = [bruteForce(child, postings) for child in node[1]]
+    if node[0] == "or":
+        return set().union(*sets)
+    return set.intersection(*sets)
+
+
+def randomTree(rng, words, depth=0):
+    if depth > 2 or rng.random() < 0.3:
+        return ("term", rng.choice(words))
+    if rng.random() < 0.25:
+        return ("not", randomTree(rng, words, depth + 1))
+    return (rng.choice(["and", "or"]), [randomTree(rng, words, depth + 1) for _ in range(rng.randint(2, 3))])
+
+
+def test_parse_precedence_and_implicit_and():
+    assert parseBooleanQuery("hurricane AND (miami OR philadelphia) AND NOT nebraska") == \
+        ("and", [("term", "hurrican"), ("or", [("term", "miami"), ("term", "philadelphia")]),
+                 ("not", ("term", "nebraska"))])
+    assert parseBooleanQuery("orange bowl OR miami") == \
+        ("or", [("and", [("term", "orang"), ("term", "bowl")]), ("term", "miami")])
+    assert queryWords(parseBooleanQuery("a AND NOT b")) == ["a"]
+    for query in ["(miami", "miami AND", "OR miami", "miami )"]:
+        with pytest.raises(ValueError):
+            parseBooleanQuery(query)
+
+
+def test_skip_list_operations():
+    a = SkipList(list(range(0, 100, 2)))
+    b = SkipList(list(range(0, 100, 3)))
+    assert intersectSkipLists(a, b).docIds == list(range(0, 100, 6))
+    assert subtractSkipLists(a, b).docIds == [doc_id for doc_id in range(0, 100, 2) if doc_id % 3]
+    assert list(SkipList([1, 2, 5], negated=True).iterate(7)) == [0, 3, 4, 6]
+
+
+def test_evaluation_equals_the_set_semantics():
+    rng = random.Random(3)
+    words = ["w%d" % number for number in range(6)]
+    for _ in range(300):
+        postings = {word: [(doc_id, 1.0) for doc_id in sorted(rng.sample(range(NUM_DOCS), rng.randint(0, 40)))]
+                    for word in words}
+        node = randomTree(rng, words)
+        result = evaluateBooleanQuery(node, postings)
+        assert list(result.iterate(NUM_DOCS)) == sorted(bruteForce(node, postings))
+
+
+def test_not_is_a_negated_list():
+    postings = {"a": [(1, 1.0), (4, 1.0)], "b": [(4, 1.0)]}
+    result = evaluateBooleanQuery(("not", ("term", "a")), postings)
+    assert result.negated and result.docIds == [1, 4]
+    result = evaluateBooleanQuery(("and", [("not", ("term", "a")), ("not", ("term", "b"))]), postings)
+    assert result.negated and result.docIds == [1, 4]
+
+
+def test_boolean_queries_are_ranked_by_their_positive_words(nytsmall):
+    engine = SearchEngine(nytsmall, create=True)
+    result = engine.executeBooleanQuery("hurricane AND NOT nebraska", 100)
+    hurricane = {engine.index.documents[doc_id] for doc_id, _ in engine.index.postings["hurrican"]}
+    nebraska = {engine.index.documents[doc_id] for doc_id, _ in engine.index.postings["nebraska"]}
+    assert {ind for ind, _ in result} == hurricane - nebraska
+    assert [score for _, score in result] == sorted([score for _, score in result], reverse=True)
+    assert result[:10] == engine.executeBooleanQuery("hurricane AND NOT nebraska")
+    # a query without positive words matches the documents in document id order with a score of 0
+    miami = {engine.index.documents[doc_id] for doc_id, _ in engine.index.postings["miami"]}
+    negated = engine.executeBooleanQuery("NOT miami", 5)
+    assert [ind for ind, _ in negated] == [ind for ind in engine.index.documents if ind not in miami][:5]
+    assert all(score == 0 for _, score in negated)
+    assert engine.executeBooleanQuery("miami AND zzzunknownword") == []
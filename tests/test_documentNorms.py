@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+from index import Index
+from searchEngineUtil import calculateNorms, readFromFileTabSeparated
+from softwareAssignment import SearchEngine
+
+
+def test_norm_file_holds_the_norm_of_every_document(nytsmall):
+    index = Index(nytsmall, True)
+    norms = readFromFileTabSeparated(nytsmall + ".norm")
+    expected = calculateNorms(index.tf, index.idf)
+    assert norms.keys() == expected.keys()
+    for ind, norm in expected.items():
+        assert norms[ind] == pytest.approx(norm, rel=1e-12)
+
+
+def test_postings_are_divided_by_the_document_norm(nytsmall):
+    index = Index(nytsmall, True)
+    for key, postings_list in index.postings.items():
+        for doc_id, weight in postings_list:
+            ind = index.documents[doc_id]
+            assert weight == pytest.approx(index.tf[ind][key] * index.idf[key] / index.norms[ind], rel=1e-12)
+
+
+def test_index_without_norm_file_scores_the_same(nytsmall):
+    engine = SearchEngine(nytsmall, create=True)
+    expected = engine.executeQuery(["miami", "hurricane", "orange"])
+    os.remove(nytsmall + ".norm")
+    result = SearchEngine(nytsmall, create=False).executeQuery(["miami", "hurricane", "orange"])
+    assert [ind for ind, _ in result] == [ind for ind, _ in expected]
+    assert [score for _, score in result] == pytest.approx([score for _, score in expected], rel=1e-12)
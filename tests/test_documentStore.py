@@ -0,0 +1,54 @@
+import pytest
+
+from documentStore import DocumentStore, DocumentStoreList, createSnippet, writeDocumentStore
+from softwareAssignment import SearchEngine
+from xmlParser import iterate_xml
+
+
+def test_documents_are_read_back(tmp_path):
+    documents = [("doc%d" % i, "headline %d" % i, "text of document %d" % i) for i in range(10)]
+    writeDocumentStore(str(tmp_path / "a.docs"), documents, blockSize=3)
+    store = DocumentStore(str(tmp_path / "a.docs"))
+    assert len(store) == 10
+    # the ids are read out of block order, so the cached block is replaced
+    assert [store.get(doc_id) for doc_id in (9, 0, 4, 5, 3)] == [documents[doc_id] for doc_id in (9, 0, 4, 5, 3)]
+    with pytest.raises(IndexError):
+        store.get(10)
+    store.close()
+
+
+def test_document_ids_continue_across_stores(tmp_path):
+    writeDocumentStore(str(tmp_path / "a.docs"), [("a", "", "x"), ("b", "", "y")])
+    writeDocumentStore(str(tmp_path / "b.docs"), [("c", "", "z")])
+    stores = DocumentStoreList([DocumentStore(str(tmp_path / "a.docs")), DocumentStore(str(tmp_path / "b.docs"))])
+    assert len(stores) == 3
+    assert [stores.get(doc_id)[0] for doc_id in range(3)] == ["a", "b", "c"]
+    with pytest.raises(IndexError):
+        stores.get(3)
+    stores.close()
+
+
+def test_not_a_document_store(tmp_path):
+    (tmp_path / "a.docs").write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        DocumentStore(str(tmp_path / "a.docs"))
+
+
+def test_snippet_shows_the_window_with_the_most_query_words():
+    text = " ".join(["filler"] * 50) + " the hurricanes hit philadelphia " + " ".join(["filler"] * 50)
+    snippet = createSnippet(text, {"hurrican", "philadelphia"}, length=10, highlight=("*", "*"))
+    assert snippet.startswith("... ") and snippet.endswith(" ...")
+    assert "*hurricanes* hit *philadelphia*" in snippet
+    assert len(snippet.split()) == 12
+    assert createSnippet("a short text", {"hurrican"}, length=10) == "a short text"
+
+
+def test_snippets_of_the_results(nytsmall):
+    engine = SearchEngine(nytsmall, create=True)
+    originals = {ind: original for ind, _, original in iterate_xml(nytsmall + ".xml")}
+    results = engine.executeQuerySnippets(["hurricane"], k=3)
+    assert [(result["id"], result["score"]) for result in results] == engine.executeQuery(["hurricane"], k=3)
+    for result in results:
+        assert result["headline"] == originals[result["id"]][0]
+        assert engine.index.readDocument(result["id"]) == originals[result["id"]]
+        assert "<b>" in result["snippet"]
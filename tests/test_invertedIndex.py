@@ -0,0 +1,29 @@
+import pytest
+
+from softwareAssignment import SearchEngine
+
+QUERIES = [["hurricane"], ["miami", "quarterback"], ["Orange", "Bowl", "tonight"], ["the", "said", "year"],
+           ["nebraska", "miami", "costa", "philadelphia"], ["zzzunknownword"]]
+
+
+def test_postings_hold_the_documents_of_every_word(nytsmall):
+    engine = SearchEngine(nytsmall, create=True)
+    index = engine.index
+    for key, postings_list in index.postings.items():
+        doc_ids = [doc_id for doc_id, _ in postings_list]
+        assert doc_ids == sorted(set(doc_ids))
+        assert all(key in index.tf[index.documents[doc_id]] for doc_id in doc_ids)
+    assert sum(len(postings_list) for postings_list in index.postings.values()) == \
+        sum(len(tf) for tf in index.tf.values())
+
+
+def test_inverted_scoring_ranks_like_the_exhaustive_scoring(nytsmall):
+    SearchEngine(nytsmall, create=True)
+    exhaustive = SearchEngine(nytsmall, create=False, backend="dict")
+    inverted = SearchEngine(nytsmall, create=False, backend="inverted")
+    for query in QUERIES:
+        expected = exhaustive.executeQuery(query)
+        result = inverted.executeQuery(query)
+        assert [ind for ind, _ in result] == [ind for ind, _ in expected]
+        assert [score for _, score in result] == pytest.approx([score for _, score in expected], abs=1e-12)
+    assert inverted.executeQuery(["zzzunknownword"]) == []
@@ -0,0 +1,39 @@
+import pytest
+
+from softwareAssignment import SearchEngine
+
+QUERIES = [["hurricane"], ["miami", "orange", "bowl"], ["game", "year", "team", "people"], ["hurric*"]]
+
+
+@pytest.mark.parametrize("indexFormat", ["binary", "compressed"])
+@pytest.mark.parametrize("backend", ["maxscore", "inverted"])
+def test_lazy_results_equal_the_eager_results(nytsmall, indexFormat, backend):
+    engine = SearchEngine(nytsmall, create=True, backend=backend, indexFormat=indexFormat, cacheEntries=0)
+    lazy = SearchEngine(nytsmall, create=False, backend=backend, lazy=True, cacheEntries=0)
+    # no postings are decoded until a query needs them
+    assert lazy.index.postings.cache == {}
+    assert lazy.executeQueries(QUERIES) == engine.executeQueries(QUERIES)
+    assert set(lazy.index.postings.cache) < set(lazy.index.idf)
+    assert lazy.executePhraseQuery(["orange", "bowl"]) == engine.executePhraseQuery(["orange", "bowl"])
+    assert lazy.executeBooleanQuery("miami AND NOT hurricane") == engine.executeBooleanQuery("miami AND NOT hurricane")
+    assert lazy.correctQuery(["hurricanne"]) == engine.correctQuery(["hurricanne"])
+
+
+def test_lazy_index_of_several_segments(nytsmall, writeCollection):
+    engine = SearchEngine(nytsmall, create=True, indexFormat="binary", backgroundMerge=False, cacheEntries=0)
+    writeCollection("more", [("new1", "zeppelin", "a hurricane hit miami"), ("new2", "storm", "orange bowl rain")])
+    engine.addDocuments("more.xml")
+    engine.deleteDocuments([engine.index.documents[0], "new2"])
+    assert len(engine.index.segments) == 2
+    lazy = SearchEngine(nytsmall, create=False, lazy=True, cacheEntries=0)
+    assert lazy.index.documents == engine.index.documents
+    assert lazy.executeQueries(QUERIES) == engine.executeQueries(QUERIES)
+
+
+def test_lazy_index_cannot_be_changed(nytsmall):
+    SearchEngine(nytsmall, create=True, indexFormat="binary")
+    lazy = SearchEngine(nytsmall, create=False, lazy=True)
+    with pytest.raises(ValueError, match="lazily"):
+        lazy.deleteDocuments([lazy.index.documents[0]])
+    with pytest.raises(ValueError):
+        SearchEngine(nytsmall, create=False, lazy=True, backend="dict")
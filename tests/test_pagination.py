@@ -0,0 +1,53 @@
+import pytest
+
+from pagination import CursorStore, decodeCursor, encodeCursor
+from softwareAssignment import SearchEngine
+
+
+def fetchAll(engine, query, pageSize, prefetchPages=5):
+    page = engine.executeQueryPage(query, pageSize=pageSize, prefetchPages=prefetchPages)
+    results = list(page["results"])
+    while page["cursor"] is not None:
+        page = engine.executeQueryPage(cursor=page["cursor"], pageSize=pageSize)
+        results.extend(page["results"])
+    return results
+
+
+def test_pages_concatenate_to_the_full_ranking(nytsmall):
+    engine = SearchEngine(nytsmall, create=True)
+    expected = engine.executeQuery(["game", "year", "team", "people", "miami"], k=1000)
+    assert len(expected) > 30
+    # a small prefetch makes the later pages rank the query again with more documents
+    assert fetchAll(engine, ["game", "year", "team", "people", "miami"], 7, prefetchPages=1) == expected
+    assert fetchAll(engine, ["game", "year", "team", "people", "miami"], 25) == expected
+    assert len(engine.cursors) == 0
+
+
+def test_pages_of_a_changed_index_are_ranked_again(nytsmall):
+    engine = SearchEngine(nytsmall, create=True)
+    first = engine.executeQueryPage(["hurricane"], pageSize=2)
+    removed = first["results"][0][0]
+    engine.deleteDocuments([removed])
+    engine.index.waitForMerge()
+    second = engine.executeQueryPage(cursor=first["cursor"], pageSize=2)
+    assert removed not in [ind for ind, _ in second["results"]]
+
+
+def test_unknown_and_malformed_cursors(nytsmall):
+    engine = SearchEngine(nytsmall, create=True)
+    with pytest.raises(ValueError):
+        engine.executeQueryPage(cursor="c999:10")
+    with pytest.raises(ValueError):
+        decodeCursor("c1:x")
+    assert decodeCursor(encodeCursor("c3", 20)) == ("c3", 20)
+    assert engine.executeQueryPage(["zzzunknownword"]) == {"results": [], "cursor": None}
+
+
+def test_least_recently_used_cursor_is_dropped():
+    store = CursorStore(maxCursors=2)
+    first = store.create({})
+    second = store.create({})
+    store.get(first)
+    store.create({})
+    assert store.get(second) is None
+    assert store.get(first) is not None
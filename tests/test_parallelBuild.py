@@ -0,0 +1,38 @@
+import os
+import shutil
+
+from index import Index
+from indexBuilder import buildIndex
+
+EXTENSIONS = (".tf", ".pos", ".len", ".df", ".idf", ".norm", ".spell", ".words", ".docs")
+
+
+def buildInto(folder, source, **kwargs):
+    os.makedirs(folder)
+    shutil.copy(source, folder)
+    path = os.path.join(folder, "nytsmall")
+    buildIndex(path, **kwargs)
+    return path
+
+
+def readFiles(path):
+    files = dict()
+    for extension in EXTENSIONS:
+        with open(path + extension, "rb") as f:
+            files[extension] = f.read()
+    return files
+
+
+def test_parallel_build_writes_the_same_files(nytsmall, tmp_path):
+    source = str(tmp_path / "nytsmall.xml")
+    single = readFiles(buildInto(str(tmp_path / "single"), source))
+    assert readFiles(buildInto(str(tmp_path / "parallel"), source, workers=3, batchSize=8)) == single
+    assert readFiles(buildInto(str(tmp_path / "batches"), source, workers=2, batchSize=1000)) == single
+
+
+def test_parallel_index_gives_the_same_results(nytsmall):
+    single = Index(nytsmall, True)
+    parallel = Index(nytsmall, True, workers=2)
+    assert parallel.documents == single.documents
+    assert parallel.postings == single.postings
+    assert parallel.positions == single.positions
@@ -0,0 +1,46 @@
+import random
+
+from phraseQuery import gallopingSearch, intersectPostings, phraseFrequency, proximityFrequency
+from softwareAssignment import SearchEngine
+
+DOCUMENTS = [("D1", "Bowl news", "The orange bowl was played in Miami."),
+             ("D2", "Fruit", "An orange and a bowl of cereal."),
+             ("D3", "Again", "Orange bowl tickets, orange bowl parking and the bowl orange."),
+             ("D4", "Nothing", "Nothing to see here.")]
+
+
+def test_gallopingSearch_finds_the_first_entry_at_or_after_the_target():
+    postings_list = [(doc_id, None) for doc_id in range(0, 200, 3)]
+    for target in range(-1, 205):
+        for low in (0, 5, 40):
+            expected = next((i for i in range(low, len(postings_list)) if postings_list[i][0] >= target),
+                            len(postings_list))
+            assert gallopingSearch(postings_list, target, low) == expected
+
+
+def test_intersectPostings_equals_the_set_intersection():
+    rng = random.Random(5)
+    for _ in range(50):
+        lists = [sorted(rng.sample(range(100), rng.randint(0, 60))) for _ in range(rng.randint(1, 4))]
+        expected = sorted(set.intersection(*[set(doc_ids) for doc_ids in lists]))
+        assert intersectPostings([[(doc_id, 1.0) for doc_id in doc_ids] for doc_ids in lists]) == expected
+    assert intersectPostings([]) == []
+
+
+def test_phrase_and_proximity_frequency():
+    assert phraseFrequency([[0, 5, 9], [1, 7, 10]]) == 2
+    assert phraseFrequency([[3], [2]]) == 0
+    assert proximityFrequency([[0], [3]], 3) == 1
+    assert proximityFrequency([[0], [4]], 3) == 0
+
+
+def test_phrase_and_proximity_queries(writeCollection):
+    engine = SearchEngine(writeCollection("phrases", DOCUMENTS), create=True)
+    phrase = engine.executePhraseQuery(["orange", "bowl"])
+    assert sorted(ind for ind, _ in phrase) == ["D1", "D3"]
+    assert engine.executePhraseQuery(["bowl", "orange"])[0][0] == "D3"
+    assert engine.executePhraseQuery(["orange", "miami"]) == []
+    # "orange and a bowl" has two words between orange and bowl
+    assert sorted(ind for ind, _ in engine.executeProximityQuery(["orange", "bowl"], 3)) == ["D1", "D2", "D3"]
+    assert sorted(ind for ind, _ in engine.executeProximityQuery(["orange", "bowl"], 2)) == ["D1", "D3"]
+    assert engine.executePhraseQuery(["unknownword"]) == []
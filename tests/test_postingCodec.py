@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+import postingCodec
+from postingCodec import decodePositions, decodePostings, decodeVByte, encodePositions, encodePostings, encodeVByte
+
+VALUES = [0, 1, 127, 128, 255, 16383, 16384, 2 ** 21 - 1, 2 ** 21, 2 ** 32 - 1, 2 ** 40]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def decoder(request, monkeypatch):
+    """
+    Decode with numpy and, with numpy hidden, byte by byte
+    """
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(postingCodec, "np", None)
+    return request.param
+
+
+def test_vbyte_round_trip(decoder):
+    assert decodeVByte(encodeVByte(VALUES)) == VALUES
+    assert decodeVByte(encodeVByte([])) == []
+    # every value below 128 takes a single byte
+    assert decodeVByte(encodeVByte(range(128))) == list(range(128))
+    rng = random.Random(1)
+    values = [rng.getrandbits(rng.randint(1, 35)) for _ in range(2000)]
+    assert decodeVByte(bytes(encodeVByte(values))) == values
+
+
+def test_vbyte_code():
+    assert encodeVByte([5]) == bytearray([0x85])
+    assert encodeVByte([128]) == bytearray([0x00, 0x81])
+    assert encodeVByte([300, 1]) == bytearray([0x2C, 0x82, 0x81])
+
+
+def test_postings_and_positions_round_trip(decoder):
+    docs = [3, 4, 10, 200, 70000]
+    counts = [1, 3, 1, 2, 130]
+    assert decodePostings(encodePostings(docs, counts)) == (docs, counts)
+    positionLists = [[0], [1, 5, 300], [7], [2, 3], list(range(0, 1300, 10))]
+    assert decodePositions(encodePositions(positionLists), counts) == positionLists
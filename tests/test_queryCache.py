@@ -0,0 +1,47 @@
+from queryCache import QueryResultCache, estimateSize
+from softwareAssignment import SearchEngine
+
+
+def cacheKey(word):
+    return QueryResultCache.createKey({word: 1.0}, 10)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = QueryResultCache(maxEntries=2)
+    cache.put(cacheKey("a"), [("doc1", 0.5)])
+    cache.put(cacheKey("b"), [("doc2", 0.4)])
+    assert cache.get(cacheKey("a")) == [("doc1", 0.5)]
+    cache.put(cacheKey("c"), [])
+    assert cache.get(cacheKey("b")) is None
+    assert cache.get(cacheKey("a")) == [("doc1", 0.5)]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_limit_bounds_the_entries():
+    key = QueryResultCache.createKey({"hurrican": 1.0}, 10)
+    value = [("NYT_ENG_19950101.%04d" % number, 0.1) for number in range(10)]
+    size = estimateSize(key, value)
+    cache = QueryResultCache(maxEntries=100, maxBytes=size)
+    cache.put(key, value)
+    cache.put(QueryResultCache.createKey({"miami": 1.0}, 10), value)
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["bytes"] <= size
+    # a result that is larger than the limit on its own is not cached
+    cache.put(QueryResultCache.createKey({"big": 1.0}, 10), value * 2)
+    assert cache.get(QueryResultCache.createKey({"big": 1.0}, 10)) is None
+
+
+def test_new_generation_drops_the_entries():
+    cache = QueryResultCache()
+    cache.checkGeneration(1)
+    cache.put(cacheKey("a"), [])
+    cache.checkGeneration(2)
+    assert cache.get(cacheKey("a")) is None
+
+
+def test_reordered_and_inflected_queries_share_an_entry(nytsmall):
+    engine = SearchEngine(nytsmall, create=True)
+    first = engine.executeQuery(["Hurricanes", "Miami"])
+    assert engine.executeQuery(["miami", "hurricane"]) == first
+    assert engine.cache.stats()["hits"] == 1
+    assert engine.cache.stats()["entries"] == 1
@@ -0,0 +1,104 @@
+import asyncio
+import json
+
+import pytest
+
+from searchServer import SearchServer
+from softwareAssignment import SearchEngine
+
+
+@pytest.fixture(scope="module")
+def engine(sharedNytsmall):
+    return SearchEngine(sharedNytsmall, create=True)
+
+
+def request(method, target, body=None, headers=""):
+    """
+    Create the bytes of a request, body is serialized as JSON unless it is already bytes
+    """
+    if body is not None and not isinstance(body, bytes):
+        body = json.dumps(body).encode()
+    body = body or b""
+    if "content-length" not in headers.lower() and body:
+        headers += "Content-Length: %d\r\n" % len(body)
+    return ("%s %s HTTP/1.1\r\nHost: localhost\r\n%s\r\n" % (method, target, headers)).encode() + body
+
+
+def parseResponses(data):
+    """
+    Split the bytes a connection received into (status, JSON payload) tuples
+    """
+    responses = []
+    while data:
+        head, data = data.split(b"\r\n\r\n", 1)
+        lines = head.decode().split("\r\n")
+        length = int([line for line in lines if line.lower().startswith("content-length")][0].split(":")[1])
+        responses.append((int(lines[0].split()[1]), json.loads(data[:length])))
+        data = data[length:]
+    return responses
+
+
+def exchange(engine, *requests):
+    """
+    Send the requests over one connection, close the sending side and return all responses
+    """
+    async def run():
+        server = SearchServer(engine)
+        port = await server.start(port=0)
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"".join(requests))
+            await writer.drain()
+            writer.write_eof()
+            data = await asyncio.wait_for(reader.read(), 10)
+            writer.close()
+            return parseResponses(data)
+        finally:
+            await server.close()
+    return asyncio.run(run())
+
+
+def test_search_and_batch(engine):
+    expected = engine.executeQuery(["hurricane", "miami"], 3)
+    responses = exchange(engine, request("GET", "/search?q=hurricane+miami&k=3"),
+                         request("POST", "/search", {"query": "hurricane miami", "k": 3}),
+                         request("POST", "/batch", {"queries": [["hurricane", "miami"], "orange bowl"], "k": 3}),
+                         request("GET", "/status"))
+    assert [status for status, _ in responses] == [200, 200, 200, 200]
+    assert [tuple(x) for x in responses[0][1]["results"]] == expected
+    assert [tuple(x) for x in responses[1][1]["results"]] == expected
+    assert [tuple(x) for x in responses[2][1]["results"][0]] == expected
+    assert responses[3][1]["documents"] == len(engine.index.documents)
+
+
+@pytest.mark.parametrize("length", ["abc", "-5", "1e3", "+3"])
+def test_invalid_content_length_is_rejected(engine, length):
+    responses = exchange(engine, request("POST", "/search", b'{"query": "miami"}', "Content-Length: %s\r\n" % length))
+    assert responses == [(400, {"error": "Content-Length must be a non-negative integer"})]
+
+
+@pytest.mark.parametrize("body", [{"query": 5}, {"query": ["miami", 5]}, {"query": {"a": 1}}])
+def test_invalid_query_is_rejected(engine, body):
+    status, payload = exchange(engine, request("POST", "/search", body))[0]
+    assert status == 400
+
+
+@pytest.mark.parametrize("body", [{"queries": [1]}, {"queries": "miami"}, {"queries": [["a", None]]}])
+def test_invalid_batch_is_rejected(engine, body):
+    status, payload = exchange(engine, request("POST", "/batch", body))[0]
+    assert status == 400
+
+
+def test_bad_requests_keep_the_connection_alive(engine):
+    responses = exchange(engine, request("POST", "/search", {"query": 5}), request("GET", "/nothing"),
+                         request("GET", "/search?q=miami&k=0"), request("GET", "/search?q=miami&k=2"))
+    assert [status for status, _ in responses] == [400, 404, 400, 200]
+    assert len(responses[3][1]["results"]) == 2
+
+
+def test_failing_query_is_an_internal_error(engine, monkeypatch):
+    def fail(queryTerms, k):
+        raise RuntimeError("broken")
+    monkeypatch.setattr(engine, "executeQuery", fail)
+    responses = exchange(engine, request("GET", "/search?q=miami"), request("GET", "/status"))
+    assert responses == [(500, {"error": "internal server error"}), (200, responses[1][1])]
@@ -0,0 +1,56 @@
+import pytest
+
+from index import Index
+from segments import DeletionBitmap, findMerge
+
+DOCUMENTS = [("d%02d" % i, "headline %d" % i, "storm %d coast %s team %s" % (i, "hurricane" * (i % 2), "game" * (i % 3)))
+             for i in range(12)]
+
+
+def assertSameIndex(index, expected):
+    assert index.documents == expected.documents
+    assert index.idf == pytest.approx(expected.idf)
+    for key in index.idf:
+        assert [doc_id for doc_id, _ in index.postings[key]] == [doc_id for doc_id, _ in expected.postings[key]]
+        assert [weight for _, weight in index.postings[key]] == \
+            pytest.approx([weight for _, weight in expected.postings[key]])
+
+
+def test_deletion_bitmap(tmp_path):
+    bitmap = DeletionBitmap()
+    bitmap.delete(3)
+    bitmap.delete(17)
+    bitmap.delete(3)
+    assert len(bitmap) == 2
+    assert [position for position in range(20) if bitmap.isDeleted(position)] == [3, 17]
+    bitmap.write(str(tmp_path / "a.del"))
+    assert DeletionBitmap.read(str(tmp_path / "a.del")).bits == bitmap.bits
+    assert len(DeletionBitmap.read(str(tmp_path / "missing.del"))) == 0
+
+
+def test_merge_policy():
+    assert findMerge([10, 10, 10], [0, 0, 0]) is None
+    assert findMerge([10, 10, 10, 10, 10], [0, 0, 0, 0, 0]) == (0, 4)
+    assert findMerge([1000, 10, 10, 10, 10], [0, 0, 0, 0, 0]) == (1, 5)
+    assert findMerge([1000, 10], [600, 0]) == (0, 1)
+
+
+@pytest.mark.parametrize("indexFormat", ["binary", "text"])
+def test_deleted_and_merged_documents(writeCollection, indexFormat):
+    writeCollection("expected", [document for document in DOCUMENTS if document[0] not in ("d02", "d09")])
+    expected = Index("expected", True, indexFormat=indexFormat)
+    writeCollection("docs", DOCUMENTS[:3])
+    index = Index("docs", True, indexFormat=indexFormat)
+    for start in range(3, 12, 3):
+        writeCollection("more%d" % start, DOCUMENTS[start:start + 3])
+        index.addDocuments("more%d.xml" % start)
+    assert len(index.segments) == 4
+    assert index.deleteDocuments(["d02", "d09", "unknown"]) == 2
+    assertSameIndex(index, expected)
+    assert index.merge() == 1
+    assert len(index.segments) == 1
+    assertSameIndex(index, expected)
+    assert [index.readDocument(ind)[0] for ind in index.documents] == \
+        [headline for ind, headline, _ in DOCUMENTS if ind not in ("d02", "d09")]
+    # the merged segment is read again
+    assertSameIndex(Index("docs", False), expected)
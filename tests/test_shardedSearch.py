@@ -0,0 +1,36 @@
+import random
+
+import pytest
+
+from index import Index
+from shardedSearch import ShardedSearchEngine
+from softwareAssignment import SearchEngine
+
+
+def sampleQueries(engine, number, seed):
+    rng = random.Random(seed)
+    words = sorted(engine.index.idf)
+    return [rng.sample(words, rng.randint(1, 4)) for _ in range(number)] + \
+        [["Hurricanes", "Miami"], ["hurric*"], ["*ball", "orange"], [], ["zzzunknownword"]]
+
+
+@pytest.mark.parametrize("scorer", ["cosine", "bm25"])
+def test_sharded_results_equal_the_single_process_results(nytsmall, scorer):
+    engine = SearchEngine(nytsmall, create=True, scorer=scorer, indexFormat="binary")
+    queries = sampleQueries(engine, 50, 3)
+    with ShardedSearchEngine(nytsmall, False, numShards=3, scorer=scorer) as sharded:
+        assert sharded.executeQueries(queries, 10) == engine.executeQueries(queries, 10)
+        assert sharded.executeQuery(["hurric*"]) == engine.executeQuery(["hurric*"])
+        assert sharded.executeQuery(["hurric*"])
+
+
+def test_created_index_is_opened_by_the_workers(nytsmall):
+    with ShardedSearchEngine(nytsmall, True, numShards=2) as sharded:
+        result = sharded.executeQuery(["miami", "quarterback"], 5)
+    assert result == SearchEngine(nytsmall, create=False).executeQuery(["miami", "quarterback"], 5)
+
+
+def test_text_index_is_rejected(nytsmall):
+    Index(nytsmall, True, indexFormat="text")
+    with pytest.raises(ValueError, match="binary segments"):
+        ShardedSearchEngine(nytsmall, False, numShards=2)
@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import sparseMatrix
+from softwareAssignment import SearchEngine
+
+QUERIES = [["hurricane"], ["miami", "quarterback"], ["Orange", "Bowl", "tonight"], ["the", "said", "year"],
+           ["zzzunknownword"]]
+
+
+def test_importing_the_module_does_not_import_numpy():
+    code = "import sys, sparseMatrix; print('numpy' in sys.modules)"
+    root = os.path.dirname(os.path.abspath(sparseMatrix.__file__))
+    output = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "False"
+
+
+def test_missing_numpy_raises_import_error(monkeypatch):
+    monkeypatch.setattr(sparseMatrix, "np", None)
+    # a None entry in sys.modules makes the import fail
+    monkeypatch.setitem(sys.modules, "numpy", None)
+    with pytest.raises(ImportError):
+        sparseMatrix.DocumentTermMatrix(None)
+
+
+def test_numpy_backend_ranks_like_the_inverted_backend(nytsmall):
+    pytest.importorskip("numpy")
+    inverted = SearchEngine(nytsmall, create=True, backend="inverted")
+    matrix = SearchEngine(nytsmall, create=False, backend="numpy")
+    for query in QUERIES:
+        expected = inverted.executeQuery(query)
+        result = matrix.executeQuery(query)
+        assert [ind for ind, _ in result] == [ind for ind, _ in expected]
+        assert [score for _, score in result] == pytest.approx([score for _, score in expected], abs=1e-12)
+    assert matrix.executeQueries(QUERIES) == [matrix.executeQuery(query) for query in QUERIES]
+
+
+def test_topKFromArray_matches_selectTopK():
+    np = pytest.importorskip("numpy")
+    from topK import selectTopK
+    scores = np.array([0.5, 0.0, 0.9, 0.5, 0.1, 0.5])
+    for k in range(0, 7):
+        assert sparseMatrix.topKFromArray(scores, k) == selectTopK(enumerate(scores.tolist()), k)
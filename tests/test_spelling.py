@@ -0,0 +1,43 @@
+from softwareAssignment import SearchEngine
+from spelling import SpellingCorrector, addDeletes, createDeletes, createWordDeletes, editDistance, removeDeletes
+
+
+def test_edit_distance():
+    assert editDistance("hurricane", "hurricane", 2) == 0
+    assert editDistance("hurricane", "hurricanes", 2) == 1
+    assert editDistance("hurricane", "hurircane", 2) == 1
+    assert editDistance("hurricane", "hurican", 2) == 2
+    assert editDistance("hurricane", "storm", 2) == 3
+    assert editDistance("", "ab", 2) == 2
+
+
+def test_word_deletes():
+    assert createWordDeletes("abc", 1) == {"abc", "bc", "ac", "ab"}
+    # only the prefix of a long word is used
+    assert createWordDeletes("abcdefghij", 0, 7) == {"abcdefg"}
+
+
+def test_lookup_prefers_close_and_frequent_words():
+    frequencies = {"storm": 10, "store": 3, "stork": 1, "hurrican": 5}
+    corrector = SpellingCorrector(createDeletes(frequencies), frequencies)
+    assert corrector.lookup("storm") == [("storm", 0)]
+    assert corrector.lookup("stor") == [("storm", 1), ("store", 1), ("stork", 1)]
+    assert corrector.lookup("hurican")[0] == ("hurrican", 1)
+    assert corrector.lookup("xyzxyz") == []
+
+
+def test_added_and_removed_words_match_a_new_delete_index():
+    deletes = createDeletes(["storm", "store"])
+    addDeletes(deletes, ["stork"])
+    removeDeletes(deletes, ["store"])
+    expected = createDeletes(["storm", "stork"])
+    assert {key: sorted(value) for key, value in deletes.items()} == \
+        {key: sorted(value) for key, value in expected.items()}
+
+
+def test_corrected_query_shows_the_words_of_the_documents(nytsmall):
+    engine = SearchEngine(nytsmall, create=True)
+    assert engine.correctQuery(["hurricane", "philadelphia"]) is None
+    # the suggestion is the stem "hurrican", it is shown as its word that appears in the most documents
+    assert engine.correctQuery(["Hurricanne", "philadelphia"]) == ["hurricanes", "philadelphia"]
+    assert engine.executeQuery(engine.correctQuery(["hurricanne"])) == engine.executeQuery(["hurricane"])
@@ -0,0 +1,138 @@
+import glob
+import os
+
+import pytest
+
+import indexBuilder
+from binaryIndex import segmentFormat
+from index import Index
+from indexBuilder import MERGE_FAN_IN, SpimiWriter, buildIndex
+from searchEngineUtil import readFromFileTabSeparated
+from softwareAssignment import SearchEngine
+
+DOCUMENTS = [("d%03d" % i, "headline %d" % (i % 7), "storm %d coast w%d %s team %s" %
+              (i % 11, i, "hurricane" * (i % 2), "game" * (i % 3))) for i in range(300)]
+
+
+def assertSameIndex(index, expected):
+    assert index.documents == expected.documents
+    assert index.idf == pytest.approx(expected.idf)
+    assert index.lengths == expected.lengths
+    assert index.words == expected.words
+    assert index.positions == expected.positions
+    for key in expected.idf:
+        assert [doc_id for doc_id, _ in index.postings[key]] == [doc_id for doc_id, _ in expected.postings[key]]
+        assert [weight for _, weight in index.postings[key]] == \
+            pytest.approx([weight for _, weight in expected.postings[key]], abs=1e-12)
+
+
+def readFiles(path):
+    files = dict()
+    for extension in (".df", ".idf", ".words"):
+        with open(path + extension, "rb") as f:
+            files[extension] = f.read()
+    return files
+
+
+def temporaryFiles(name):
+    return glob.glob(name + ".run*") + glob.glob(name + ".ids")
+
+
+@pytest.mark.parametrize("memoryBudget", [1, 20000, 10 ** 9])
+def test_spimi_build_equals_the_in_memory_build(nytsmall, memoryBudget):
+    expected = Index(nytsmall, True, indexFormat="binary")
+    norms = readFromFileTabSeparated(nytsmall + ".norm")
+    spell = readFromFileTabSeparated(nytsmall + ".spell")
+    files = readFiles(nytsmall)
+    index = Index(nytsmall, True, memoryBudget=memoryBudget)
+    assertSameIndex(index, expected)
+    assert readFromFileTabSeparated(nytsmall + ".norm") == pytest.approx(norms)
+    assert readFiles(nytsmall) == files
+    # the lines of the .spell file are sorted by the deletes, the words of a delete are in the same order
+    assert readFromFileTabSeparated(nytsmall + ".spell") == spell
+    assert temporaryFiles(nytsmall) == []
+
+
+def test_the_vocabulary_is_not_held_in_memory(writeCollection, monkeypatch):
+    writeCollection("docs", DOCUMENTS)
+    writers = []
+
+    def createWriter(path_to_files, memoryBudget=None, segment=False):
+        writers.append(SpimiWriter(path_to_files, memoryBudget, segment))
+        return writers[0]
+    monkeypatch.setattr(indexBuilder, "createWriter", createWriter)
+    # every document adds a word, so the words of all documents would reach the budget long before the end
+    buildIndex("docs", memoryBudget=20000)
+    runs = [path for path in writers[0].runFiles if path[len("docs.run"):].isdigit()]
+    assert len(runs) < len(DOCUMENTS) // 3
+    assert not os.path.exists("docs.ids")
+
+
+def test_runs_are_merged_with_a_bounded_fan_in(writeCollection, monkeypatch):
+    writeCollection("expected", DOCUMENTS)
+    expected = Index("expected", True, indexFormat="binary")
+    writeCollection("docs", DOCUMENTS)
+    writers = []
+
+    def createWriter(path_to_files, memoryBudget=None, segment=False):
+        writers.append(SpimiWriter(path_to_files, memoryBudget, segment, fanIn=3))
+        return writers[0]
+    monkeypatch.setattr(indexBuilder, "createWriter", createWriter)
+    # every document is a run, so the runs are merged in several passes
+    buildIndex("docs", memoryBudget=1)
+    assert len(writers[0].runs) <= 3
+    assert len(writers[0].runFiles) > len(DOCUMENTS) + len(DOCUMENTS) // 3
+    assert temporaryFiles("docs") == []
+    assertSameIndex(Index("docs", False), expected)
+
+
+def test_build_with_few_file_descriptors(writeCollection):
+    resource = pytest.importorskip("resource")
+    writeCollection("expected", DOCUMENTS)
+    expected = Index("expected", True, indexFormat="binary")
+    writeCollection("docs", DOCUMENTS)
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    # fewer files than runs can be open, but a merge of MERGE_FAN_IN runs fits
+    limit = len(os.listdir("/proc/self/fd")) + MERGE_FAN_IN + 16 if os.path.isdir("/proc/self/fd") else 256
+    assert limit < len(DOCUMENTS)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (limit, hard))
+    try:
+        buildIndex("docs", memoryBudget=1)
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+    assert temporaryFiles("docs") == []
+    assertSameIndex(Index("docs", False), expected)
+
+
+def test_temporary_files_are_removed_after_an_error(writeCollection, monkeypatch):
+    writeCollection("docs", DOCUMENTS[:20])
+
+    def fail(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr("indexBuilder.writeSegmentFile", fail)
+    with pytest.raises(OSError, match="disk full"):
+        buildIndex("docs", memoryBudget=1)
+    assert temporaryFiles("docs") == []
+
+
+def test_index_built_with_a_memory_budget_is_opened_lazily(nytsmall):
+    queries = [["hurricane"], ["miami", "orange", "bowl"], ["game", "year", "team", "people"]]
+    expected = SearchEngine(nytsmall, create=True, cacheEntries=0).executeQueries(queries)
+    engine = SearchEngine(nytsmall, create=True, buildMemory=20000, cacheEntries=0)
+    # the binary segment is neither exported to the text files nor read into memory
+    assert segmentFormat(engine.index.path) == "binary"
+    assert not os.path.exists(nytsmall + ".tf")
+    assert engine.index.lazy and engine.index.tf is None
+    for result, wanted in zip(engine.executeQueries(queries), expected):
+        assert [ind for ind, _ in result] == [ind for ind, _ in wanted]
+        assert [score for _, score in result] == pytest.approx([score for _, score in wanted], abs=1e-12)
+    with pytest.raises(ValueError, match="lazily"):
+        engine.deleteDocuments([engine.index.documents[0]])
+    # lazy=False reads the index into memory, so it can be changed
+    eager = SearchEngine(nytsmall, create=False, buildMemory=20000, lazy=False)
+    assert not eager.index.lazy
+    assert eager.deleteDocuments([eager.index.documents[0]]) == 1
+    # a text index is still exported
+    text = Index(nytsmall, True, indexFormat="text", memoryBudget=20000)
+    assert not text.lazy and os.path.exists(nytsmall + ".tf")
+    assert SearchEngine(nytsmall, create=True, backend="dict", buildMemory=20000).index.tf is not None
@@ -0,0 +1,71 @@
+from stemming.porter2 import stem
+
+from analyzer import StemCache, stemmerName
+from softwareAssignment import SearchEngine
+
+
+class CountingStemmer:
+    """
+    Stemmer that counts its calls
+    """
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, word):
+        self.calls += 1
+        return stem(word)
+
+
+def test_cache_is_bounded():
+    cache = StemCache(maxSize=100)
+    for i in range(10000):
+        assert cache.stem("junk%d" % i, stem) == stem("junk%d" % i)
+        assert len(cache) <= 100
+    assert cache.misses == 10000
+
+
+def test_frequent_words_stay_cached():
+    cache = StemCache(maxSize=20)
+    stemmer = CountingStemmer()
+    for i in range(1000):
+        cache.stem("running", stemmer)
+        cache.stem("junk%d" % i, stemmer)
+    # the frequent word is moved into the recent generation before its generation is dropped
+    assert stemmer.calls == 1001
+    assert cache.stemAll(["running", "runs"], stemmer) == {"running": "run", "runs": "run"}
+    assert stemmer.calls == 1002
+
+
+def test_cache_file_round_trip(tmp_path):
+    path = str(tmp_path / "a.stems")
+    cache = StemCache(maxSize=10)
+    for word in ["running", "storm", "hurricanes", "coast", "games", "team", "miami"]:
+        cache.stem(word, stem)
+    cache.write(path)
+    read = StemCache(maxSize=10, path=path)
+    # the file is only read when the first word is stemmed
+    assert len(read) == 0
+    assert read.stem("storm", stem) == "storm"
+    assert read.misses == 0
+    assert {**read.old, **read.recent} == {**cache.old, **cache.recent}
+    # a smaller cache keeps the words that were written last
+    small = StemCache(maxSize=4, path=path)
+    small.stem("miami", stem)
+    assert len(small) <= 4 and "miami" in small.recent
+    # a file of another stemmer is not used
+    other = StemCache(maxSize=10, path=path)
+    assert other.stem("running", str.upper) == "RUNNING"
+    assert other.stemmer == stemmerName(str.upper) and len(other) == 1
+
+
+def test_stem_cache_is_stored_with_the_index(nytsmall):
+    engine = SearchEngine(nytsmall, create=True, stemCacheSize=1000)
+    cache = engine.index.analyzer.stemCache
+    assert 0 < len(cache) <= 1000
+    with open(nytsmall + ".stems") as f:
+        lines = f.readlines()
+    assert lines[0] == "\t" + stemmerName(stem) + "\n"
+    assert len(lines) - 1 <= 1000
+    read = SearchEngine(nytsmall, create=False, stemCacheSize=1000)
+    assert read.executeQuery(["hurricanes"]) == engine.executeQuery(["hurricanes"])
+    assert read.index.analyzer.stemCache.misses <= 1
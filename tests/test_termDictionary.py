@@ -0,0 +1,49 @@
+from index import Index
+from softwareAssignment import SearchEngine
+from termDictionary import TermDictionary, isWildcardTerm, normalizePattern
+
+
+def test_patterns_match_the_words_before_stemming():
+    terms = TermDictionary({"hurricane": ("hurrican", 3), "hurricanes": ("hurrican", 1), "cane": ("cane", 2),
+                            "hurry": ("hurri", 1), "gone": ("gone", 1)}, {"hurrican": 1.0, "cane": 1.0, "hurri": 1.0})
+    assert terms.expand("hurricane*") == ["hurrican"]
+    assert sorted(terms.expand("*cane")) == ["cane", "hurrican"]
+    assert terms.expand("hur*") == ["hurrican", "hurri"]
+    assert terms.expand("hurr?") == ["hurri"]
+    # words whose stem isn't part of the vocabulary are left out
+    assert terms.expand("go*") == []
+    assert terms.expand("hurricanes") == ["hurrican"]
+
+
+def test_expansions_are_limited():
+    terms = TermDictionary(["a%03d" % i for i in range(200)])
+    assert len(terms.expand("a*", maxExpansions=10)) == 10
+    assert len(terms.expand("a*", maxExpansions=500, maxScanned=100)) == 100
+    # a suffix pattern is expanded in the order of the reversed words
+    assert terms.expand("*7", maxExpansions=3) == ["a007", "a107", "a017"]
+
+
+def test_patterns_are_normalized():
+    assert isWildcardTerm("hurric*") and isWildcardTerm("h?rricane") and not isWildcardTerm("hurricane")
+    assert normalizePattern("Hurri-c*!") == "hurric*"
+
+
+def test_wildcard_queries_find_the_stemmed_words(nytsmall):
+    engine = SearchEngine(nytsmall, create=True)
+    assert engine.index.terms.expand("*cane") == ["hurrican"]
+    assert engine.index.terms.expand("hurricane*") == ["hurrican"]
+    assert engine.executeQuery(["*cane"]) == engine.executeQuery(["hurricane"])
+    # an index that is read again expands the same words
+    assert Index(nytsmall, False).terms.expand("hurricane*") == ["hurrican"]
+
+
+def test_added_documents_add_their_words(writeCollection):
+    name = writeCollection("words", [("a", "first", "a storm"), ("b", "second", "a calm sea")])
+    index = Index(name, True)
+    assert index.terms.expand("hurricane*") == []
+    writeCollection("more", [("c", "third", "the hurricanes came")])
+    index.addDocuments("more.xml")
+    assert index.terms.expand("hurricane*") == ["hurrican"]
+    assert Index(name, False).terms.expand("hurricane*") == ["hurrican"]
+    index.deleteDocuments(["c"])
+    assert index.terms.expand("hurricane*") == []
@@ -0,0 +1,57 @@
+import random
+
+from softwareAssignment import SearchEngine
+from topK import calculateMaxWeights, maxScoreTopK, selectTopK
+
+
+def randomPostings(rng, words, numDocs):
+    postings = dict()
+    for word in words:
+        doc_ids = sorted(rng.sample(range(numDocs), rng.randint(1, numDocs // 2)))
+        postings[word] = [(doc_id, rng.random()) for doc_id in doc_ids]
+    return postings
+
+
+def exhaustiveTopK(queryWeights, postings, k):
+    scores = dict()
+    for key in sorted(queryWeights):
+        for doc_id, weight in postings.get(key, ()):
+            scores[doc_id] = scores.get(doc_id, 0.0) + queryWeights[key] * weight
+    return selectTopK(scores.items(), k)
+
+
+def test_selectTopK_orders_by_score_then_id_and_drops_zeros():
+    scores = [(3, 0.5), (1, 0.5), (2, 0.0), (0, 0.9), (4, 0.1)]
+    assert selectTopK(scores, 3) == [(0, 0.9), (1, 0.5), (3, 0.5)]
+    assert selectTopK(scores, 10) == [(0, 0.9), (1, 0.5), (3, 0.5), (4, 0.1)]
+
+
+def test_maxScoreTopK_equals_exhaustive_scoring():
+    rng = random.Random(7)
+    words = ["w%d" % number for number in range(12)]
+    postings = randomPostings(rng, words, 300)
+    maxWeights = calculateMaxWeights(postings)
+    for _ in range(200):
+        queryWeights = {word: rng.random() for word in rng.sample(words, rng.randint(1, 6))}
+        for k in (1, 5, 20):
+            assert maxScoreTopK(queryWeights, postings, maxWeights, k) == exhaustiveTopK(queryWeights, postings, k)
+
+
+def test_maxScoreTopK_ties_keep_the_smaller_document_id():
+    postings = {"a": [(0, 1.0), (1, 1.0), (2, 1.0)], "b": [(2, 0.5)]}
+    assert maxScoreTopK({"a": 1.0, "b": 0.0}, postings, calculateMaxWeights(postings), 2) == [(0, 1.0), (1, 1.0)]
+    assert maxScoreTopK({"a": 1.0}, postings, calculateMaxWeights(postings), 0) == []
+
+
+def test_single_and_batch_queries_score_alike(nytsmall):
+    engine = SearchEngine(nytsmall, create=True, cacheEntries=0)
+    rng = random.Random(2)
+    # frequent words make many documents share several query words, where the order of the summation matters
+    words = sorted(engine.index.idf, key=lambda word: (engine.index.idf[word], word))[:200]
+    queries = [rng.sample(words, rng.randint(2, 6)) for _ in range(300)]
+    for backend in ("maxscore", "inverted"):
+        engine.backend = backend
+        batch = engine.executeQueries(queries)
+        for query, result in zip(queries, batch):
+            assert engine.executeQueries([query])[0] == result
+            assert engine.executeQuery(query) == result
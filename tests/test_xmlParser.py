@@ -0,0 +1,40 @@
+import pytest
+
+from index import Index
+from softwareAssignment import SearchEngine
+from xmlParser import iterate_sorted_xml, iterate_xml, parse_xml, read_ids
+
+
+def test_streamed_sentences_are_the_parsed_ones(nytsmall):
+    inds, data = parse_xml(nytsmall + ".xml")
+    documents = list(iterate_xml(nytsmall + ".xml"))
+    assert [ind for ind, _, _ in documents] == inds
+    assert [sentences for _, sentences, _ in documents] == data
+    assert read_ids(nytsmall + ".xml") == inds
+
+
+def test_entities_split_the_text(writeCollection):
+    name = writeCollection("entities", [("a", "AT&amp;T deal", "AT&amp;T buys a company")])
+    index = Index(name, True)
+    assert "att" not in index.idf
+    assert "compani" in index.idf
+
+
+def test_documents_are_sorted_by_index(writeCollection):
+    name = writeCollection("unsorted", [("c", "third", "storm one"), ("a", "first", "storm two"),
+                                        ("b", "second", "storm three"), ("a", "again", "storm four")])
+    documents = list(iterate_sorted_xml(name + ".xml"))
+    # documents with the same index keep the order of the file
+    assert [(ind, original[0]) for ind, _, original in documents] == \
+        [("a", "first"), ("a", "again"), ("b", "second"), ("c", "third")]
+    inds, data = parse_xml(name + ".xml")
+    assert [sentences for _, sentences, _ in documents] == data
+    index = Index(name, True)
+    assert index.documents == ["a", "b", "c"]
+
+
+def test_scores_of_the_streamed_build(nytsmall):
+    engine = SearchEngine(nytsmall, create=True)
+    results = engine.executeQuery(["hurricane", "philadelphia"])
+    assert results[0][0] == "NYT_ENG_19950101.0001"
+    assert results[0][1] == pytest.approx(0.1527771925230453, abs=1e-12)
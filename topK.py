@@ -0,0 +1,145 @@
+import heapq
+from bisect import bisect_left
+from operator import itemgetter
+
+# relative slack used when an upper bound is compared with the current threshold, the upper bounds are summed in a
+# different order than the scores, so without it a rounding error could prune a document that belongs in the top k
+EPSILON = 1e-9
+
+
+def selectTopK(scores, k):
+    """
+    Selects the k best scored documents with a bounded heap instead of sorting all scores.
+    The result is the same as sorting by score descending, ties sorted by document id, and slicing [:k].
+    Documents with a score of 0 are not returned.
+    :param scores: iterable of (document id, score) tuples
+    :type scores: iterable[tuple[int, float]]
+    :param k: maximal number of documents to return
+    :type k: int
+    :return: list of at most k (document id, score) tuples sorted by score
+    :rtype: list[tuple[int, float]]
+    """
+    return heapq.nsmallest(k, (x for x in scores if x[1] != 0), key=lambda x: (-x[1], x[0]))
+
+
+def calculateMaxWeights(postings):
+    """
+    Calculates the upper bound impact of every word, this is the largest normalized tf.idf weight of the word, i.e.
+    the largest contribution the word can add to a cosine similarity for a query weight of 1
+    :param postings: dict with the words as keys and the postings list of (document id, weight) as value
+    :type postings: dict[str, list[tuple[int, float]]]
+    :return: dict with the words as keys and the upper bound impact as value
+    :rtype: dict[str, float]
+    """
+    max_weights = dict()
+    for key, postings_list in postings.items():
+        max_weights[key] = max([weight for _, weight in postings_list])
+    return max_weights
+
+
+def maxScoreTopK(queryWeights, postings, maxWeights, k):
+    """
+    Document-at-a-time top k retrieval with MaxScore dynamic pruning.
+    The postings lists of the query words are sorted by their upper bound. Once the k-th best score (the threshold) is
+    larger than the summed upper bounds of the lists with the smallest bounds, these lists become non-essential:
+    documents that only appear in them can't enter the top k and are skipped, the non-essential lists are only
+    searched for documents found in the essential ones.
+    The result is the same as exhaustively scoring every document, documents are visited in document id order, so a
+    document that only ties with the threshold never replaces a document with a smaller document id. The contributions
+    of the words are added in sorted word order like in the exhaustive accumulation, so the scores are equal to the last
+    bit, the order of the lists only decides the pruning.
+    :param queryWeights: dict with the query words as keys and their tf.idf weight divided by the query norm as value
+    :type queryWeights: dict[str, float]
+    :param postings: dict with the words as keys and the postings list of (document id, weight) as value, the weight
+     is the tf.idf weight divided by the document norm
+    :type postings: dict[str, list[tuple[int, float]]]
+    :param maxWeights: dict with the words as keys and their upper bound impact as value
+    :type maxWeights: dict[str, float]
+    :param k: maximal number of documents to return
+    :type k: int
+    :return: list of at most k (document id, score) tuples sorted by score, ties sorted by document id
+    :rtype: list[tuple[int, float]]
+    """
+    if k <= 0:
+        return []
+    # list of (upper bound, query weight, postings list, rank of the word in sorted order) sorted by upper bound
+    lists = []
+    for key in sorted(queryWeights):
+        weight = queryWeights[key]
+        postings_list = postings.get(key)
+        if weight == 0 or not postings_list:
+            continue
+        lists.append((weight * maxWeights[key], weight, postings_list, len(lists)))
+    lists.sort(key=itemgetter(0))
+    # bounds[i] is the sum of the upper bounds of the lists 0..i
+    bounds = []
+    total = 0.0
+    for bound, _, _, _ in lists:
+        total += bound
+        bounds.append(total)
+    positions = [0] * len(lists)
+    # contribution of every word to the score of the current candidate, indexed by the rank of the word
+    contributions = [0.0] * len(lists)
+    # min-heap of (score, -document id), the root is the worst document of the current top k
+    heap = []
+    threshold = 0.0
+    # lists before first_essential are non-essential
+    first_essential = 0
+    while first_essential < len(lists) and bounds[first_essential] * (1 + EPSILON) <= threshold:
+        first_essential += 1
+
+    while first_essential < len(lists):
+        # the next candidate is the smallest document id in the essential lists
+        candidate = None
+        for i in range(first_essential, len(lists)):
+            postings_list = lists[i][2]
+            if positions[i] < len(postings_list):
+                doc_id = postings_list[positions[i]][0]
+                if candidate is None or doc_id < candidate:
+                    candidate = doc_id
+        if candidate is None:
+            break
+        # the running score only decides the pruning, the contribution of every visited list is kept by the rank of its
+        # word, a list that doesn't contain the candidate contributes 0
+        score = 0.0
+        pruned = False
+        for i in range(first_essential, len(lists)):
+            _, weight, postings_list, rank = lists[i]
+            position = positions[i]
+            if position < len(postings_list) and postings_list[position][0] == candidate:
+                contributions[rank] = weight * postings_list[position][1]
+                score += contributions[rank]
+                positions[i] = position + 1
+            else:
+                contributions[rank] = 0.0
+        # look up the candidate in the non-essential lists, largest bound first, as long as it can still make it
+        for i in range(first_essential - 1, -1, -1):
+            if (score + bounds[i]) * (1 + EPSILON) <= threshold:
+                pruned = True
+                break
+            _, weight, postings_list, rank = lists[i]
+            position = bisect_left(postings_list, candidate, lo=positions[i], key=itemgetter(0))
+            if position < len(postings_list) and postings_list[position][0] == candidate:
+                contributions[rank] = weight * postings_list[position][1]
+                score += contributions[rank]
+                position += 1
+            else:
+                contributions[rank] = 0.0
+            positions[i] = position
+        if pruned or score == 0 or (len(heap) == k and score * (1 + EPSILON) <= heap[0][0]):
+            continue
+        # every list was visited, the exact score adds the contributions in sorted word order
+        score = 0.0
+        for value in contributions:
+            score += value
+        if len(heap) < k:
+            heapq.heappush(heap, (score, -candidate))
+        elif score > heap[0][0]:
+            heapq.heapreplace(heap, (score, -candidate))
+        else:
+            continue
+        if len(heap) == k:
+            threshold = heap[0][0]
+            while first_essential < len(lists) and bounds[first_essential] * (1 + EPSILON) <= threshold:
+                first_essential += 1
+    return sorted([(-doc_id, score) for score, doc_id in heap], key=lambda x: (-x[1], x[0]))
@@ -8,16 +8,18 @@ class Vector:
     """
     Class that represents a vector for a document or a query
     """
-    def __init__(self, index_name=None, tf=None, idf=None, world_list=None):
+    def __init__(self, index_name=None, tf=None, idf=None, world_list=None, norm=None):
         """
         Initialize the vector, this can either be a query vector or a document vector.
         If it is a document vector, index_name, tf and idf must be provided.
         If it is a query vector, world_list and idf must be provided.
         If not exactly one of the two options is provided, a ValueError is raised.
+        If the norm of the vector is already known, e.g. because it was stored in the index, it isn't calculated again.
         :param index_name:
         :param tf:
         :param idf:
         :param world_list:
+        :param norm: precalculated norm of the tf.idf vector
         :raises ValueError: Either tf and idf and index_name or world_list and idf must be provided
         :return: None
         :rtype: None
@@ -29,11 +31,12 @@ class Vector:
         self.idf = idf
         self.world_list = world_list
         self.tf_idf = None
-        self.norm = None
+        self.norm = norm
 
-        # create tf.idf vector and calculate norm
+        # create tf.idf vector and calculate norm if it wasn't provided
         self.createVector()
-        self.calculateNorm()
+        if self.norm is None:
+            self.calculateNorm()
 
     def createVector(self):
         """
@@ -54,8 +57,9 @@ class Vector:
         # calculate tf.idf
         self.tf_idf = defaultdict(float)
         for key, value in self.tf.items():
-            # keys that don't appear in the idf dict return 0 and result in a tf.idf of 0
-            self.tf_idf[key] = value * self.idf[key]
+            # keys that don't appear in the idf dict return 0 and result in a tf.idf of 0, get doesn't add them to the
+            # idf dict
+            self.tf_idf[key] = value * self.idf.get(key, 0.0)
 
     def calculateNorm(self):
         """
@@ -85,3 +89,4 @@ class Vector:
             dot_product += self.tf_idf[key] * vector2.tf_idf[key]
         # calculate and return the cosine similarity
         return dot_product / (self.norm * vector2.norm) if self.norm * vector2.norm != 0 else 0
+
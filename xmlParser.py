@@ -1,3 +1,5 @@
+import pickle
+import tempfile
 import xml.parsers.expat
 
 from searchEngineUtil import sort_lists
@@ -21,12 +23,18 @@ class XMLParser:
         self.count = 0
         # Flag that indicates if the data should be written to the data list
         self.write = False
+        # List that holds for every document the list of the original (not lowercased) headline and text parts
+        self.headlines = []
+        self.texts = []
+        # Name of the element (HEADLINE or TEXT) whose original text is currently kept, None outside of them
+        self.section = None
 
     def startElement(self, name, attrs):
         """
         Start element handler for the XMLParser, if the start element is HEADLINE or TEXT, the write flag is set to True.
         If the start element is DOC, the id of the document is appended to the index list.
         If the start element is DATELINE, the write flag is set to False.
+        The original text of HEADLINE and TEXT elements is kept for the document store.
         :param name: start element name
         :type name: str
         :param attrs: attributes of the start element
@@ -36,6 +44,10 @@ class XMLParser:
         """
         if name == "DOC":
             self.index.append(attrs["id"])
+            self.headlines.append([])
+            self.texts.append([])
+        if name in ("HEADLINE", "TEXT"):
+            self.section = name
         if name == "HEADLINE":
             if len(self.data) <= self.count:
                 self.data.append([])
@@ -57,10 +69,32 @@ class XMLParser:
         """
         if name == "DOC":
             self.count += 1
+        if name == self.section:
+            self.section = None
+
+    def popDocuments(self):
+        """
+        Remove the documents that were parsed completely, this keeps the memory of the parser bounded while a file is
+        fed to it in chunks
+        :return: list of (document id, list of sentences, (headline, text)) tuples in the order of the file, whitespace
+         in the headline and text is collapsed to single spaces
+        :rtype: list[tuple[str, list[str], tuple[str, str]]]
+        """
+        finished = self.count
+        documents = [(ind, data, (" ".join("".join(headline).split()), " ".join("".join(text).split())))
+                     for ind, data, headline, text in zip(self.index[:finished], self.data[:finished],
+                                                          self.headlines[:finished], self.texts[:finished])]
+        del self.index[:finished]
+        del self.data[:finished]
+        del self.headlines[:finished]
+        del self.texts[:finished]
+        self.count = 0
+        return documents
 
     def characterData(self, data):
         """
         Handles all data between tags, writes the data to the data list if the write flag is True.
+        The original text is kept for the document store, the parts of the original text are joined, see popDocuments.
         :param data: data between tags
         :type data: str
         :return: None
@@ -68,6 +102,10 @@ class XMLParser:
         """
         if self.write and data != "\n":
             self.data[self.count].append(data.lower())
+        if self.section == "HEADLINE":
+            self.headlines[-1].append(data)
+        elif self.section == "TEXT":
+            self.texts[-1].append(data)
 
 
 def parse_xml(file_path):
@@ -90,3 +128,79 @@ def parse_xml(file_path):
 
     # Sort the lists based on the values of the first list (index) before returning them
     return sort_lists(xml_parser.index, xml_parser.data)
+
+
+def iterate_xml(file_path, chunkSize=2048):
+    """
+    Parses the provided XML file in chunks and yields every document as soon as it is parsed, so only the documents of
+    the current chunk are held in memory
+    :param file_path: path to the XML file
+    :type file_path: str
+    :param chunkSize: number of bytes that are fed to the parser at once, expat splits the data between tags where a
+     chunk ends, the default is the buffer size of ParseFile, so the sentences are the same as the ones of parse_xml
+    :type chunkSize: int
+    :return: iterator over (document id, list of sentences, (headline, text)) tuples in the order of the file
+    :rtype: iterator[tuple[str, list[str], tuple[str, str]]]
+    """
+    parser = xml.parsers.expat.ParserCreate()
+    xml_parser = XMLParser()
+
+    parser.StartElementHandler = xml_parser.startElement
+    parser.EndElementHandler = xml_parser.endElement
+    parser.CharacterDataHandler = xml_parser.characterData
+
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunkSize), b""):
+            parser.Parse(chunk, False)
+            yield from xml_parser.popDocuments()
+        parser.Parse(b"", True)
+        yield from xml_parser.popDocuments()
+
+
+def read_ids(file_path):
+    """
+    Parses the provided XML file and returns the ids of the documents, the data between tags is skipped
+    :param file_path: path to the XML file
+    :type file_path: str
+    :return: list with the id of the documents in the order of the file
+    :rtype: list[str]
+    """
+    parser = xml.parsers.expat.ParserCreate()
+    ids = []
+
+    def startElement(name, attrs):
+        if name == "DOC":
+            ids.append(attrs["id"])
+
+    parser.StartElementHandler = startElement
+    with open(file_path, "rb") as f:
+        parser.ParseFile(f)
+    return ids
+
+
+def iterate_sorted_xml(file_path, chunkSize=2048):
+    """
+    Parses the provided XML file like iterate_xml and yields the documents sorted by their id like parse_xml, documents
+    with the same id keep the order of the file. The ids are read first, if they are already sorted, the documents are
+    yielded as soon as they are parsed. Otherwise the parsed documents are written to a temporary file and read back
+    in sorted order, so only the ids and the positions of the documents in the temporary file are held in memory.
+    :param file_path: path to the XML file
+    :type file_path: str
+    :param chunkSize: number of bytes that are fed to the parser at once, see iterate_xml
+    :type chunkSize: int
+    :return: iterator over (document id, list of sentences, (headline, text)) tuples sorted by document id
+    :rtype: iterator[tuple[str, list[str], tuple[str, str]]]
+    """
+    ids = read_ids(file_path)
+    if all(ids[i] <= ids[i + 1] for i in range(len(ids) - 1)):
+        yield from iterate_xml(file_path, chunkSize)
+        return
+    with tempfile.TemporaryFile() as f:
+        offsets = []
+        for document in iterate_xml(file_path, chunkSize):
+            offsets.append(f.tell())
+            pickle.dump(document, f, pickle.HIGHEST_PROTOCOL)
+        # sorted is stable, so documents with the same id keep the order of the file
+        for position in sorted(range(len(offsets)), key=lambda i: ids[i]):
+            f.seek(offsets[position])
+            yield pickle.load(f)